@@ -1,4 +1,5 @@
 import sqlite3
+import profiling
 
 db_path = '/home/kamel/OTT750/database.db'
 
@@ -46,4 +47,5 @@ def analyze_db():
         print(f"Erreur lors de l'analyse: {e}")
 
 if __name__ == "__main__":
+    profiling.install()
     analyze_db()
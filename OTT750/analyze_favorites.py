@@ -1,4 +1,5 @@
 import sqlite3
+import profiling
 
 db_path = '/home/kamel/OTT750/database.db'
 
@@ -42,4 +43,5 @@ def analyze_favorites():
         print(f"Erreur: {e}")
 
 if __name__ == "__main__":
+    profiling.install()
     analyze_favorites()
@@ -1,4 +1,5 @@
 import sqlite3
+import profiling
 
 db_path = '/home/kamel/OTT750/database.db'
 
@@ -37,4 +38,5 @@ def analyze_favorites_detailed():
         print(f"Erreur: {e}")
 
 if __name__ == "__main__":
+    profiling.install()
     analyze_favorites_detailed()
@@ -7,12 +7,25 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import shutil
 import os
+import profiling
+from session_cache import EditorSession
+from natural_sort import natural_key, number_key
 
 DB_FILE = "database.db"
 OUTPUT_DB = "database_new.db"
 
 FAVORITE_LISTS = ["sport", "news", "cinema", "france", "italie", "nilesat"]
 
+# Marque (dans ch["favorites"]) des chaînes sélectionnées pour fav = 1, journalisée à chaque clic
+MARK = "fav"
+
+# Clés de tri des colonnes (cliquer sur l'en-tête)
+SORT_KEYS = {
+    "lcn": lambda ch: number_key(ch["lcn"]),
+    "name": lambda ch: natural_key(ch["name"]),
+    "sat": lambda ch: (natural_key(str(ch["sat"])), number_key(ch["lcn"])),
+}
+
 class ChannelEditorApp:
     def __init__(self, root):
         self.root = root
@@ -20,7 +33,11 @@ class ChannelEditorApp:
         root.geometry("1100x700")
 
         self.channels = {}
+        self.by_id = {}
+        self.session = None
         self.check_vars = {}
+        self.sort_column = None
+        self.sort_reverse = False
 
         self.build_ui()
         self.load_channels()
@@ -38,10 +55,12 @@ class ChannelEditorApp:
 
         columns = ("lcn", "name", "sat")
         self.tree = ttk.Treeview(self.root, columns=columns, show="headings")
-        self.tree.heading("lcn", text="LCN")
-        self.tree.heading("name", text="Channel Name")
-        self.tree.heading("sat", text="Satellite")
+        self.headings = {"lcn": "LCN", "name": "Channel Name", "sat": "Satellite"}
+        for col, text in self.headings.items():
+            self.tree.heading(col, text=text, command=lambda c=col: self.sort_by(c))
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
         self.tree.pack(fill="both", expand=True)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         bottom = tk.Frame(self.root)
         bottom.pack(fill="x", pady=5)
@@ -57,6 +76,16 @@ class ChannelEditorApp:
             messagebox.showerror("Error", f"Database not found: {DB_FILE}")
             return
 
+        # Snapshot de la session précédente si la base n'a pas changé (pas de SQL)
+        # Les sélections journalisées (crash) sont rejouées dans ch["favorites"]
+        session = self.session = EditorSession(DB_FILE, 'app', lists_key='channels', favs_key='favorites')
+        snapshot = session.restore()
+        if snapshot:
+            self.channels = snapshot['channels']
+            self.index_channels()
+            self.refresh_tree()
+            return
+
         conn = sqlite3.connect(DB_FILE)
         c = conn.cursor()
 
@@ -93,17 +122,62 @@ class ChannelEditorApp:
                 "favorites": set()
             })
 
+        for sat, channel_list in self.channels.items():
+            session.apply_pending(sat, channel_list)
+        try:
+            session.save({'channels': self.channels})
+        except OSError:
+            pass
+        self.index_channels()
         self.refresh_tree()
 
+    def index_channels(self):
+        self.by_id = {str(ch["id"]): ch for channel_list in self.channels.values() for ch in channel_list}
+
     def refresh_tree(self, *args):
         query = self.search_var.get().lower()
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for sat in sorted(self.channels.keys()):
-            for ch in self.channels[sat]:
-                if query in ch["name"].lower():
-                    self.tree.insert("", "end", iid=f"{ch['id']}", values=(ch["lcn"], ch["name"], ch["sat"]))
+        rows = [ch for sat in sorted(self.channels.keys()) for ch in self.channels[sat]]
+        if self.sort_column:
+            rows.sort(key=SORT_KEYS[self.sort_column], reverse=self.sort_reverse)
+
+        marked = []
+        for ch in rows:
+            if query in ch["name"].lower():
+                self.tree.insert("", "end", iid=f"{ch['id']}", values=(ch["lcn"], ch["name"], ch["sat"]))
+                if MARK in ch["favorites"]:
+                    marked.append(f"{ch['id']}")
+        # La sélection survit au filtrage: elle est reconstruite depuis les marques
+        self.tree.selection_set(marked)
+
+    def on_select(self, event=None):
+        # Chaque changement de sélection des lignes affichées est journalisé
+        selected = set(self.tree.selection())
+        for iid in self.tree.get_children():
+            ch = self.by_id.get(iid)
+            if ch is None or (MARK in ch["favorites"]) == (iid in selected):
+                continue
+            added = iid in selected
+            if added:
+                ch["favorites"].add(MARK)
+            else:
+                ch["favorites"].discard(MARK)
+            if self.session:
+                try:
+                    self.session.record(ch["sat"], ch["id"], MARK, added)
+                except OSError:
+                    pass
+
+    def sort_by(self, column):
+        # Même colonne: ordre inversé
+        self.sort_reverse = not self.sort_reverse if column == self.sort_column else False
+        self.sort_column = column
+        for col, text in self.headings.items():
+            arrow = (" ▼" if self.sort_reverse else " ▲") if col == column else ""
+            self.tree.heading(col, text=text + arrow)
+        self.refresh_tree()
 
     def save_changes(self):
         if not os.path.exists(DB_FILE):
@@ -125,17 +199,27 @@ class ChannelEditorApp:
         if not selected_favs:
             messagebox.showinfo("Info", "No favorite list selected.")
 
-        # Appliquer aux chaînes sélectionnées dans le Treeview
-        for item in self.tree.selection():
-            ch_id = int(item)
-            c.execute("UPDATE program_table SET fav = 1 WHERE id = ?", (ch_id,))
+        # Appliquer aux chaînes sélectionnées (y compris celles masquées par la recherche)
+        for ch in self.by_id.values():
+            if MARK in ch["favorites"]:
+                c.execute("UPDATE program_table SET fav = 1 WHERE id = ?", (ch["id"],))
 
         conn.commit()
         conn.close()
 
         messagebox.showinfo("Done", f"Saved to {OUTPUT_DB}\nCopy to USB and restore on OTT750 receiver.")
 
+    def on_close(self):
+        # Snapshot de la session (remplace le journal) avant de quitter
+        if self.session:
+            try:
+                self.session.save({'channels': self.channels})
+            except OSError:
+                pass
+        self.root.destroy()
+
 if __name__ == "__main__":
+    profiling.install()
     root = tk.Tk()
     app = ChannelEditorApp(root)
     root.mainloop()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Traitement en lot d'un dossier de sauvegardes database.db (plusieurs récepteurs).
+
+Pour chaque base, en parallèle (pool de processus):
+  - enrichissement provider (enrich_database.enrich)
+  - export CSV des chaînes (export_channels.export_to_csv)
+  - lookup nom -> provider pour l'app Android (generate_provider_lookup)
+
+satellites_select.xml n'est analysé qu'une fois : le catalogue des
+transpondeurs est transmis à chaque processus à son démarrage (initializer)
+et partagé en lecture seule par toutes les bases qu'il traite.
+
+Sortie:
+    <out>/<nom_base>/database_enriched.db
+    <out>/<nom_base>/liste_chaines.csv
+    <out>/<nom_base>/channel_providers.json
+    <out>/<nom_base>/summary.json
+    <out>/batch_summary.json
+
+Usage:
+    python3 batch_process.py /chemin/sauvegardes -o /chemin/sortie --workers 4
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import enrich_database
+import export_channels
+import generate_provider_lookup
+import profiling
+
+SATELLITES_XML = enrich_database.SATELLITES_XML
+OUTPUT_DIR = '/home/kamel/OTT750/batch_output'
+
+# Catalogue des transpondeurs, positionné une fois par processus
+_transponders = None
+
+
+def _init_worker(transponders):
+    global _transponders
+    _transponders = transponders
+
+
+def provider_pairs(db_path):
+    """Paires (nom, provider) de la base enrichie, pour le lookup Android"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT name, provider FROM program_table WHERE provider != 'Other'").fetchall()
+    conn.close()
+    return rows
+
+
+def process_database(db_path, out_root):
+    """Traite une base (exécuté dans un processus du pool)"""
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    out_dir = os.path.join(out_root, name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    summary = {'database': db_path, 'output': out_dir, 'status': 'ok'}
+    start = time.perf_counter()
+    try:
+        enriched = os.path.join(out_dir, 'database_enriched.db')
+        # Les fonctions existantes affichent leur progression : silence dans les workers
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            summary['enrichment'] = enrich_database.enrich(db_path, enriched, _transponders)
+            summary['exported_channels'] = export_channels.export_to_csv(
+                enriched, os.path.join(out_dir, 'liste_chaines.csv'))
+        if summary['exported_channels'] is None:
+            # export_to_csv intercepte ses erreurs et ne les signale que sur la sortie
+            lines = log.getvalue().strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else "export CSV impossible")
+
+        lookup = generate_provider_lookup.build_lookup(provider_pairs(enriched))
+        generate_provider_lookup.save_lookup(lookup, os.path.join(out_dir, 'channel_providers.json'))
+        summary['lookup_entries'] = len(lookup)
+    except Exception as e:
+        summary['status'] = 'error'
+        summary['error'] = f"{type(e).__name__}: {e}"
+
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    with open(os.path.join(out_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def run_batch(db_paths, out_root, transponders, workers=None):
+    """Traite toutes les bases en parallèle, retourne les résumés dans l'ordre des entrées"""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(transponders,)) as pool:
+        futures = {pool.submit(process_database, path, out_root): path for path in db_paths}
+        for future in as_completed(futures):
+            summary = future.result()
+            results[futures[future]] = summary
+            status = '✅' if summary['status'] == 'ok' else '❌'
+            print(f"   {status} {os.path.basename(futures[future])} ({summary['seconds']:.2f}s)")
+    return [results[path] for path in db_paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traitement en lot de bases récepteur")
+    parser.add_argument('input_dir', help="Dossier contenant les sauvegardes *.db")
+    parser.add_argument('-o', '--output', default=OUTPUT_DIR, help="Dossier de sortie")
+    parser.add_argument('--xml', default=SATELLITES_XML, help="Catalogue satellites_select.xml")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (défaut: nb de CPU)")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("🛰️  Traitement en lot des bases récepteur")
+    print("=" * 60)
+
+    db_paths = sorted(glob.glob(os.path.join(args.input_dir, '*.db')))
+    if not db_paths:
+        print(f"❌ Aucune base *.db dans {args.input_dir}")
+        return 1
+
+    print(f"\n📁 Chargement de {args.xml}...")
+    with profiling.stage('load_xml'):
+        transponders = enrich_database.load_transponders_from_xml(args.xml)
+    print(f"   {len(transponders)} transponders avec provider chargés")
+
+    os.makedirs(args.output, exist_ok=True)
+    print(f"\n⚙️  {len(db_paths)} bases à traiter")
+    start = time.perf_counter()
+    with profiling.stage('batch'):
+        summaries = run_batch(db_paths, args.output, transponders, args.workers)
+    elapsed = time.perf_counter() - start
+
+    ok = [s for s in summaries if s['status'] == 'ok']
+    aggregate = {
+        'databases': len(summaries),
+        'succeeded': len(ok),
+        'failed': len(summaries) - len(ok),
+        'channels': sum(s['enrichment']['total'] for s in ok),
+        'with_provider': sum(s['enrichment']['found'] for s in ok),
+        'seconds': round(elapsed, 3),
+        'results': summaries,
+    }
+    summary_path = os.path.join(args.output, 'batch_summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(aggregate, f, ensure_ascii=False, indent=2)
+
+    print(f"\n📊 Résultats:")
+    print(f"   {'Base':<30} {'Chaînes':>8} {'Provider':>9} {'Lookup':>7} {'Temps':>8}")
+    for s in summaries:
+        label = os.path.basename(s['database'])[:30]
+        if s['status'] != 'ok':
+            print(f"   {label:<30} ❌ {s['error']}")
+            continue
+        e = s['enrichment']
+        print(f"   {label:<30} {e['total']:>8} {e['found']:>9} {s['lookup_entries']:>7} {s['seconds']:>7.2f}s")
+    print(f"\n   ✅ {aggregate['succeeded']}/{aggregate['databases']} bases en {elapsed:.2f}s")
+    print(f"💾 Résumé: {summary_path}")
+    return 0 if not aggregate['failed'] else 1
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
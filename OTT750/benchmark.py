@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Benchmarks des scripts OTT750 sur des bases synthétiques (10k, 50k, 200k programmes).
+
+Mesure le chargement (SQL et snapshot de session) / la recherche / l'export de l'éditeur de favoris,
+l'enrichissement provider, l'export CSV et les rapports analyze_*.
+Les scripts existants utilisent des chemins en constantes de module : ils
+sont redirigés vers les bases générées le temps de la mesure.
+
+Les résultats sont enregistrés en JSON (bench_results/) avec la révision git,
+et --compare affiche l'écart par rapport à un résultat précédent.
+
+Usage:
+    python3 benchmark.py
+    python3 benchmark.py --sizes 10000 --compare bench_results/ancien.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import analyze_db
+import analyze_favorites
+import analyze_favorites_detailed
+import enrich_database
+import export_channels
+import generate_test_db
+import profiling
+import session_cache
+
+try:
+    import editor_favoris
+except ImportError:  # tkinter absent
+    editor_favoris = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, 'bench_results')
+SATELLITES_XML = os.path.join(BASE_DIR, 'satellites_select.xml')
+
+# Au-delà de ce ratio (nouveau / ancien), un benchmark est signalé comme régression
+REGRESSION_THRESHOLD = 1.2
+
+
+@contextlib.contextmanager
+def patched(module, **values):
+    """Remplace temporairement des constantes de module (chemins)"""
+    saved = {name: getattr(module, name) for name in values}
+    for name, value in values.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+class _HeadlessTree:
+    """Remplaçant minimal du Treeview pour exécuter refresh_tree sans affichage"""
+
+    def __init__(self):
+        self.items = {}
+        self.counter = 0
+
+    def get_children(self):
+        return list(self.items)
+
+    def delete(self, item):
+        del self.items[item]
+
+    def insert(self, parent, index, values=()):
+        self.counter += 1
+        item_id = f'I{self.counter}'
+        self.items[item_id] = values
+        return item_id
+
+    def set(self, item_id, column=None, value=None):
+        pass
+
+
+class _SilentMessagebox:
+    @staticmethod
+    def showinfo(*args, **kwargs):
+        pass
+
+    showerror = showwarning = showinfo
+
+
+class _Var:
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def headless_editor(db_path):
+    """Instance de SatEditorApp sans fenêtre Tk, connectée à db_path"""
+    app = editor_favoris.SatEditorApp.__new__(editor_favoris.SatEditorApp)
+    app.conn = sqlite3.connect(db_path)
+    app.cursor = app.conn.cursor()
+    app.cache = {}
+    app.current_sat_id = None
+    app.current_channels = []
+    app.tree_item_map = {}
+    app.filtered_indices = []
+    app.lang_index = None
+    app.session = None
+    app.store = None
+    app.quality_ids = None
+    app.tree = _HeadlessTree()
+    app.search_var = _Var()
+    return app
+
+
+def timed(func, repeat):
+    """Meilleur temps sur `repeat` exécutions (sortie console masquée)"""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 4)
+
+
+def run_size(db_path, work_dir, repeat):
+    """Exécute tous les benchmarks sur une base"""
+    results = {}
+
+    if editor_favoris is not None:
+        sat_ids = list(editor_favoris.SAT_MAP.values())
+
+        def editor_load():
+            app = headless_editor(db_path)
+            for sat_id in sat_ids:
+                app.get_channels_for_sat(sat_id)
+            app.conn.close()
+
+        app = headless_editor(db_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for sat_id in sat_ids:
+                app.get_channels_for_sat(sat_id)
+        app.current_channels = [ch for sat_id in sat_ids for ch in app.cache[sat_id]]
+
+        def editor_search():
+            for query in ['', 'sport', 'hd', 'rai 2', 'zzz']:
+                app.search_var.value = query
+                app.refresh_tree()
+
+        def editor_export():
+            with patched(editor_favoris, DB_PATH=db_path,
+                         NEW_DB_PATH=os.path.join(work_dir, 'editor_export.db'),
+                         messagebox=_SilentMessagebox):
+                app.save_new_db()
+
+        session = session_cache.EditorSession(os.path.join(work_dir, os.path.basename(db_path)), 'bench')
+        shutil.copy2(db_path, session.db_path)
+        session.save({'cache': app.cache})
+
+        def editor_restore():
+            session_cache.EditorSession(session.db_path, 'bench').restore()
+
+        results['editor_load'] = timed(editor_load, repeat)
+        results['editor_restore'] = timed(editor_restore, repeat)
+        results['editor_search'] = timed(editor_search, repeat)
+        results['editor_export'] = timed(editor_export, repeat)
+        app.conn.close()
+
+    def enrichment():
+        with patched(enrich_database, DB_PATH=db_path,
+                     DB_OUTPUT=os.path.join(work_dir, 'enriched.db'),
+                     SATELLITES_XML=SATELLITES_XML):
+            enrich_database.main()
+
+    def csv_export():
+        with patched(export_channels, db_path=db_path,
+                     csv_path=os.path.join(work_dir, 'liste_chaines.csv')):
+            export_channels.export_to_csv()
+
+    def analyze():
+        for module, func in [(analyze_db, analyze_db.analyze_db),
+                             (analyze_favorites, analyze_favorites.analyze_favorites),
+                             (analyze_favorites_detailed,
+                              analyze_favorites_detailed.analyze_favorites_detailed)]:
+            with patched(module, db_path=db_path):
+                func()
+
+    results['enrichment'] = timed(enrichment, repeat)
+    results['csv_export'] = timed(csv_export, repeat)
+    results['analyze_reports'] = timed(analyze, repeat)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, previous_path):
+    """Affiche les écarts avec un fichier de résultats précédent"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+
+    print(f"\n📈 Comparaison avec {previous_path} (révision {previous.get('revision')})")
+    regressions = 0
+    for size, benches in current['results'].items():
+        old_benches = previous.get('results', {}).get(size, {})
+        for name, seconds in benches.items():
+            old = old_benches.get(name)
+            if not old:
+                continue
+            ratio = seconds / old
+            flag = '⚠️ ' if ratio > REGRESSION_THRESHOLD else '  '
+            regressions += ratio > REGRESSION_THRESHOLD
+            print(f"   {flag}{size:>7} {name:<18} {old:>9.3f}s → {seconds:>9.3f}s (x{ratio:.2f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des scripts OTT750")
+    parser.add_argument('--sizes', nargs='+', type=int, default=generate_test_db.DEFAULT_SIZES)
+    parser.add_argument('--db-dir', default=generate_test_db.OUTPUT_DIR,
+                        help="Dossier des bases synthétiques (générées si absentes)")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre d'exécutions (meilleur temps)")
+    parser.add_argument('--output', help="Fichier JSON de résultats")
+    parser.add_argument('--compare', help="Résultats précédents à comparer")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("⏱️  Benchmarks OTT750")
+    print("=" * 60)
+
+    os.makedirs(args.db_dir, exist_ok=True)
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'results': {},
+    }
+
+    for size in args.sizes:
+        db_path = generate_test_db.db_path_for(args.db_dir, size)
+        if not os.path.exists(db_path):
+            print(f"\n🛠️  Génération de {db_path}...")
+            generate_test_db.generate(db_path, size)
+
+        print(f"\n📺 {size} programmes")
+        with tempfile.TemporaryDirectory() as work_dir:
+            results = run_size(db_path, work_dir, args.repeat)
+        report['results'][str(size)] = results
+        for name, seconds in results.items():
+            print(f"   {name:<18} {seconds:>9.3f}s")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{report['revision']}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Résultats: {output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare)
+        if regressions:
+            print(f"\n⚠️  {regressions} régression(s) au-delà de x{REGRESSION_THRESHOLD}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Couverture des transpondeurs de la base par rapport au catalogue XML,
+pour tous les satellites de satellite_table.
+
+Pour chaque satellite, les transpondeurs de la base et ceux du catalogue
+(même position orbitale à --pos-tolerance près) sont triés par
+(polarisation, fréquence) puis comparés en un seul balayage fusionné :
+  - correspondants : présents des deux côtés (à --tolerance MHz près)
+  - manquants      : dans le catalogue mais pas dans la base (non scannés)
+  - en trop        : dans la base mais absents du catalogue
+
+Positions: angle de la base en dixièmes de degré, sat_dir = 1 pour l'Ouest ;
+le catalogue utilise des positions signées (Ouest négatif).
+
+Usage:
+    python3 coverage_report.py
+    python3 coverage_report.py --tolerance 5 --csv couverture.csv
+    python3 coverage_report.py --ignore-pol --examples 20
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+
+import profiling
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+SATELLITES_XML = '/home/kamel/OTT750/satellites_select.xml'
+
+DEFAULT_TOLERANCE = 10      # MHz, comme enrich_database.find_provider
+DEFAULT_POS_TOLERANCE = 3   # dixièmes de degré (catalogue 190 pour Astra 19.2E)
+
+POL_LABELS = {0: 'H', 1: 'V', 2: 'L', 3: 'R'}
+
+
+def db_position(angle, sat_dir):
+    """Position signée (dixièmes de degré, Ouest négatif) d'un satellite de la base"""
+    return -angle if sat_dir == 1 else angle
+
+
+def load_catalog(xml_path):
+    """{position: (noms, [(pol, freq MHz, provider)])} depuis satellites.xml"""
+    catalog = {}
+    for sat in ET.parse(xml_path).getroot().iter('sat'):
+        position = int(sat.get('position', 0))
+        names, transponders = catalog.setdefault(position, ([], []))
+        names.append(sat.get('name', ''))
+        for tp in sat.iter('transponder'):
+            freq = int(tp.get('frequency', 0)) // 1000
+            if freq > 0:
+                transponders.append((int(tp.get('polarization', 0)), freq, tp.get('provider', '')))
+    return catalog
+
+
+def load_db_transponders(conn):
+    """[(sat_id, nom, position, [(pol, freq)])] pour tous les satellites de la base"""
+    satellites = {}
+    for sat_id, name, angle, sat_dir in conn.execute(
+            "SELECT id, name, angle, sat_dir FROM satellite_table ORDER BY id"):
+        satellites[sat_id] = (sat_id, name.strip(), db_position(int(angle), int(sat_dir)), [])
+    for sat_id, pol, freq in conn.execute(
+            "SELECT sat_id, pol, freq FROM satellite_transponder_table"):
+        if sat_id in satellites:
+            satellites[sat_id][3].append((int(pol), int(freq)))
+    return list(satellites.values())
+
+
+def catalog_for(catalog, position, pos_tolerance):
+    """Transpondeurs du catalogue aux positions proches, noms des satellites retenus"""
+    names, transponders = [], []
+    for pos, (sat_names, tps) in catalog.items():
+        if abs(pos - position) <= pos_tolerance:
+            names.extend(sat_names)
+            transponders.extend(tps)
+    return names, transponders
+
+
+def sweep(db_tps, xml_tps, tolerance, use_pol=True):
+    """Balayage fusionné de deux listes triées.
+
+    Retourne (correspondants [(pol, freq base, freq catalogue, provider)],
+    manquants [(pol, freq, provider)], en trop [(pol, freq)]).
+    """
+    # Doublons (tuners, satellites voisins du catalogue) retirés avant le tri
+    db_sorted = sorted({(pol if use_pol else 0, freq) for pol, freq in db_tps})
+    xml_unique = {}
+    for pol, freq, provider in xml_tps:
+        key = (pol if use_pol else 0, freq)
+        if not xml_unique.get(key):
+            xml_unique[key] = provider
+    xml_sorted = sorted(xml_unique.items())
+
+    matched, missing, extra = [], [], []
+    i = j = 0
+    while i < len(db_sorted) and j < len(xml_sorted):
+        db_pol, db_freq = db_sorted[i]
+        (xml_pol, xml_freq), provider = xml_sorted[j]
+        if db_pol != xml_pol:
+            # Polarisations différentes: la plus petite est épuisée
+            if db_pol < xml_pol:
+                extra.append(db_sorted[i])
+                i += 1
+            else:
+                missing.append((xml_pol, xml_freq, provider))
+                j += 1
+            continue
+
+        delta = db_freq - xml_freq
+        if abs(delta) <= tolerance:
+            # Si l'entrée suivante du catalogue est plus proche, celle-ci reste sans correspondance
+            if j + 1 < len(xml_sorted):
+                (next_pol, next_freq), _ = xml_sorted[j + 1]
+                if next_pol == db_pol and abs(db_freq - next_freq) < abs(delta):
+                    missing.append((xml_pol, xml_freq, provider))
+                    j += 1
+                    continue
+            matched.append((db_pol, db_freq, xml_freq, provider))
+            i += 1
+            j += 1
+        elif delta < 0:
+            extra.append(db_sorted[i])
+            i += 1
+        else:
+            missing.append((xml_pol, xml_freq, provider))
+            j += 1
+
+    extra.extend(db_sorted[i:])
+    missing.extend((pol, freq, provider) for (pol, freq), provider in xml_sorted[j:])
+    return matched, missing, extra
+
+
+def coverage(conn, catalog, tolerance=DEFAULT_TOLERANCE, pos_tolerance=DEFAULT_POS_TOLERANCE, use_pol=True):
+    """Rapport de couverture par satellite de la base"""
+    report = []
+    for sat_id, name, position, db_tps in load_db_transponders(conn):
+        xml_names, xml_tps = catalog_for(catalog, position, pos_tolerance)
+        matched, missing, extra = sweep(db_tps, xml_tps, tolerance, use_pol)
+        report.append({
+            'sat_id': sat_id,
+            'name': name,
+            'position': position,
+            'catalog': xml_names,
+            'matched': matched,
+            'missing': missing,
+            'extra': extra,
+        })
+    return report
+
+
+def format_position(position):
+    return f"{abs(position) / 10:.1f}{'W' if position < 0 else 'E'}"
+
+
+def print_report(report, examples, show_empty=False):
+    for sat in report:
+        matched, missing, extra = sat['matched'], sat['missing'], sat['extra']
+        db_count = len(matched) + len(extra)
+        if not db_count and not show_empty:
+            continue
+        print(f"\n🌍 {sat['name']} ({format_position(sat['position'])})")
+        if not sat['catalog']:
+            print(f"   Base: {db_count} transpondeurs, absent du catalogue")
+            continue
+        print(f"   Catalogue: {' + '.join(sat['catalog'])}")
+        print(f"   Base: {db_count}  Catalogue: {len(matched) + len(missing)}")
+        print(f"   ✅ Correspondants: {len(matched)} ({100 * len(matched) / db_count if db_count else 0:.1f}% de la base)")
+        print(f"   ❌ Manquants (catalogue, non scannés): {len(missing)}")
+        if missing[:examples]:
+            print(f"      {', '.join(f'{f}{POL_LABELS.get(p, p)}' for p, f, _ in missing[:examples])}")
+        print(f"   ➕ En trop (base, hors catalogue): {len(extra)}")
+        if extra[:examples]:
+            print(f"      {', '.join(f'{f}{POL_LABELS.get(p, p)}' for p, f in extra[:examples])}")
+
+
+def write_csv(report, path, use_pol=True):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['satellite', 'position', 'statut', 'polarisation', 'freq_base', 'freq_catalogue',
+                         'ecart', 'provider'])
+        pol_label = (lambda p: POL_LABELS.get(p, p)) if use_pol else (lambda p: '')
+        for sat in report:
+            label, position = sat['name'], format_position(sat['position'])
+            for pol, db_freq, xml_freq, provider in sat['matched']:
+                writer.writerow([label, position, 'correspondant', pol_label(pol), db_freq, xml_freq,
+                                 db_freq - xml_freq, provider])
+            for pol, xml_freq, provider in sat['missing']:
+                writer.writerow([label, position, 'manquant', pol_label(pol), '', xml_freq, '', provider])
+            for pol, db_freq in sat['extra']:
+                writer.writerow([label, position, 'en_trop', pol_label(pol), db_freq, '', '', ''])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Couverture des transpondeurs base / catalogue XML")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--xml', default=SATELLITES_XML, help="Catalogue satellites.xml")
+    parser.add_argument('--tolerance', type=int, default=DEFAULT_TOLERANCE, help="Écart de fréquence toléré (MHz)")
+    parser.add_argument('--pos-tolerance', type=int, default=DEFAULT_POS_TOLERANCE,
+                        help="Écart de position orbitale toléré (dixièmes de degré)")
+    parser.add_argument('--ignore-pol', action='store_true', help="Comparer les fréquences sans la polarisation")
+    parser.add_argument('--examples', type=int, default=10, help="Fréquences listées par catégorie")
+    parser.add_argument('--all', action='store_true', help="Afficher aussi les satellites sans transpondeur")
+    parser.add_argument('--csv', help="Écrire le détail par transpondeur en CSV")
+    args = parser.parse_args(argv)
+
+    with profiling.stage('load_xml'):
+        catalog = load_catalog(args.xml)
+    conn = sqlite3.connect(args.db)
+    with profiling.stage('sweep'):
+        report = coverage(conn, catalog, args.tolerance, args.pos_tolerance, not args.ignore_pol)
+    conn.close()
+
+    print(f"🔍 Couverture base / catalogue (±{args.tolerance} MHz"
+          f"{', polarisation ignorée' if args.ignore_pol else ''})")
+    print_report(report, args.examples, args.all)
+
+    covered = [sat for sat in report if sat['catalog']]
+    uncovered = [sat for sat in report if not sat['catalog'] and sat['extra']]
+    totals = [sum(len(sat[k]) for sat in covered) for k in ('matched', 'missing', 'extra')]
+    print(f"\n📊 Total ({len(covered)} satellites au catalogue): {totals[0]} correspondants, "
+          f"{totals[1]} manquants, {totals[2]} en trop")
+    if uncovered:
+        print(f"   {len(uncovered)} satellites de la base absents du catalogue "
+              f"({sum(len(sat['extra']) for sat in uncovered)} transpondeurs)")
+
+    if args.csv:
+        write_csv(report, args.csv, not args.ignore_pol)
+        print(f"💾 CSV: {args.csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
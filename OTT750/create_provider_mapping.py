@@ -7,6 +7,7 @@ en utilisant les données de la database.db et les infos de packages par fréque
 import sqlite3
 import json
 import re
+import profiling
 
 DB_PATH = '/home/kamel/OTT750/database.db'
 OUTPUT_JSON = '/home/kamel/OTT750/OTT750_Android/app/src/main/assets/channel_providers.json'
@@ -307,4 +308,5 @@ def main():
 
 
 if __name__ == '__main__':
+    profiling.install()
     main()
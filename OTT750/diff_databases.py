@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Script pour comparer deux snapshots de la base du récepteur (database.db,
+database_new.db, database_enriched.db...) ligne par ligne.
+
+Les deux fichiers sont attachés dans une seule connexion SQLite, puis chaque
+table est parcourue en un seul passage, triée par clé primaire, des deux côtés
+en parallèle (merge join). Chaque ligne est hachée : seules les lignes dont le
+hash diffère sont comparées colonne par colonne.
+
+Usage:
+    python3 diff_databases.py database.db database_new.db
+    python3 diff_databases.py database.db database_enriched.db --summary
+    python3 diff_databases.py database.db database_new.db --tables fav_prog_table
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+import profiling
+
+DB_OLD = '/home/kamel/OTT750/database.db'
+DB_NEW = '/home/kamel/OTT750/database_new.db'
+
+# Nombre de lignes lues par fetchmany (lecture en flux, mémoire constante)
+BATCH_SIZE = 2000
+
+# Nombre max de lignes détaillées par table et par catégorie (mode détaillé)
+DEFAULT_LIMIT = 20
+
+
+def get_tables(conn, schema):
+    """Liste les tables utilisateur d'un schéma attaché"""
+    rows = conn.execute(
+        f"SELECT name FROM {schema}.sqlite_master "
+        "WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def get_columns(conn, schema, table):
+    """Retourne (colonnes, colonnes de clé primaire) d'une table"""
+    info = conn.execute(f'PRAGMA {schema}.table_info("{table}")').fetchall()
+    columns = [col[1] for col in info]
+    pk = [col[1] for col in sorted(info, key=lambda c: c[5]) if col[5] > 0]
+    return columns, pk
+
+
+def iter_rows(conn, schema, table, key_expr, columns):
+    """Parcourt une table triée par clé, par lots (générateur de (clé, valeurs))"""
+    cols_sql = ', '.join(f'"{c}"' for c in columns)
+    cursor = conn.execute(
+        f'SELECT {key_expr}, {cols_sql} FROM {schema}."{table}" ORDER BY {key_expr}'
+    )
+    while True:
+        batch = cursor.fetchmany(BATCH_SIZE)
+        if not batch:
+            break
+        for row in batch:
+            yield row[0], row[1:]
+
+
+def diff_table(conn, table, limit):
+    """Compare une table entre main (ancienne) et new (nouvelle) en un passage"""
+    old_cols, old_pk = get_columns(conn, 'main', table)
+    new_cols, _ = get_columns(conn, 'new', table)
+
+    common = [c for c in old_cols if c in new_cols]
+    result = {
+        'table': table,
+        'added': 0,
+        'removed': 0,
+        'modified': 0,
+        'unchanged': 0,
+        'columns_added': [c for c in new_cols if c not in old_cols],
+        'columns_removed': [c for c in old_cols if c not in new_cols],
+        'column_changes': {},  # colonne -> nombre de lignes modifiées
+        'samples': {'added': [], 'removed': [], 'modified': []},
+    }
+
+    # Clé primaire simple ou rowid (box_info_table, android_metadata n'en ont pas)
+    key_expr = f'"{old_pk[0]}"' if len(old_pk) == 1 else 'rowid'
+
+    old_iter = iter_rows(conn, 'main', table, key_expr, common)
+    new_iter = iter_rows(conn, 'new', table, key_expr, common)
+    sentinel = (None, None)
+    old_key, old_vals = next(old_iter, sentinel)
+    new_key, new_vals = next(new_iter, sentinel)
+
+    samples = result['samples']
+
+    while old_key is not None or new_key is not None:
+        if new_key is None or (old_key is not None and old_key < new_key):
+            result['removed'] += 1
+            if len(samples['removed']) < limit:
+                samples['removed'].append(old_key)
+            old_key, old_vals = next(old_iter, sentinel)
+        elif old_key is None or new_key < old_key:
+            result['added'] += 1
+            if len(samples['added']) < limit:
+                samples['added'].append(new_key)
+            new_key, new_vals = next(new_iter, sentinel)
+        else:
+            if old_vals == new_vals:
+                result['unchanged'] += 1
+            else:
+                result['modified'] += 1
+                changed = []
+                for col, a, b in zip(common, old_vals, new_vals):
+                    if a != b:
+                        changed.append((col, a, b))
+                        result['column_changes'][col] = result['column_changes'].get(col, 0) + 1
+                if len(samples['modified']) < limit:
+                    samples['modified'].append((old_key, changed))
+            old_key, old_vals = next(old_iter, sentinel)
+            new_key, new_vals = next(new_iter, sentinel)
+
+    return result
+
+
+def diff_databases(old_path, new_path, tables=None, limit=DEFAULT_LIMIT):
+    """Compare deux bases et retourne (résultats par table, tables ajoutées, tables supprimées)"""
+    conn = sqlite3.connect(f'file:{old_path}?mode=ro', uri=True)
+    try:
+        conn.execute("ATTACH DATABASE ? AS new", (f'file:{new_path}?mode=ro',))
+    except sqlite3.OperationalError:
+        # Certaines versions de sqlite n'acceptent pas les URI dans ATTACH
+        conn.execute("ATTACH DATABASE ? AS new", (new_path,))
+
+    old_tables = get_tables(conn, 'main')
+    new_tables = get_tables(conn, 'new')
+
+    tables_added = [t for t in new_tables if t not in old_tables]
+    tables_removed = [t for t in old_tables if t not in new_tables]
+
+    to_compare = [t for t in old_tables if t in new_tables]
+    if tables:
+        to_compare = [t for t in to_compare if t in tables]
+
+    results = [diff_table(conn, table, limit) for table in to_compare]
+    conn.close()
+    return results, tables_added, tables_removed
+
+
+def print_report(results, tables_added, tables_removed, summary):
+    """Affiche le rapport de différences"""
+    if tables_added:
+        print(f"➕ Tables ajoutées: {', '.join(tables_added)}")
+    if tables_removed:
+        print(f"➖ Tables supprimées: {', '.join(tables_removed)}")
+
+    print(f"\n{'Table':<30} {'Ajoutées':>9} {'Suppr.':>9} {'Modif.':>9} {'Identiques':>11}")
+    print("-" * 72)
+    for r in results:
+        print(f"{r['table']:<30} {r['added']:>9} {r['removed']:>9} {r['modified']:>9} {r['unchanged']:>11}")
+
+    for r in results:
+        has_changes = (r['added'] or r['removed'] or r['modified']
+                       or r['columns_added'] or r['columns_removed'])
+        if not has_changes:
+            continue
+
+        print(f"\n📋 {r['table']}")
+        if r['columns_added']:
+            print(f"   Colonnes ajoutées: {', '.join(r['columns_added'])}")
+        if r['columns_removed']:
+            print(f"   Colonnes supprimées: {', '.join(r['columns_removed'])}")
+        if r['column_changes']:
+            changes = sorted(r['column_changes'].items(), key=lambda x: -x[1])
+            print("   Colonnes modifiées: " + ', '.join(f"{c} ({n})" for c, n in changes))
+
+        if summary:
+            continue
+
+        samples = r['samples']
+        if samples['added']:
+            print(f"   ➕ Clés ajoutées: {samples['added']}")
+        if samples['removed']:
+            print(f"   ➖ Clés supprimées: {samples['removed']}")
+        for key, changed in samples['modified']:
+            detail = ', '.join(f"{col}: {a!r} → {b!r}" for col, a, b in changed)
+            print(f"   ✏️  {key}: {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff ligne à ligne entre deux bases du récepteur")
+    parser.add_argument('old', nargs='?', default=DB_OLD, help="Base de référence")
+    parser.add_argument('new', nargs='?', default=DB_NEW, help="Base à comparer")
+    parser.add_argument('--summary', action='store_true',
+                        help="Compteurs uniquement (grandes tables: audio_table, program_table...)")
+    parser.add_argument('--tables', nargs='+', help="Limiter la comparaison à ces tables")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help="Nombre max de lignes détaillées par table")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("🔍 Comparaison de bases du récepteur")
+    print("=" * 60)
+    print(f"   Ancienne: {args.old}")
+    print(f"   Nouvelle: {args.new}")
+
+    start = time.perf_counter()
+    try:
+        results, tables_added, tables_removed = diff_databases(
+            args.old, args.new, tables=args.tables,
+            limit=0 if args.summary else args.limit)
+    except sqlite3.Error as e:
+        print(f"❌ Erreur: {e}")
+        return 1
+
+    print_report(results, tables_added, tables_removed, args.summary)
+    print(f"\n⏱️  Terminé en {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -3,6 +3,12 @@ import shutil
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import profiling
+from language_profile import LanguageIndex, language_label
+from session_cache import EditorSession
+from program_store import ProgramStore
+from favorites_rules import RuleError
+from natural_sort import natural_key
 
 # Configuration
 # Detect environment for paths
@@ -38,6 +44,9 @@ FAV_MAP = {
 CHECKED = "☒"
 UNCHECKED = "☐"
 
+# Language filter value meaning "no filter"
+ALL_LANGUAGES = "Toutes"
+
 class SatEditorApp:
     def __init__(self, root):
         self.root = root
@@ -53,10 +62,17 @@ class SatEditorApp:
         self.current_channels = [] # List of currently loaded channels for the satellite
         self.tree_item_map = {} # Map Treeview Item ID -> Index in self.current_channels (or filtered list)
         self.filtered_indices = [] # Indices of channels currently shown (after filter)
+        self.lang_index = None # Language profile (audio / subtitles) per program id
+        self.session = None # Snapshot + journal of the previous session (same DB hash)
+        self.store = None # Columnar program store, loaded on first use
+        self.quality_ids = None # Program ids matching the quality query (None = no filter)
+        self.sort_column = None # Column clicked in the Treeview header
+        self.sort_reverse = False
 
         self.apply_dark_theme()
         self.load_db_connection()
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def apply_dark_theme(self):
         style = ttk.Style()
@@ -94,35 +110,43 @@ class SatEditorApp:
             self.conn = sqlite3.connect(DB_PATH)
             self.cursor = self.conn.cursor()
             print(f"Connexion établie : {DB_PATH}")
+            self.lang_index = LanguageIndex.load(DB_PATH, self.conn)
+
+            # Restore channels + favorites (and journaled edits) if the DB is unchanged
+            self.session = EditorSession(DB_PATH, 'editor_favoris')
+            snapshot = self.session.restore()
+            if snapshot:
+                self.cache = snapshot['cache']
+                print(f"Session restaurée : {len(self.cache)} satellites")
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible d'ouvrir la base de données:\n{e}")
 
+    def get_store(self):
+        # One SQL pass for every satellite; later loads and queries run in memory
+        if self.store is None:
+            self.store = ProgramStore.load(DB_PATH, self.conn)
+        return self.store
+
     def get_channels_for_sat(self, sat_id):
         if sat_id in self.cache:
             return self.cache[sat_id]
 
         print(f"Chargement depuis la DB pour SatID {sat_id}...")
-        query = """
-        SELECT p.id, p.name 
-        FROM program_table p
-        JOIN satellite_transponder_table tp ON p.tp_id = tp.id
-        WHERE tp.sat_id = ?
-        ORDER BY p.name
-        """
-        self.cursor.execute(query, (sat_id,))
-        rows = self.cursor.fetchall()
+        store = self.get_store()
+        rows = store.where(f"sat_id = {sat_id}")
+        ids, names = store.columns['id'], store.columns['name']
         
         channel_list = []
-        for pid, name in rows:
-            self.cursor.execute("SELECT fav_group_id FROM fav_prog_table WHERE prog_id=?", (pid,))
-            favs = {row[0] for row in self.cursor.fetchall()}
-            
+        for i in sorted(rows, key=lambda i: natural_key(names[i])):
+            pid = ids[i]
             channel_list.append({
                 'id': pid,
-                'name': name,
-                'favs': favs
+                'name': names[i],
+                'favs': set(store.favorites.get(pid, ()))
             })
         
+        if self.session:
+            self.session.apply_pending(sat_id, channel_list)
         self.cache[sat_id] = channel_list
         return channel_list
 
@@ -145,6 +169,32 @@ class SatEditorApp:
         self.search_entry.pack(side=tk.LEFT, padx=5)
         self.search_entry.bind("<KeyRelease>", self.on_search)
 
+        # Quality Query (e.g. "height >= 720 and fta = 1"), see program_store.py
+        ttk.Label(top_frame, text="Requête:").pack(side=tk.LEFT, padx=(20, 5))
+        self.query_var = tk.StringVar()
+        query_entry = ttk.Entry(top_frame, textvariable=self.query_var, width=25)
+        query_entry.pack(side=tk.LEFT, padx=5)
+        query_entry.bind("<Return>", self.on_query)
+
+        # Language Filters (audio track / subtitles)
+        audio_langs = [ALL_LANGUAGES]
+        sub_langs = [ALL_LANGUAGES]
+        if self.lang_index:
+            audio_langs += [language_label(c) for c in self.lang_index.audio_languages()]
+            sub_langs += [language_label(c) for c in self.lang_index.subtitle_languages()]
+
+        ttk.Label(top_frame, text="Audio:").pack(side=tk.LEFT, padx=(20, 5))
+        self.audio_var = tk.StringVar(value=ALL_LANGUAGES)
+        audio_combo = ttk.Combobox(top_frame, textvariable=self.audio_var, values=audio_langs, state="readonly", width=8)
+        audio_combo.pack(side=tk.LEFT, padx=5)
+        audio_combo.bind("<<ComboboxSelected>>", self.on_search)
+
+        ttk.Label(top_frame, text="Sous-titres:").pack(side=tk.LEFT, padx=(20, 5))
+        self.sub_var = tk.StringVar(value=ALL_LANGUAGES)
+        sub_combo = ttk.Combobox(top_frame, textvariable=self.sub_var, values=sub_langs, state="readonly", width=8)
+        sub_combo.pack(side=tk.LEFT, padx=5)
+        sub_combo.bind("<<ComboboxSelected>>", self.on_search)
+
         # Export Button
         save_btn = ttk.Button(top_frame, text="Exporter DB", command=self.save_new_db)
         save_btn.pack(side=tk.RIGHT, padx=5)
@@ -161,11 +211,11 @@ class SatEditorApp:
         self.tree.configure(yscrollcommand=vsb.set)
         self.tree.pack(fill=tk.BOTH, expand=True)
 
-        self.tree.heading("name", text="Chaîne")
+        self.tree.heading("name", text="Chaîne", command=lambda: self.sort_by("name"))
         self.tree.column("name", width=300, anchor="w")
         
         for label in FAV_LABELS:
-            self.tree.heading(label, text=label)
+            self.tree.heading(label, text=label, command=lambda c=label: self.sort_by(c))
             self.tree.column(label, width=60, anchor="center")
 
         # Bindings
@@ -187,12 +237,57 @@ class SatEditorApp:
         self.current_channels = self.get_channels_for_sat(sat_id)
         print(f"Chargé {len(self.current_channels)} chaînes pour {sat_name}")
         
-        # Refresh Display
-        self.refresh_tree()
+        # Keep the sort shown on the header (refreshes the display)
+        if self.sort_column:
+            self.sort_by(self.sort_column, toggle=False)
+        else:
+            self.refresh_tree()
 
     def on_search(self, event):
         self.refresh_tree()
 
+    def sort_by(self, column, toggle=True):
+        # Click again on the same header to reverse; stable sort keeps the previous order for ties.
+        # toggle=False re-applies the current sort (new satellite loaded)
+        if toggle:
+            self.sort_reverse = not self.sort_reverse if column == self.sort_column else False
+        self.sort_column = column
+
+        if column == "name":
+            key = lambda ch: natural_key(ch['name'])
+        else:
+            fav_id = FAV_MAP[column]
+            key = lambda ch: (fav_id not in ch['favs'], natural_key(ch['name']))
+        self.current_channels.sort(key=key, reverse=self.sort_reverse)
+
+        arrow = " ▼" if self.sort_reverse else " ▲"
+        self.tree.heading("name", text="Chaîne" + (arrow if column == "name" else ""))
+        for label in FAV_LABELS:
+            self.tree.heading(label, text=label + (arrow if column == label else ""))
+        self.refresh_tree()
+
+    def on_query(self, event):
+        query = self.query_var.get().strip()
+        if not query:
+            self.quality_ids = None
+        else:
+            try:
+                store = self.get_store()
+                self.quality_ids = store.ids(store.where(query))
+            except RuleError as e:
+                messagebox.showerror("Requête invalide", str(e))
+                return
+        self.refresh_tree()
+
+    def language_filter_ids(self):
+        # Program ids matching the audio / subtitle filters (None = no filter)
+        if not self.lang_index or not hasattr(self, 'audio_var'):
+            return None
+        codes = {language_label(c): c for c in self.lang_index.languages()}
+        audio = codes.get(self.audio_var.get())
+        subtitle = codes.get(self.sub_var.get())
+        return self.lang_index.query(audio=audio, subtitle=subtitle)
+
     def refresh_tree(self):
         # Clear Tree
         for item in self.tree.get_children():
@@ -201,11 +296,16 @@ class SatEditorApp:
         self.filtered_indices.clear()
 
         query = self.search_var.get().lower()
+        allowed = self.language_filter_ids()
         
         # Filter and Populate
         for idx, ch in enumerate(self.current_channels):
             if query and query not in ch['name'].lower():
                 continue
+            if allowed is not None and ch['id'] not in allowed:
+                continue
+            if self.quality_ids is not None and ch['id'] not in self.quality_ids:
+                continue
                 
             self.filtered_indices.append(idx)
             
@@ -250,6 +350,12 @@ class SatEditorApp:
             new_val = CHECKED
             
         self.tree.set(item_id, column=fav_label, value=new_val)
+        self.record_edit(ch_data, fav_id, new_val == CHECKED)
+
+    def record_edit(self, ch_data, fav_id, added):
+        # Journal the edit right away so a crash loses nothing
+        if self.session:
+            self.session.record(self.current_sat_id, ch_data['id'], fav_id, added)
 
     def open_fav_dialog(self):
         selected_items = self.tree.selection()
@@ -298,11 +404,13 @@ class SatEditorApp:
                     if fav_id not in ch_data['favs']:
                         ch_data['favs'].add(fav_id)
                         self.tree.set(item_id, column=group_label, value=CHECKED)
+                        self.record_edit(ch_data, fav_id, True)
                         count += 1
                 else:
                     if fav_id in ch_data['favs']:
                         ch_data['favs'].remove(fav_id)
                         self.tree.set(item_id, column=group_label, value=UNCHECKED)
+                        self.record_edit(ch_data, fav_id, False)
                         count += 1
             
             # messagebox.showinfo("Info", f"{count} chaînes mises à jour ({action}).")
@@ -348,7 +456,17 @@ class SatEditorApp:
         except Exception as e:
             messagebox.showerror("Erreur de sauvegarde", str(e))
 
+    def on_close(self):
+        # Snapshot the session (replaces the journal) before quitting
+        if self.session:
+            try:
+                self.session.save({'cache': self.cache})
+            except OSError as e:
+                print(f"Snapshot de session non écrit : {e}")
+        self.root.destroy()
+
 if __name__ == "__main__":
+    profiling.install()
     root = tk.Tk()
     app = SatEditorApp(root)
     root.mainloop()
@@ -8,6 +8,7 @@ import sqlite3
 import xml.etree.ElementTree as ET
 import os
 import shutil
+import profiling
 
 DB_PATH = '/home/kamel/OTT750/database.db'
 DB_OUTPUT = '/home/kamel/OTT750/database_enriched.db'
@@ -68,22 +69,16 @@ def find_provider(transponders, angle, freq):
     return None
 
 
-def main():
-    print("=" * 60)
-    print("🛰️  Enrichissement de database.db avec providers")
-    print("=" * 60)
-    
-    # Charger les transponders du XML
-    print(f"\n📁 Chargement de {SATELLITES_XML}...")
-    transponders = load_transponders_from_xml(SATELLITES_XML)
-    print(f"   {len(transponders)} transponders avec provider chargés")
-    
-    # Copier la base de données
-    print(f"\n📁 Copie de {DB_PATH} vers {DB_OUTPUT}...")
-    shutil.copy2(DB_PATH, DB_OUTPUT)
+def enrich(db_path, db_output, transponders):
+    """Copie db_path vers db_output et renseigne program_table.provider.
+
+    Retourne les stats {'total', 'found', 'not_found'}.
+    """
+    with profiling.stage('copy_db'):
+        shutil.copy2(db_path, db_output)
     
     # Ouvrir la copie
-    conn = sqlite3.connect(DB_OUTPUT)
+    conn = sqlite3.connect(db_output)
     cursor = conn.cursor()
     
     # Vérifier si la colonne provider existe, sinon la créer
@@ -108,24 +103,48 @@ def main():
     print(f"\n📺 {len(channels)} chaînes à traiter")
     
     # Enrichir chaque chaîne
-    stats = {'found': 0, 'not_found': 0}
+    stats = {'total': len(channels), 'found': 0, 'not_found': 0}
     updates = []
     
-    for channel_id, name, angle, freq in channels:
-        provider = find_provider(transponders, angle, freq)
-        
-        if not provider:
-            provider = 'Other'
-            stats['not_found'] += 1
-        else:
-            stats['found'] += 1
+    with profiling.stage('match_providers'):
+        for channel_id, name, angle, freq in channels:
+            provider = find_provider(transponders, angle, freq)
             
-        updates.append((provider, channel_id))
+            if not provider:
+                provider = 'Other'
+                stats['not_found'] += 1
+            else:
+                stats['found'] += 1
+                
+            updates.append((provider, channel_id))
     
     # Appliquer les mises à jour
     print(f"\n💾 Application des mises à jour...")
-    cursor.executemany("UPDATE program_table SET provider = ? WHERE id = ?", updates)
-    conn.commit()
+    with profiling.stage('update_db'):
+        cursor.executemany("UPDATE program_table SET provider = ? WHERE id = ?", updates)
+        conn.commit()
+    
+    conn.close()
+    return stats
+
+
+def main():
+    print("=" * 60)
+    print("🛰️  Enrichissement de database.db avec providers")
+    print("=" * 60)
+    
+    # Charger les transponders du XML
+    print(f"\n📁 Chargement de {SATELLITES_XML}...")
+    with profiling.stage('load_xml'):
+        transponders = load_transponders_from_xml(SATELLITES_XML)
+    print(f"   {len(transponders)} transponders avec provider chargés")
+    
+    # Copier la base de données et enrichir la copie
+    print(f"\n📁 Copie de {DB_PATH} vers {DB_OUTPUT}...")
+    stats = enrich(DB_PATH, DB_OUTPUT, transponders)
+    
+    conn = sqlite3.connect(DB_OUTPUT)
+    cursor = conn.cursor()
     
     # Stats par provider
     cursor.execute("""
@@ -138,7 +157,7 @@ def main():
     """)
     
     print(f"\n📊 Résultats:")
-    print(f"   ✅ Avec provider trouvé: {stats['found']} ({100*stats['found']//len(channels)}%)")
+    print(f"   ✅ Avec provider trouvé: {stats['found']} ({100*stats['found']//stats['total'] if stats['total'] else 0}%)")
     print(f"   ⚠️  Provider 'Other': {stats['not_found']}")
     
     print(f"\n📋 Top providers:")
@@ -201,4 +220,5 @@ def main():
 
 
 if __name__ == '__main__':
+    profiling.install()
     main()
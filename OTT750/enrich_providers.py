@@ -7,6 +7,7 @@ en utilisant la table tp_network_name_table et le fichier provider_mapping.csv
 import sqlite3
 import csv
 import os
+import profiling
 
 # Chemins des fichiers
 DB_PATH = '/home/kamel/OTT750/database.db'
@@ -158,4 +159,5 @@ def enrich_database():
 
 
 if __name__ == '__main__':
+    profiling.install()
     enrich_database()
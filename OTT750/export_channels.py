@@ -1,15 +1,36 @@
 import sqlite3
 import csv
 import os
+import argparse
+import profiling
+from language_profile import LanguageIndex, resolve_language
+from program_store import ProgramStore
 
 db_path = '/home/kamel/OTT750/database.db'
 csv_path = '/home/kamel/OTT750/liste_chaines.csv'
 
-def export_to_csv():
+def export_to_csv(source=None, output=None, audio=None, subtitle=None, where=None, store=None):
+    """Exporte les chaînes de source (défaut: db_path) vers output (défaut: csv_path).
+
+    audio / subtitle: code langue du récepteur pour ne garder que les chaînes
+    ayant cette piste audio / ces sous-titres (voir language_profile.py).
+    where: requête qualité ("height >= 720 and fta = 1", voir program_store.py),
+    évaluée sur store s'il est déjà chargé.
+    """
+    source = source or db_path
+    output = output or csv_path
     try:
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(source)
         cursor = conn.cursor()
 
+        allowed = None
+        if audio is not None or subtitle is not None:
+            allowed = LanguageIndex.load(source, conn).query(audio=audio, subtitle=subtitle)
+        if where:
+            store = store or ProgramStore.load(source, conn)
+            ids = store.ids(store.where(where))
+            allowed = ids if allowed is None else allowed & ids
+
         query = """
         SELECT 
             p.name as Channel_Name,
@@ -18,7 +39,8 @@ def export_to_csv():
             tp.pol as Polarization,
             tp.sym_rate as Symbol_Rate,
             p.service_type as Service_Type,
-            p.vid_type as Video_Type
+            p.vid_type as Video_Type,
+            p.id
         FROM program_table p
         LEFT JOIN satellite_transponder_table tp ON p.tp_id = tp.id
         LEFT JOIN satellite_table s ON tp.sat_id = s.id
@@ -27,6 +49,8 @@ def export_to_csv():
 
         cursor.execute(query)
         rows = cursor.fetchall()
+        if allowed is not None:
+            rows = [row for row in rows if row[7] in allowed]
 
         # Define column names based on the query
         headers = ["Nom de la chaîne", "Satellite", "Fréquence", "Polarisation", "Symbol Rate", "Type Service", "Type Vidéo"]
@@ -35,7 +59,7 @@ def export_to_csv():
         # But without certainty, I will keep raw values or add a helper if I knew the mapping.
         # Let's just write the raw data first.
 
-        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        with open(output, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(headers)
             
@@ -60,13 +84,27 @@ def export_to_csv():
                 ]
                 writer.writerow(new_row)
 
-        print(f"Export réussi : {csv_path}")
+        print(f"Export réussi : {output}")
         print(f"Nombre de chaînes exportées : {len(rows)}")
 
         conn.close()
+        return len(rows)
 
     except Exception as e:
         print(f"Erreur lors de l'export: {e}")
+        return None
 
 if __name__ == "__main__":
-    export_to_csv()
+    profiling.install()
+    parser = argparse.ArgumentParser(description="Export des chaînes en CSV")
+    parser.add_argument('--audio', help="Seulement les chaînes avec cette langue audio (fra, ara...)")
+    parser.add_argument('--subtitle', help="Seulement les chaînes avec ces sous-titres")
+    parser.add_argument('--where', help="Requête qualité, ex: \"height >= 720 and fta = 1 and angle = 130\"")
+    args = parser.parse_args()
+    try:
+        audio = resolve_language(args.audio) if args.audio else None
+        subtitle = resolve_language(args.subtitle) if args.subtitle else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    export_to_csv(audio=audio, subtitle=subtitle, where=args.where)
@@ -4,10 +4,22 @@ Script pour créer satellites_select.xml avec seulement les satellites sélectio
 - Astra 19E
 - Hotbird 13E
 - Nilesat 7W et 8W
+
+Mode --merge: les fichiers sources sont lus en parallèle et les transpondeurs
+d'une même position présents dans plusieurs sources (écart de 1-2 MHz) sont
+fusionnés en un seul, avec les attributs les plus complets (provider,
+symbol_rate, nid/tid...). Statistiques de fusion affichées à la fin.
+
+Usage:
+    python3 extract_satellites.py
+    python3 extract_satellites.py --merge --tolerance 2
 """
 
+import argparse
 import xml.etree.ElementTree as ET
 import re
+from concurrent.futures import ProcessPoolExecutor
+import profiling
 
 INPUT_FILES = [
     '/home/kamel/OTT750/satellites_1.xml',
@@ -27,6 +39,9 @@ SELECTED_POSITIONS = [
     -81,   # Eutelsat 8 West (8W) C
 ]
 
+# Écart max (MHz) entre deux sources pour un même transpondeur
+MERGE_TOLERANCE = 2
+
 
 def is_selected_satellite(sat_elem):
     """Vérifie si un satellite doit être inclus"""
@@ -99,5 +114,123 @@ def main():
     print(f"📡 Transponders totaux: {total_transponders}")
 
 
+def parse_source(filepath):
+    """Satellites sélectionnés d'un fichier: [(position, attributs sat, [attributs transpondeur])]"""
+    satellites = []
+    for sat in ET.parse(filepath).getroot().findall('sat'):
+        if is_selected_satellite(sat):
+            satellites.append((int(sat.get('position')), dict(sat.attrib),
+                               [dict(tp.attrib) for tp in sat.findall('transponder')]))
+    return satellites
+
+
+def richness(attrib):
+    # Nombre d'attributs renseignés, provider en priorité
+    return (bool(attrib.get('provider')), sum(1 for v in attrib.values() if v))
+
+
+def merge_cluster(cluster):
+    """Un transpondeur à partir des versions de plusieurs sources"""
+    cluster = sorted(cluster, key=lambda item: richness(item[1]), reverse=True)
+    merged = dict(cluster[0][1])
+    for _, attrib in cluster[1:]:
+        for key, value in attrib.items():
+            if value and not merged.get(key):
+                merged[key] = value
+    return merged
+
+
+def merge_transponders(entries, tolerance):
+    """Balayage trié d'une (position, polarisation): [(source, attributs)] -> (fusionnés, nb de fusions)
+
+    Un groupe contient au plus une version par source : deux transpondeurs
+    proches d'un même fichier sont des porteuses distinctes.
+    """
+    entries = sorted(entries, key=lambda item: int(item[1].get('frequency', 0)))
+    merged, merges = [], 0
+    cluster, start, sources = [], 0, set()
+    for source, attrib in entries:
+        freq = int(attrib.get('frequency', 0)) // 1000
+        if cluster and (freq - start > tolerance or source in sources):
+            merged.append(merge_cluster(cluster))
+            merges += len(cluster) - 1
+            cluster, sources = [], set()
+        if not cluster:
+            start = freq
+        cluster.append((source, attrib))
+        sources.add(source)
+    if cluster:
+        merged.append(merge_cluster(cluster))
+        merges += len(cluster) - 1
+    return merged, merges
+
+
+def merge_sources(input_files, output_file, tolerance=MERGE_TOLERANCE):
+    """Fusionne les satellites sélectionnés des sources en un seul fichier dédupliqué"""
+    print("=" * 60)
+    print("📡 Fusion dédupliquée vers satellites_select.xml")
+    print("=" * 60)
+
+    with profiling.stage('parse'):
+        with ProcessPoolExecutor(max_workers=len(input_files)) as pool:
+            parsed = list(pool.map(parse_source, input_files))
+
+    positions = {}  # position -> (attributs sat, {pol: [(source, attributs)]})
+    for source, satellites in enumerate(parsed):
+        print(f"\n📁 {input_files[source]}: {len(satellites)} satellites sélectionnés")
+        for position, sat_attrib, transponders in satellites:
+            _, by_pol = positions.setdefault(position, (sat_attrib, {}))
+            for attrib in transponders:
+                by_pol.setdefault(attrib.get('polarization', '0'), []).append((source, attrib))
+
+    new_root = ET.Element('satellites')
+    new_root.text = '\n  '
+    total_in = total_out = 0
+    print("\n📊 Fusion par position:")
+    with profiling.stage('merge'):
+        for position, (sat_attrib, by_pol) in positions.items():
+            transponders, merges = [], 0
+            for pol, entries in by_pol.items():
+                merged, count = merge_transponders(entries, tolerance)
+                transponders.extend(merged)
+                merges += count
+            transponders.sort(key=lambda a: (int(a.get('frequency', 0)), a.get('polarization', '0')))
+
+            count_in = sum(len(entries) for entries in by_pol.values())
+            total_in += count_in
+            total_out += len(transponders)
+            print(f"  {sat_attrib.get('name', '')} ({position}): {count_in} -> {len(transponders)}"
+                  f" ({merges} fusionnés)")
+
+            sat = ET.SubElement(new_root, 'sat', sat_attrib)
+            sat.text = '\n    '
+            for i, attrib in enumerate(transponders):
+                tp = ET.SubElement(sat, 'transponder', attrib)
+                tp.tail = '\n    ' if i < len(transponders) - 1 else '\n  '
+            sat.tail = '\n  '
+    if len(new_root):
+        new_root[-1].tail = '\n'
+
+    with open(output_file, 'wb') as f:
+        f.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write(b'<!--Selected satellites: Astra 19E, Hotbird 13E, Nilesat 7W/8W-->\n')
+        ET.ElementTree(new_root).write(f, encoding='utf-8', xml_declaration=False)
+
+    print(f"\n💾 Sauvegardé: {output_file}")
+    print(f"📡 Transponders: {total_in} lus, {total_out} écrits, {total_in - total_out} doublons fusionnés")
+    return {'positions': len(positions), 'input': total_in, 'output': total_out}
+
+
 if __name__ == '__main__':
-    main()
+    profiling.install()
+    parser = argparse.ArgumentParser(description="Création de satellites_select.xml")
+    parser.add_argument('--merge', action='store_true', help="Fusionner les sources en dédupliquant les transpondeurs")
+    parser.add_argument('--tolerance', type=int, default=MERGE_TOLERANCE, help="Écart toléré en MHz (--merge)")
+    parser.add_argument('-o', '--output', default=OUTPUT_FILE)
+    parser.add_argument('inputs', nargs='*', default=INPUT_FILES, help="Fichiers sources")
+    args = parser.parse_args()
+    if args.merge:
+        merge_sources(args.inputs, args.output, args.tolerance)
+    else:
+        INPUT_FILES, OUTPUT_FILE = args.inputs, args.output
+        main()
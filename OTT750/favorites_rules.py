@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Moteur de favoris par règles, sans interface (éditions en masse).
+
+Fichier de règles, une règle par ligne, conditions reliées par "and":
+
+    # Commentaire
+    name ~ /bein|sport/i and satellite = Hotbird -> Sport
+    provider = France TV -> France
+    satellite = Nilesat and service_type != 2 -> Nilesat
+    name ~ /^rai/i and height >= 720 -> Italie
+
+Champs: name, satellite, provider, angle, freq, pol, service_type, lcn,
+width, height, ca (ca_systemid_list). Opérateurs: ~ /regex/flags, =, !=,
+>=, <=, >, <. Le groupe est un nom de fav_name_table ou un id.
+
+Toutes les règles sont évaluées en un seul passage sur les programmes
+(regex compilées, satellite et provider précalculés par une seule requête).
+Un diff est toujours affiché ; --apply écrit fav_prog_table en une transaction.
+
+Usage:
+    python3 favorites_rules.py regles.txt                  # dry-run
+    python3 favorites_rules.py regles.txt --apply -o database_new.db
+    python3 favorites_rules.py regles.txt --apply --replace
+"""
+
+import argparse
+import operator
+import re
+import shutil
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+
+import enrich_database
+import profiling
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+
+FIELDS = {
+    'name': 'name',
+    'satellite': 'satellite',
+    'provider': 'provider',
+    'angle': 'angle',
+    'freq': 'freq',
+    'pol': 'pol',
+    'service_type': 'service_type',
+    'lcn': 'lcn_no',
+    'width': 'video_width',
+    'height': 'video_height',
+    'ca': 'ca_systemid_list',
+}
+
+NUMERIC_FIELDS = {'angle', 'freq', 'pol', 'service_type', 'lcn_no', 'video_width', 'video_height'}
+
+OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '<=': operator.le,
+    '>': operator.gt,
+    '<': operator.lt,
+}
+
+REGEX_FLAGS = {'i': re.IGNORECASE}
+
+CONDITION_RE = re.compile(
+    r'^\s*(?P<field>\w+)\s*(?:~\s*/(?P<regex>.*)/(?P<flags>[a-z]*)|(?P<op>!=|>=|<=|=|>|<)\s*(?P<value>.+?))\s*$')
+AND_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+
+
+class RuleError(ValueError):
+    pass
+
+
+def parse_condition(text, line_no):
+    """Compile une condition en prédicat (colonne, fonction)"""
+    m = CONDITION_RE.match(text)
+    if not m:
+        raise RuleError(f"ligne {line_no}: condition invalide: {text!r}")
+    field = m.group('field').lower()
+    if field not in FIELDS:
+        raise RuleError(f"ligne {line_no}: champ inconnu: {field}")
+    column = FIELDS[field]
+
+    if m.group('regex') is not None:
+        flags = 0
+        for flag in m.group('flags'):
+            flags |= REGEX_FLAGS.get(flag, 0)
+        try:
+            pattern = re.compile(m.group('regex'), flags)
+        except re.error as e:
+            raise RuleError(f"ligne {line_no}: regex invalide: {e}")
+        return column, lambda v: v is not None and pattern.search(str(v)) is not None
+
+    op = OPERATORS[m.group('op')]
+    value = m.group('value').strip()
+    if column in NUMERIC_FIELDS:
+        try:
+            value = int(value)
+        except ValueError:
+            raise RuleError(f"ligne {line_no}: valeur numérique attendue pour {field}")
+        return column, lambda v: v is not None and op(int(v), value)
+    value = value.lower()
+    return column, lambda v: op((v or '').strip().lower(), value)
+
+
+def parse_rules(text):
+    """Retourne la liste [(conditions, groupe, texte de la règle)]"""
+    rules = []
+    for line_no, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if '->' not in line:
+            raise RuleError(f"ligne {line_no}: '->' manquant")
+        cond_text, group = line.rsplit('->', 1)
+        conditions = [parse_condition(c, line_no) for c in AND_RE.split(cond_text.strip()) if c]
+        rules.append((conditions, group.strip(), line))
+    return rules
+
+
+def uses_provider(rules):
+    return any(column == 'provider' for conditions, _, _ in rules for column, _ in conditions)
+
+
+def load_programs(cursor, xml_path=enrich_database.SATELLITES_XML, need_provider=True):
+    """Charge les programmes avec satellite et provider précalculés
+
+    Le catalogue XML n'est lu que si need_provider et que la base n'a pas de
+    colonne provider.
+    """
+    cursor.execute("PRAGMA table_info(program_table)")
+    has_provider = 'provider' in [col[1] for col in cursor.fetchall()]
+
+    cursor.execute(f"""
+        SELECT p.id, p.name, s.name AS satellite, s.angle, t.freq, t.pol, p.service_type,
+               p.lcn_no, p.video_width, p.video_height, p.ca_systemid_list,
+               {'p.provider' if has_provider else "''"} AS provider
+        FROM program_table p
+        LEFT JOIN satellite_transponder_table t ON p.tp_id = t.id
+        LEFT JOIN satellite_table s ON t.sat_id = s.id
+        WHERE p.name != '' AND p.name != 'Unname'
+    """)
+    columns = [d[0] for d in cursor.description]
+    programs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    if need_provider and not has_provider:
+        # Base non enrichie: provider calculé une fois depuis le catalogue XML
+        transponders = enrich_database.load_transponders_from_xml(xml_path)
+        for p in programs:
+            if p['angle'] is not None and p['freq'] is not None:
+                p['provider'] = enrich_database.find_provider(transponders, p['angle'], p['freq']) or ''
+    return programs
+
+
+def resolve_groups(cursor, rules):
+    """Nom ou id de groupe -> id de fav_name_table"""
+    cursor.execute("SELECT id, fav_name FROM fav_name_table")
+    groups = cursor.fetchall()
+    by_name = {name.strip().lower(): gid for gid, name in groups}
+    ids = {gid for gid, _ in groups}
+    names = {gid: name for gid, name in groups}
+
+    resolved = {}
+    for _, group, line in rules:
+        key = group.lower()
+        if key in by_name:
+            resolved[group] = by_name[key]
+        elif group.isdigit() and int(group) in ids:
+            resolved[group] = int(group)
+        else:
+            raise RuleError(f"groupe inconnu: {group!r} ({line})")
+    return resolved, names
+
+
+def evaluate(programs, rules, group_ids):
+    """Un seul passage: {id groupe: [prog_id dans l'ordre de program_table]}"""
+    matches = {}
+    seen = set()
+    for conditions, group, _ in rules:
+        matches.setdefault(group_ids[group], [])
+    compiled = [(conditions, group_ids[group]) for conditions, group, _ in rules]
+
+    for p in programs:
+        pid = p['id']
+        for conditions, gid in compiled:
+            if (gid, pid) in seen:
+                continue
+            if all(pred(p[col]) for col, pred in conditions):
+                seen.add((gid, pid))
+                matches[gid].append(pid)
+    return matches
+
+
+def plan_changes(cursor, matches, replace):
+    """Calcule (ajouts, retraits) par groupe à partir de fav_prog_table"""
+    current = {}
+    cursor.execute("SELECT fav_group_id, prog_id FROM fav_prog_table ORDER BY fav_group_id, disp_order")
+    for gid, pid in cursor.fetchall():
+        current.setdefault(gid, []).append(pid)
+
+    plan = {}
+    for gid, pids in matches.items():
+        existing = current.get(gid, [])
+        existing_set = set(existing)
+        wanted = set(pids)
+        added = [pid for pid in pids if pid not in existing_set]
+        removed = [pid for pid in existing if pid not in wanted] if replace else []
+        plan[gid] = (added, removed, existing)
+    return plan
+
+
+def apply_plan(conn, plan, replace):
+    """Écrit les changements dans fav_prog_table en une transaction"""
+    cursor = conn.cursor()
+    with conn:
+        for gid, (added, removed, existing) in plan.items():
+            if replace:
+                cursor.executemany(
+                    "DELETE FROM fav_prog_table WHERE fav_group_id = ? AND prog_id = ?",
+                    [(gid, pid) for pid in removed])
+            # disp_order des groupes réels a des trous: numéroter après le maximum
+            cursor.execute("SELECT COALESCE(MAX(disp_order), 0) FROM fav_prog_table WHERE fav_group_id = ?",
+                           (gid,))
+            last = cursor.fetchone()[0]
+            cursor.executemany(
+                "INSERT INTO fav_prog_table (prog_id, fav_group_id, disp_order, tv_type) VALUES (?, ?, ?, 0)",
+                [(pid, gid, last + i) for i, pid in enumerate(added, 1)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Favoris par règles (dry-run par défaut)")
+    parser.add_argument('rules', help="Fichier de règles")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--apply', action='store_true', help="Écrire les changements")
+    parser.add_argument('--replace', action='store_true',
+                        help="Retirer des groupes ciblés les chaînes qui ne correspondent plus")
+    parser.add_argument('-o', '--output', help="Copier la base ici avant écriture")
+    parser.add_argument('--xml', default=enrich_database.SATELLITES_XML,
+                        help="Catalogue pour le provider si la base n'est pas enrichie")
+    parser.add_argument('--show', type=int, default=10, help="Chaînes listées par groupe dans le diff")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            rules = parse_rules(f.read())
+    except (OSError, RuleError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    conn = sqlite3.connect(args.db)
+    cursor = conn.cursor()
+    try:
+        group_ids, group_names = resolve_groups(cursor, rules)
+    except RuleError as e:
+        print(f"❌ {e}")
+        return 1
+
+    try:
+        with profiling.stage('load_programs'):
+            programs = load_programs(cursor, args.xml, uses_provider(rules))
+    except (OSError, ET.ParseError) as e:
+        print(f"❌ Catalogue XML illisible ({args.xml}): {e}")
+        return 1
+    names = {p['id']: p['name'] for p in programs}
+    with profiling.stage('evaluate'):
+        matches = evaluate(programs, rules, group_ids)
+    plan = plan_changes(cursor, matches, args.replace)
+    conn.close()
+
+    print(f"📋 {len(rules)} règles évaluées sur {len(programs)} chaînes\n")
+    for gid, (added, removed, _) in plan.items():
+        print(f"⭐ {group_names[gid]} (ID {gid}): +{len(added)} / -{len(removed)}")
+        for pid in added[:args.show]:
+            print(f"   + {names.get(pid, pid)}")
+        for pid in removed[:args.show]:
+            print(f"   - {names.get(pid, pid)}")
+        hidden = max(0, len(added) - args.show) + max(0, len(removed) - args.show)
+        if hidden:
+            print(f"   ... {hidden} autres")
+
+    if not args.apply:
+        print("\n🔎 Dry-run: rien n'a été écrit (ajouter --apply)")
+        return 0
+
+    target = args.db
+    if args.output:
+        shutil.copy2(args.db, args.output)
+        target = args.output
+    conn = sqlite3.connect(target)
+    with profiling.stage('apply'):
+        apply_plan(conn, plan, args.replace)
+    conn.close()
+    print(f"\n💾 Favoris écrits dans {target}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Sauvegarde / restauration des favoris indépendante des ids de program_table.
+
+Chaque rescan du récepteur renumérote program_table.id, ce qui casse
+fav_prog_table. Le snapshot identifie chaque chaîne par sa clé stable de
+sat_program_mapping_table (sat_angle, sat_direction, tp_freq, sid), avec le
+nom de la chaîne en secours.
+
+Usage:
+    python3 favorites_snapshot.py export database.db favoris.json
+    python3 favorites_snapshot.py apply favoris.json database.db -o database_new.db
+"""
+
+import argparse
+import json
+import shutil
+import sqlite3
+import sys
+
+import profiling
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+SNAPSHOT_PATH = '/home/kamel/OTT750/favoris_snapshot.json'
+
+SNAPSHOT_VERSION = 1
+
+
+def normalize_name(name):
+    """Normalise un nom de chaîne (minuscules, sans espaces multiples)"""
+    return ' '.join((name or '').lower().split())
+
+
+def export_snapshot(db_path):
+    """Construit le snapshot des groupes de favoris d'une base"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT id, fav_name FROM fav_name_table ORDER BY id")
+    groups = {grp_id: {'id': grp_id, 'name': name, 'channels': []}
+              for grp_id, name in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT fp.fav_group_id, fp.disp_order, fp.tv_type, p.name,
+               m.sat_angle, m.sat_direction, m.tp_freq, m.sid
+        FROM fav_prog_table fp
+        JOIN program_table p ON fp.prog_id = p.id
+        LEFT JOIN sat_program_mapping_table m ON m.program_id = p.id
+        ORDER BY fp.fav_group_id, fp.disp_order, fp.id
+    """)
+    for grp_id, disp_order, tv_type, name, angle, direction, freq, sid in cursor.fetchall():
+        group = groups.setdefault(grp_id, {'id': grp_id, 'name': '', 'channels': []})
+        group['channels'].append({
+            'key': [angle, direction, freq, sid] if sid is not None else None,
+            'name': name,
+            'disp_order': disp_order,
+            'tv_type': tv_type,
+        })
+
+    conn.close()
+    return {'version': SNAPSHOT_VERSION, 'groups': list(groups.values())}
+
+
+def build_indexes(cursor):
+    """Tables de hachage clé stable / nom -> ids de programmes de la base cible"""
+    by_key = {}
+    by_sid = {}
+    by_name = {}
+    cursor.execute("""
+        SELECT p.id, p.name, m.sat_angle, m.sat_direction, m.tp_freq, m.sid
+        FROM program_table p
+        LEFT JOIN sat_program_mapping_table m ON m.program_id = p.id
+        ORDER BY p.id
+    """)
+    for pid, name, angle, direction, freq, sid in cursor.fetchall():
+        norm = normalize_name(name)
+        if sid is not None:
+            by_key.setdefault((angle, direction, freq, sid), []).append((pid, norm))
+            # Même service sur le même satellite, fréquence légèrement modifiée
+            by_sid.setdefault((angle, direction, sid), []).append((pid, norm))
+        if norm and norm != 'unname':
+            by_name.setdefault(norm, []).append(pid)
+    return by_key, by_sid, by_name
+
+
+def pick(candidates, norm_name):
+    """Choisit parmi plusieurs programmes partageant la même clé (préférence au nom)"""
+    for pid, cand_name in candidates:
+        if cand_name == norm_name:
+            return pid
+    return candidates[0][0]
+
+
+def match_channel(entry, by_key, by_sid, by_name):
+    """Retourne (prog_id, méthode) ou (None, None)"""
+    norm = normalize_name(entry.get('name'))
+    key = entry.get('key')
+    if key:
+        angle, direction, freq, sid = key
+        candidates = by_key.get((angle, direction, freq, sid))
+        if candidates:
+            return pick(candidates, norm), 'key'
+        candidates = by_sid.get((angle, direction, sid))
+        if candidates:
+            return pick(candidates, norm), 'sid'
+    if norm in by_name:
+        return by_name[norm][0], 'name'
+    return None, None
+
+
+def apply_snapshot(snapshot, db_path):
+    """Réapplique tous les groupes du snapshot dans une seule transaction"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    by_key, by_sid, by_name = build_indexes(cursor)
+
+    stats = {'key': 0, 'sid': 0, 'name': 0}
+    unmatched = []
+    rows = []
+
+    for group in snapshot['groups']:
+        seen = set()
+        order = 0
+        for entry in group['channels']:
+            pid, method = match_channel(entry, by_key, by_sid, by_name)
+            if pid is None:
+                unmatched.append((group['name'], entry))
+                continue
+            if pid in seen:
+                continue
+            seen.add(pid)
+            stats[method] += 1
+            order += 1
+            rows.append((pid, group['id'], order, entry.get('tv_type', 0)))
+
+    group_ids = [(g['id'],) for g in snapshot['groups']]
+    try:
+        with conn:
+            cursor.executemany("DELETE FROM fav_prog_table WHERE fav_group_id = ?", group_ids)
+            cursor.executemany(
+                "UPDATE fav_name_table SET fav_name = ? WHERE id = ?",
+                [(g['name'], g['id']) for g in snapshot['groups'] if g['name']])
+            cursor.executemany(
+                "INSERT INTO fav_prog_table (prog_id, fav_group_id, disp_order, tv_type) "
+                "VALUES (?, ?, ?, ?)", rows)
+    finally:
+        conn.close()
+
+    return stats, unmatched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot des favoris par clés stables")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_export = sub.add_parser('export', help="Exporter les favoris d'une base")
+    p_export.add_argument('db', nargs='?', default=DB_PATH)
+    p_export.add_argument('snapshot', nargs='?', default=SNAPSHOT_PATH)
+
+    p_apply = sub.add_parser('apply', help="Réappliquer un snapshot dans une base (après rescan)")
+    p_apply.add_argument('snapshot')
+    p_apply.add_argument('db', nargs='?', default=DB_PATH)
+    p_apply.add_argument('-o', '--output', help="Copier la base ici avant modification")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        snapshot = export_snapshot(args.db)
+        with open(args.snapshot, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        total = sum(len(g['channels']) for g in snapshot['groups'])
+        print(f"✅ {total} favoris ({len(snapshot['groups'])} groupes) exportés vers {args.snapshot}")
+        return 0
+
+    with open(args.snapshot, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        print(f"❌ Version de snapshot non supportée: {snapshot.get('version')}")
+        return 1
+
+    target = args.db
+    if args.output:
+        shutil.copy2(args.db, args.output)
+        target = args.output
+        print(f"📋 Base copiée vers {target}")
+
+    stats, unmatched = apply_snapshot(snapshot, target)
+
+    print(f"\n📊 Résultats:")
+    print(f"   ✅ Par clé stable (angle, direction, fréquence, sid): {stats['key']}")
+    print(f"   ✅ Par sid (fréquence modifiée): {stats['sid']}")
+    print(f"   ✅ Par nom: {stats['name']}")
+    print(f"   ⚠️  Non retrouvées: {len(unmatched)}")
+    for group_name, entry in unmatched:
+        print(f"      - [{group_name}] {entry.get('name')} {entry.get('key') or ''}")
+
+    print(f"\n💾 Favoris restaurés dans {target}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Détection des chaînes en double (entre satellites ou après un rescan).
+
+Un seul passage sur les programmes (program_store.ProgramStore) : chaque
+programme est haché sur plusieurs clés, et deux programmes partageant une
+clé sont réunis dans le même groupe (union-find) :
+  - (on_id, ts_id, service_id) quand le transpondeur les renseigne
+  - (position, polarisation, fréquence, service_id): même service rescanné
+  - nom normalisé (accents, casse, suffixes HD/UHD/4K...), TV et radio séparées ;
+    deux services de même nom sur un même transpondeur restent distincts
+
+Chaque groupe est listé avec la qualité de ses membres (résolution, codec,
+symbol rate, modulation) ; le représentant (★) est le meilleur membre.
+
+Nettoyage (--groups): dans les groupes de favoris choisis, un seul membre par
+groupe de doublons est conservé, le représentant, à la place du premier
+doublon présent. Seuls les doublons du même service (clés DVB ou
+transpondeur) sont nettoyés: un nom identique peut couvrir des versions
+linguistiques ou régionales distinctes, ces groupes ne sont que signalés.
+Dry-run par défaut, --apply écrit en une transaction.
+
+Usage:
+    python3 find_duplicates.py
+    python3 find_duplicates.py --groups Sport,News
+    python3 find_duplicates.py --groups Sport,News --apply -o database_new.db
+"""
+
+import argparse
+import re
+import shutil
+import sqlite3
+import sys
+import unicodedata
+
+import profiling
+from program_store import ProgramStore
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+
+# Noms génériques des récepteurs, jamais considérés comme doublons par le nom
+JUNK_NAMES = {'', 'unname', 'test'}
+
+# Suffixes de qualité ignorés dans la comparaison des noms
+QUALITY_TOKENS = {'hd', 'fhd', 'uhd', 'sd', '4k', '8k', 'hevc', 'h265'}
+
+# vid_type (stream_type MPEG) -> rang de codec: HEVC > H.264 > MPEG-2
+CODEC_RANK = {36: 3, 27: 2, 2: 1}
+CODEC_LABELS = {36: 'HEVC', 27: 'H.264', 2: 'MPEG-2', 0: '-'}
+
+RADIO_SERVICE_TYPE = 2
+
+
+def normalize_name(name):
+    """Nom comparable: sans accents ni ponctuation, en minuscules, sans suffixe HD/4K"""
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    words = re.findall(r'[^\W_]+', text)
+    while len(words) > 1 and words[-1] in QUALITY_TOKENS:
+        words.pop()
+    return ' '.join(words)
+
+
+def quality(store, i):
+    """Clé de qualité d'un programme (plus grand = meilleur)"""
+    c = store.columns
+    return (c['video_height'][i], CODEC_RANK.get(c['vid_type'][i], 0), c['sym_rate'][i],
+            c['modulation'][i], -c['id'][i])
+
+
+def find_clusters(store, by_name=True):
+    """Groupes de doublons: listes d'indices de lignes, représentant en tête
+
+    by_name=False: seulement les clés d'identité du service (DVB, transpondeur)
+    """
+    c = store.columns
+    n = len(store)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    first = {}
+    name_on_tp = {}  # (nom normalisé, tp_id) -> service_id
+    for i in range(n):
+        keys = []
+        sid = c['service_id'][i]
+        if c['on_id'][i] or c['ts_id'][i]:
+            keys.append(('dvb', c['on_id'][i], c['ts_id'][i], sid))
+        if c['sat_id'][i] and sid:
+            keys.append(('tp', c['angle'][i], c['sat_dir'][i], c['pol'][i], c['freq'][i], sid))
+        name = normalize_name(c['name'][i])
+        # Même nom, même transpondeur mais autre service: flux distincts (décrochages régionaux)
+        if by_name and name not in JUNK_NAMES and name_on_tp.setdefault((name, c['tp_id'][i]), sid) == sid:
+            keys.append(('name', name, c['service_type'][i] == RADIO_SERVICE_TYPE))
+
+        for key in keys:
+            j = first.setdefault(key, i)
+            if j != i:
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) > 1:
+            members.sort(key=lambda i: quality(store, i), reverse=True)
+            clusters.append(members)
+    clusters.sort(key=lambda m: (-len(m), store.columns['name'][m[0]].lower()))
+    return clusters
+
+
+def resolve_groups(cursor, spec):
+    """'Sport,News' ou '2,3' -> {id: nom} de fav_name_table"""
+    cursor.execute("SELECT id, fav_name FROM fav_name_table")
+    groups = cursor.fetchall()
+    by_name = {name.strip().lower(): gid for gid, name in groups}
+    names = dict(groups)
+    resolved = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if item.lower() in by_name:
+            gid = by_name[item.lower()]
+        elif item.isdigit() and int(item) in names:
+            gid = int(item)
+        else:
+            raise ValueError(f"groupe inconnu: {item!r}")
+        resolved[gid] = names[gid]
+    return resolved
+
+
+def plan_cleanup(cursor, store, clusters, group_ids):
+    """Changements de fav_prog_table: [('update', row_id, prog_id) | ('delete', row_id, prog_id)]"""
+    ids = store.columns['id']
+    cluster_of = {}
+    for n, members in enumerate(clusters):
+        for i in members:
+            cluster_of[ids[i]] = n
+
+    marks = ','.join('?' * len(group_ids))
+    cursor.execute(f"""
+        SELECT id, prog_id, fav_group_id FROM fav_prog_table
+        WHERE fav_group_id IN ({marks}) ORDER BY fav_group_id, disp_order, id
+    """, list(group_ids))
+
+    # (groupe, cluster) -> entrées dans l'ordre d'affichage
+    entries = {}
+    for row_id, pid, gid in cursor.fetchall():
+        n = cluster_of.get(pid)
+        if n is not None:
+            entries.setdefault((gid, n), []).append((row_id, pid))
+
+    changes = []
+    for (gid, n), rows in entries.items():
+        rep = ids[clusters[n][0]]
+        keep = next((row for row in rows if row[1] == rep), None)
+        if keep is None:
+            # Le représentant prend la place du premier doublon du groupe
+            keep = rows[0]
+            changes.append(('update', keep[0], rep))
+        changes.extend(('delete', row_id, pid) for row_id, pid in rows if row_id != keep[0])
+    return changes
+
+
+def apply_cleanup(conn, changes):
+    cursor = conn.cursor()
+    with conn:
+        cursor.executemany("UPDATE fav_prog_table SET prog_id = ? WHERE id = ?",
+                           [(pid, row_id) for kind, row_id, pid in changes if kind == 'update'])
+        cursor.executemany("DELETE FROM fav_prog_table WHERE id = ?",
+                           [(row_id,) for kind, row_id, _ in changes if kind == 'delete'])
+
+
+def print_clusters(store, clusters, group_names, limit, same_service=None):
+    """same_service: ensembles de membres du même service; les autres groupes sont
+    marqués comme rapprochés (au moins en partie) par le nom seul"""
+    c = store.columns
+    for members in clusters[:limit]:
+        by_name = same_service is not None and frozenset(members) not in same_service
+        print(f"\n🔁 {c['name'][members[0]].strip()} ({len(members)} exemplaires)"
+              f"{'  ≈ nom seul, favoris non fusionnés' if by_name else ''}")
+        for rank, i in enumerate(members):
+            pol = 'V' if c['pol'][i] else 'H'
+            favs = ', '.join(group_names.get(g, str(g)) for g in sorted(store.favorites.get(c['id'][i], ())))
+            print(f"   {'★' if rank == 0 else ' '} {c['satellite'][i] or '?':<10} {c['freq'][i]:>6} {pol} "
+                  f"{c['sym_rate'][i]:>6} mod{c['modulation'][i]} {c['video_height'][i]:>5}p "
+                  f"{CODEC_LABELS.get(c['vid_type'][i], c['vid_type'][i]):<7} "
+                  f"id {c['id'][i]:<6} {c['name'][i].strip()}{'  ⭐ ' + favs if favs else ''}")
+    if len(clusters) > limit:
+        print(f"\n   ... {len(clusters) - limit} autres groupes (--limit)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chaînes en double entre satellites / rescans")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--limit', type=int, default=30, help="Groupes de doublons affichés")
+    parser.add_argument('--groups', help="Groupes de favoris à nettoyer (noms ou ids, séparés par des virgules)")
+    parser.add_argument('--apply', action='store_true', help="Écrire le nettoyage")
+    parser.add_argument('-o', '--output', help="Copier la base ici avant écriture")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    cursor = conn.cursor()
+    with profiling.stage('load'):
+        store = ProgramStore.load(args.db, conn)
+    with profiling.stage('cluster'):
+        clusters = find_clusters(store)
+        service_clusters = find_clusters(store, by_name=False)
+
+    cursor.execute("SELECT id, fav_name FROM fav_name_table")
+    group_names = dict(cursor.fetchall())
+    duplicates = sum(len(m) - 1 for m in clusters)
+    print(f"📺 {len(store)} programmes, {len(clusters)} groupes de doublons ({duplicates} doublons)")
+    print_clusters(store, clusters, group_names, args.limit, {frozenset(m) for m in service_clusters})
+
+    if not args.groups:
+        conn.close()
+        return 0
+
+    try:
+        targets = resolve_groups(cursor, args.groups)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    # Favoris réécrits seulement entre exemplaires du même service
+    changes = plan_cleanup(cursor, store, service_clusters, targets)
+    conn.close()
+
+    updates = sum(1 for kind, _, _ in changes if kind == 'update')
+    print(f"\n🧹 Nettoyage de {', '.join(targets.values())}: "
+          f"{len(changes) - updates} doublons retirés, {updates} remplacés par leur représentant")
+
+    if not args.apply:
+        print("🔎 Dry-run: rien n'a été écrit (ajouter --apply)")
+        return 0
+
+    target = args.db
+    if args.output:
+        shutil.copy2(args.db, args.output)
+        target = args.output
+    conn = sqlite3.connect(target)
+    with profiling.stage('apply'):
+        apply_cleanup(conn, changes)
+    conn.close()
+    print(f"💾 Favoris nettoyés dans {target}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
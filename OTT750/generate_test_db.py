@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Générateur de bases récepteur synthétiques pour les benchmarks.
+
+Le schéma est recopié tel quel depuis database.db (sqlite_master), puis les
+tables sont remplies avec des données réalistes : transpondeurs sur les
+fréquences réelles des satellites, programmes TV/radio, pistes audio,
+sous-titres, mapping satellite/programme et favoris.
+
+Usage:
+    python3 generate_test_db.py                       # 10k, 50k et 200k programmes
+    python3 generate_test_db.py --sizes 10000 --out /tmp/bench
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+
+import profiling
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DB = os.path.join(BASE_DIR, 'database.db')
+OUTPUT_DIR = os.path.join(BASE_DIR, 'bench_dbs')
+
+DEFAULT_SIZES = [10000, 50000, 200000]
+
+# Tables copiées telles quelles depuis le modèle (petites, configuration)
+COPIED_TABLES = ['android_metadata', 'box_info_table', 'satellite_table', 'fav_name_table']
+
+# Répartition des programmes par satellite (id satellite_table -> poids)
+# Nilesat, Hotbird et Astra1 concentrent la majorité des chaînes
+SAT_WEIGHTS = {1: 30, 4: 30, 5: 30}
+OTHER_SAT_WEIGHT = 1
+
+PROGRAMS_PER_TP = 12
+
+NAME_PREFIXES = ['Rai', 'France', 'MBC', 'beIN', 'Sky', 'Canal+', 'Al', 'ZDF', 'ARD', 'RTL',
+                 'TF1', 'M6', 'Rotana', 'Nile', 'Mediaset', 'Euronews', 'TRT', 'CBC', 'Sat.1',
+                 'ProSieben', 'Arte', 'TV5', 'LBC', 'DMC', 'OSN', 'Movistar', 'Nova', 'Tivu']
+NAME_SUFFIXES = ['', ' HD', ' 4K', ' Sport', ' News', ' Cinema', ' Drama', ' Kids', ' Music',
+                 ' 1', ' 2', ' 3', ' Plus', ' Max', ' Premium', ' Info', ' Series', ' Doc']
+NETWORK_NAMES = ['Nilesat', 'Eutelsat', 'SES Astra', 'Sky Italia', 'Canal+', 'Movistar+',
+                 'HD+', 'Tivusat', 'France TV', 'beIN']
+
+# Codes de langue observés dans audio_table / subtitle_table
+AUDIO_LANGUAGES = [69, 0, 178, 61, 3, 105, 76, 207, 11, 38]
+SUBTITLE_LANGUAGES = [76, 178, 69, 105, 61, 0, 207, 11]
+CA_SYSTEMS = ['', '', '', '0x0500', '0x0100', '0x0B00', '0x1830', '0x0500,0x0100']
+VIDEO_FORMATS = [(720, 576, 25), (1280, 720, 50), (1920, 1080, 25), (1920, 1080, 50), (3840, 2160, 50)]
+
+FAV_GROUPS = range(1, 9)
+
+
+def copy_schema(template, conn):
+    """Recrée le schéma exact du modèle dans la base cible"""
+    tpl = sqlite3.connect(template)
+    for (sql,) in tpl.execute(
+            "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name != 'sqlite_sequence' "
+            "ORDER BY CASE type WHEN 'table' THEN 0 ELSE 1 END"):
+        conn.execute(sql)
+
+    for table in COPIED_TABLES:
+        rows = tpl.execute(f"SELECT * FROM {table}").fetchall()
+        if rows:
+            marks = ','.join('?' * len(rows[0]))
+            conn.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+
+    # Fréquences réelles par satellite, pour que l'enrichissement XML trouve des correspondances
+    freqs = {}
+    for sat_id, freq, pol, sym_rate in tpl.execute(
+            "SELECT sat_id, freq, pol, sym_rate FROM satellite_transponder_table"):
+        freqs.setdefault(sat_id, []).append((freq, pol, sym_rate))
+    satellites = tpl.execute("SELECT id, angle, sat_dir FROM satellite_table").fetchall()
+    tpl.close()
+    return satellites, freqs
+
+
+def random_name(rng):
+    return rng.choice(NAME_PREFIXES) + rng.choice(NAME_SUFFIXES) + (
+        f" {rng.randint(1, 99)}" if rng.random() < 0.3 else '')
+
+
+def generate(path, programs, template=TEMPLATE_DB, seed=750):
+    """Génère une base de `programs` programmes dans `path`"""
+    rng = random.Random(seed + programs)
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    with conn:
+        satellites, real_freqs = copy_schema(template, conn)
+        sat_ids = [s[0] for s in satellites]
+        weights = [SAT_WEIGHTS.get(s, OTHER_SAT_WEIGHT) for s in sat_ids]
+        sat_info = {s[0]: (s[1], s[2]) for s in satellites}
+
+        # Transpondeurs
+        tp_count = max(1, programs // PROGRAMS_PER_TP)
+        transponders = []
+        network_names = []
+        for tp_id in range(1, tp_count + 1):
+            sat_id = rng.choices(sat_ids, weights)[0]
+            if real_freqs.get(sat_id) and rng.random() < 0.7:
+                freq, pol, sym_rate = rng.choice(real_freqs[sat_id])
+                freq += rng.choice([0, 0, 0, 1, -1, 2])
+            else:
+                freq = rng.randint(10700, 12750)
+                pol = rng.randint(0, 1)
+                sym_rate = rng.choice([22000, 27500, 29900, 30000])
+            ts_id = rng.randint(1, 65535)
+            on_id = rng.choice([1, 2, 318, 64511, 176, 8])
+            transponders.append((tp_id, sat_id, tp_id, ts_id, on_id, freq, sym_rate, pol,
+                                 rng.randint(1, 8), rng.randint(0, 2)))
+            if rng.random() < 0.2:
+                network_names.append((tp_id, rng.choice(NETWORK_NAMES)))
+        conn.executemany(
+            "INSERT INTO satellite_transponder_table "
+            "(id, sat_id, disp_order, ts_id, on_id, freq, sym_rate, pol, fec, modulation) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", transponders)
+        conn.executemany(
+            "INSERT INTO tp_network_name_table (tp_id, name) VALUES (?, ?)", network_names)
+        network_count = len(network_names)
+
+        # Programmes, audio, sous-titres, mapping
+        prog_rows = []
+        audio_rows = []
+        sub_rows = []
+        mapping_rows = []
+        for pid in range(1, programs + 1):
+            tp = transponders[rng.randrange(tp_count)]
+            tp_id, sat_id, freq = tp[0], tp[1], tp[5]
+            is_radio = rng.random() < 0.15
+            service_type = 2 if is_radio else rng.choice([1, 1, 1, 25, 22])
+            service_id = rng.randint(1, 65535)
+            name = random_name(rng) if rng.random() > 0.02 else ''
+            if is_radio:
+                width = height = fps = 0
+                vid_type = 0
+            else:
+                width, height, fps = rng.choice(VIDEO_FORMATS)
+                vid_type = 27 if width >= 1280 else 2
+            prog_rows.append((
+                pid, tp_id, service_id,
+                rng.randint(1, network_count) if network_count and rng.random() < 0.3 else 0,
+                pid if rng.random() < 0.6 else -1, name, vid_type, int(is_radio), pid,
+                service_type, rng.choice(CA_SYSTEMS), width, height, fps,
+                rng.randint(800, 15000) if not is_radio else rng.randint(64, 320),
+            ))
+            for track in range(rng.choice([1, 1, 2, 2, 3])):
+                audio_rows.append((pid, 100 + track, rng.choice(AUDIO_LANGUAGES),
+                                   rng.choice([3, 4, 129]), track))
+            if not is_radio and rng.random() < 0.3:
+                sub_rows.append((pid, 200, rng.choice(SUBTITLE_LANGUAGES), 0))
+            angle, direction = sat_info[sat_id]
+            mapping_rows.append((pid, angle, direction, freq, service_id))
+
+        conn.executemany(
+            "INSERT INTO program_table "
+            "(id, tp_id, service_id, network_name_id, lcn_no, name, vid_type, tv_type, disp_order, "
+            "service_type, ca_systemid_list, video_width, video_height, video_fps, bitrate) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", prog_rows)
+        conn.executemany(
+            "INSERT INTO audio_table (prog_id, audio_pid, language, type, audio_track) "
+            "VALUES (?, ?, ?, ?, ?)", audio_rows)
+        conn.executemany(
+            "INSERT INTO subtitle_table (prog_id, sub_pid, language, type) VALUES (?, ?, ?, ?)",
+            sub_rows)
+        conn.executemany(
+            "INSERT INTO sat_program_mapping_table (program_id, sat_angle, sat_direction, tp_freq, sid) "
+            "VALUES (?, ?, ?, ?, ?)", mapping_rows)
+
+        # Favoris : environ 1% des programmes, répartis dans les groupes
+        fav_rows = []
+        orders = {g: 0 for g in FAV_GROUPS}
+        for pid in rng.sample(range(1, programs + 1), max(1, programs // 100)):
+            group = rng.choice(list(FAV_GROUPS))
+            orders[group] += 1
+            fav_rows.append((pid, group, orders[group], 0))
+        conn.executemany(
+            "INSERT INTO fav_prog_table (prog_id, fav_group_id, disp_order, tv_type) "
+            "VALUES (?, ?, ?, ?)", fav_rows)
+
+    conn.close()
+    return {
+        'programs': programs,
+        'transponders': tp_count,
+        'audio': len(audio_rows),
+        'subtitles': len(sub_rows),
+        'favorites': len(fav_rows),
+    }
+
+
+def db_path_for(out_dir, programs):
+    return os.path.join(out_dir, f'database_{programs // 1000}k.db')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère des bases récepteur synthétiques")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="Nombre de programmes par base")
+    parser.add_argument('--out', default=OUTPUT_DIR, help="Dossier de sortie")
+    parser.add_argument('--template', default=TEMPLATE_DB, help="Base modèle (schéma)")
+    parser.add_argument('--seed', type=int, default=750)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out, exist_ok=True)
+    for size in args.sizes:
+        path = db_path_for(args.out, size)
+        stats = generate(path, size, template=args.template, seed=args.seed)
+        print(f"✅ {path}: {stats['programs']} programmes, {stats['transponders']} transpondeurs, "
+              f"{stats['audio']} audio, {stats['subtitles']} sous-titres, {stats['favorites']} favoris")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Import en masse de timers (enregistrements / visionnage) avec détection des conflits.
+
+CSV d'évènements (en-tête obligatoire, colonnes end OU duration):
+
+    channel,start,end,duration,repeat,type,power_off
+    Rai 1 HD,2026-10-20 20:45,22:30,,once,record,0
+    1686,2026-10-21 18:00,,90,weekly,record,0
+
+channel: nom de chaîne (ou "nom@satellite") ou id de program_table.
+end: "AAAA-MM-JJ HH:MM" ou "HH:MM" (lendemain si avant le début).
+repeat: once / daily / weekly. type: record / view.
+
+Un tuner ne peut servir deux timers simultanés que s'ils sont sur le même
+transpondeur (même tp_id, même tuner_index). Les timers existants de
+timer_info_table et ceux du CSV sont indexés dans un arbre d'intervalles :
+chaque vérification ne parcourt que les timers qui chevauchent. Les répétitions
+sont développées sur --horizon jours. Pour chaque conflit, des solutions sont
+proposées (même chaîne sur un autre transpondeur, décalage, raccourcissement).
+
+Dry-run par défaut ; --apply écrit les timers sans conflit en une transaction.
+
+Usage:
+    python3 import_timers.py evenements.csv
+    python3 import_timers.py evenements.csv --apply -o database_new.db
+"""
+
+import argparse
+import csv
+import shutil
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+import profiling
+from find_duplicates import normalize_name
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+
+# Codes du récepteur (timer_info_table)
+REPEAT_CODES = {'once': 0, 'daily': 1, 'weekly': 2}
+REPEAT_STEPS = {0: None, 1: timedelta(days=1), 2: timedelta(days=7)}
+TIMER_TYPES = {'view': 0, 'record': 1}
+
+DEFAULT_HORIZON = 14  # jours de répétitions vérifiés
+MAX_SHIFT_TRIES = 10
+
+
+class TimerError(ValueError):
+    pass
+
+
+class IntervalTree:
+    """Arbre d'intervalles centré (statique), intervalles semi-ouverts [début, fin)"""
+
+    def __init__(self, intervals):
+        # intervals: [(début, fin, valeur)] avec fin > début
+        points = sorted(p for start, end, _ in intervals for p in (start, end))
+        self.center = points[(len(points) - 1) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] <= self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here, key=lambda iv: iv[0])
+        self.by_end = sorted(here, key=lambda iv: iv[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def overlapping(self, start, end):
+        """Valeurs des intervalles qui chevauchent [start, end)"""
+        result = []
+        node = [self]
+        while node:
+            tree = node.pop()
+            if end <= tree.center:
+                for s, _, value in tree.by_start:
+                    if s >= end:
+                        break
+                    result.append(value)
+            elif start > tree.center:
+                for _, e, value in tree.by_end:
+                    if e <= start:
+                        break
+                    result.append(value)
+            else:
+                result.extend(value for _, _, value in tree.by_start)
+            if tree.left and start < tree.center:
+                node.append(tree.left)
+            if tree.right and end > tree.center:
+                node.append(tree.right)
+        return result
+
+
+def load_programs(cursor):
+    """Programmes avec transpondeur et tuner: {id: dict}"""
+    cursor.execute("""
+        SELECT p.id, p.name, p.tp_id, IFNULL(tp.tuner_index, 0), IFNULL(tp.freq, 0),
+               IFNULL(tp.pol, 0), IFNULL(s.name, '')
+        FROM program_table p
+        LEFT JOIN satellite_transponder_table tp ON p.tp_id = tp.id
+        LEFT JOIN satellite_table s ON tp.sat_id = s.id
+    """)
+    return {pid: {'id': pid, 'name': name.strip(), 'tp_id': tp_id, 'tuner': int(tuner),
+                  'freq': freq, 'pol': int(pol), 'satellite': sat.strip()}
+            for pid, name, tp_id, tuner, freq, pol, sat in cursor.fetchall()}
+
+
+def load_existing_timers(cursor, programs):
+    cursor.execute("""
+        SELECT id, prog_id, channel_name, iStartYear, ucStartMonth, ucStartDay, ucStartHour, ucStartMin,
+               iEndYear, ucEndMonth, ucEndDay, ucEndHour, ucEndMin, ucTimerRepeat, ucTimerType, ucActive
+        FROM timer_info_table
+    """)
+    timers = []
+    for row in cursor.fetchall():
+        if not int(row[15]) or row[1] not in programs:
+            continue
+        try:
+            start = datetime(*map(int, row[3:8]))
+            end = datetime(*map(int, row[8:13]))
+        except ValueError:
+            continue  # Date invalide dans la base: ignorée
+        timers.append({'label': f"timer #{row[0]} {row[2]}", 'program': programs[row[1]], 'start': start,
+                       'end': end, 'repeat': int(row[13]), 'type': int(row[14]), 'power_off': 0,
+                       'existing': True})
+    return timers
+
+
+def channel_index(programs):
+    index = {}
+    for p in programs.values():
+        index.setdefault(normalize_name(p['name']), []).append(p)
+    return index
+
+
+def resolve_channel(value, programs, by_name):
+    value = value.strip()
+    if value.isdigit() and int(value) in programs:
+        return programs[int(value)]
+    name, _, satellite = value.partition('@')
+    candidates = by_name.get(normalize_name(name), [])
+    if satellite:
+        candidates = [p for p in candidates if p['satellite'].lower() == satellite.strip().lower()]
+    if not candidates:
+        raise TimerError(f"chaîne inconnue: {value!r}")
+    return min(candidates, key=lambda p: p['id'])
+
+
+def parse_datetime(text):
+    return datetime.strptime(text.strip(), '%Y-%m-%d %H:%M')
+
+
+def parse_timers(path, programs, by_name):
+    """Timers du CSV; erreurs de ligne retournées à part"""
+    timers, errors = [], []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for line_no, row in enumerate(csv.DictReader(f), 2):
+            try:
+                program = resolve_channel(row.get('channel', ''), programs, by_name)
+                start = parse_datetime(row['start'])
+                end_text = (row.get('end') or '').strip()
+                if end_text and len(end_text) <= 5:
+                    end = datetime.combine(start.date(), datetime.strptime(end_text, '%H:%M').time())
+                    if end <= start:
+                        end += timedelta(days=1)
+                elif end_text:
+                    end = parse_datetime(end_text)
+                elif (row.get('duration') or '').strip():
+                    end = start + timedelta(minutes=int(row['duration']))
+                else:
+                    raise TimerError("end ou duration requis")
+                if end <= start:
+                    raise TimerError("fin avant le début")
+                repeat = (row.get('repeat') or 'once').strip().lower()
+                kind = (row.get('type') or 'record').strip().lower()
+                if repeat not in REPEAT_CODES:
+                    raise TimerError(f"repeat inconnu: {repeat}")
+                if kind not in TIMER_TYPES:
+                    raise TimerError(f"type inconnu: {kind}")
+                power_off = (row.get('power_off') or '0').strip()
+                if not power_off.isdigit():
+                    raise TimerError(f"power_off invalide: {power_off}")
+                power_off = int(power_off)
+            except (TimerError, ValueError, KeyError) as e:
+                errors.append(f"ligne {line_no}: {e}")
+                continue
+            timers.append({'label': f"ligne {line_no} {program['name']}", 'program': program, 'start': start,
+                           'end': end, 'repeat': REPEAT_CODES[repeat], 'type': TIMER_TYPES[kind],
+                           'power_off': power_off, 'existing': False})
+    return timers, errors
+
+
+def to_minutes(moment):
+    return int(moment.timestamp() // 60)
+
+
+def occurrence_times(timer, horizon_end):
+    """(début, fin) en datetime des occurrences du timer jusqu'à horizon_end"""
+    step = REPEAT_STEPS.get(timer['repeat'])
+    start, end = timer['start'], timer['end']
+    while True:
+        yield start, end
+        if step is None or start + step > horizon_end:
+            return
+        start, end = start + step, end + step
+
+
+def occurrences(timer, horizon_end, margin_before=0, margin_after=0):
+    """Intervalles [début, fin) en minutes des occurrences du timer jusqu'à horizon_end"""
+    for start, end in occurrence_times(timer, horizon_end):
+        yield to_minutes(start) - margin_before, to_minutes(end) + margin_after
+
+
+def conflicts_of(timer_id, timers, accepted, tree, horizon_end, margins, start=None, end=None, program=None):
+    """Timers acceptés en conflit (même tuner, autre transpondeur) avec le timer donné"""
+    timer = timers[timer_id]
+    program = program or timer['program']
+    if start is not None:
+        timer = dict(timer, start=start, end=end)
+    found = set()
+    for s, e in occurrences(timer, horizon_end, *margins):
+        for other_id in tree.overlapping(s, e):
+            if other_id == timer_id or other_id not in accepted:
+                continue
+            other = timers[other_id]['program']
+            if other['tuner'] == program['tuner'] and other['tp_id'] != program['tp_id']:
+                found.add(other_id)
+    return found
+
+
+def first_conflict(timer_id, timers, accepted, tree, horizon_end, margins, start=None, end=None):
+    """Première occurrence en conflit: (début, fin, [(début, fin) des occurrences bloquantes]) ou None"""
+    timer = timers[timer_id]
+    program = timer['program']
+    if start is not None:
+        timer = dict(timer, start=start, end=end)
+    before, after = margins
+    for occ_start, occ_end in occurrence_times(timer, horizon_end):
+        s, e = to_minutes(occ_start) - before, to_minutes(occ_end) + after
+        blocking = []
+        for other_id in tree.overlapping(s, e):
+            if other_id == timer_id or other_id not in accepted:
+                continue
+            other = timers[other_id]
+            if other['program']['tuner'] != program['tuner'] or other['program']['tp_id'] == program['tp_id']:
+                continue
+            blocking.extend((o_start, o_end) for o_start, o_end in occurrence_times(other, horizon_end)
+                            if to_minutes(o_start) - before < e and to_minutes(o_end) + after > s)
+        if blocking:
+            return occ_start, occ_end, blocking
+    return None
+
+
+def suggest(timer_id, timers, accepted, tree, horizon_end, margins, conflicts, by_name):
+    """Propositions de résolution d'un conflit"""
+    timer = timers[timer_id]
+    program = timer['program']
+    suggestions = []
+
+    # 1. Même chaîne diffusée sur un autre transpondeur libre
+    for alt in by_name.get(normalize_name(program['name']), []):
+        if alt['tp_id'] != program['tp_id'] and not conflicts_of(
+                timer_id, timers, accepted, tree, horizon_end, margins, program=alt):
+            suggestions.append(f"même chaîne sur {alt['satellite']} {alt['freq']} (id {alt['id']})")
+            break
+
+    # Occurrence réellement en conflit (pas forcément la première d'un timer répété)
+    gap = timedelta(minutes=sum(margins))
+    duration = timer['end'] - timer['start']
+    conflict = first_conflict(timer_id, timers, accepted, tree, horizon_end, margins)
+    occ_start, occ_end, blocking = conflict
+    when = f" (occurrence du {occ_start:%Y-%m-%d})" if timer['repeat'] else ''
+
+    # 2. Raccourcir: finir avant le début de l'occurrence bloquante
+    new_end = min(b_start for b_start, _ in blocking) - gap
+    if occ_start < new_end:
+        shortened = new_end - occ_start
+        if not conflicts_of(timer_id, timers, accepted, tree, horizon_end, margins,
+                            start=timer['start'], end=timer['start'] + shortened):
+            suggestions.append(f"raccourcir: fin à {new_end:%H:%M} au lieu de {occ_end:%H:%M}{when}")
+
+    # 3. Décaler toutes les occurrences après la fin des occurrences bloquantes
+    start = timer['start']
+    for _ in range(MAX_SHIFT_TRIES):
+        start += max(b_end for _, b_end in blocking) + gap - occ_start
+        conflict = first_conflict(timer_id, timers, accepted, tree, horizon_end, margins,
+                                  start=start, end=start + duration)
+        if conflict is None:
+            suggestions.append(f"décaler: {start:%Y-%m-%d %H:%M} → {start + duration:%H:%M}")
+            break
+        occ_start, _, blocking = conflict
+
+    # 4. Dernier recours: libérer le tuner
+    names = ', '.join(timers[c]['label'] for c in sorted(conflicts))
+    suggestions.append(f"supprimer ou déplacer: {names}")
+    return suggestions
+
+
+def check(timers, horizon_end, margins, by_name):
+    """Retourne ({id: [conflits]}, {id: [suggestions]}) ; les timers existants sont prioritaires"""
+    # Un arbre sur toutes les occurrences de tous les timers (existants + CSV)
+    intervals = []
+    for timer_id, timer in enumerate(timers):
+        intervals.extend((s, e, timer_id) for s, e in occurrences(timer, horizon_end, *margins) if e > s)
+    tree = IntervalTree(intervals) if intervals else None
+
+    accepted = {i for i, t in enumerate(timers) if t['existing']}
+    conflicts, suggestions = {}, {}
+    for timer_id, timer in enumerate(timers):
+        if timer['existing']:
+            continue
+        found = conflicts_of(timer_id, timers, accepted, tree, horizon_end, margins) if tree else set()
+        if found:
+            conflicts[timer_id] = sorted(found)
+            suggestions[timer_id] = suggest(timer_id, timers, accepted, tree, horizon_end, margins,
+                                            found, by_name)
+        else:
+            accepted.add(timer_id)
+    return conflicts, suggestions
+
+
+def write_timers(conn, timers):
+    """Ajoute les timers dans timer_info_table en une transaction"""
+    cursor = conn.cursor()
+    with conn:
+        cursor.execute("SELECT IFNULL(MAX(disp_order), -1) FROM timer_info_table")
+        disp_order = cursor.fetchone()[0]
+        rows = []
+        for t in timers:
+            disp_order += 1
+            s, e = t['start'], t['end']
+            rows.append((t['program']['id'], disp_order, t['program']['name'][:64],
+                         s.year, e.year, s.month, e.month, s.day, e.day, s.hour, e.hour, s.minute, e.minute,
+                         t['repeat'], t['type'], t['power_off'], 1))
+        cursor.executemany("""
+            INSERT INTO timer_info_table (prog_id, disp_order, channel_name, iStartYear, iEndYear,
+                ucStartMonth, ucEndMonth, ucStartDay, ucEndDay, ucStartHour, ucEndHour, ucStartMin, ucEndMin,
+                ucTimerRepeat, ucTimerType, ucPowerOff, ucActive)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import de timers avec détection des conflits de tuner")
+    parser.add_argument('csv', help="CSV des évènements")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help="Jours de répétitions vérifiés")
+    parser.add_argument('--margin-before', type=int, default=0, help="Marge avant (minutes)")
+    parser.add_argument('--margin-after', type=int, default=0, help="Marge après (minutes)")
+    parser.add_argument('--apply', action='store_true', help="Écrire les timers sans conflit")
+    parser.add_argument('-o', '--output', help="Copier la base ici avant écriture")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    cursor = conn.cursor()
+    with profiling.stage('load'):
+        programs = load_programs(cursor)
+        by_name = channel_index(programs)
+        existing = load_existing_timers(cursor, programs)
+    conn.close()
+
+    try:
+        new, errors = parse_timers(args.csv, programs, by_name)
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    for error in errors:
+        print(f"❌ {error}")
+
+    # Import relancé: les timers déjà présents dans la base (même répétition) ne sont pas réécrits
+    scheduled = {(t['program']['id'], t['start'], t['end']): t for t in existing}
+    kept = []
+    for t in new:
+        same = scheduled.get((t['program']['id'], t['start'], t['end']))
+        if same and same['repeat'] == t['repeat']:
+            print(f"   ⏭️  déjà programmé: {t['label']} {t['start']:%Y-%m-%d %H:%M}")
+            continue
+        if same:
+            print(f"   ⚠️  répétition modifiée: {same['label']} existe déjà avec une autre répétition, "
+                  f"{t['label']} est importé en plus (supprimer l'ancien sur le récepteur)")
+        kept.append(t)
+    new = kept
+
+    timers = existing + new
+    if not new:
+        print("Aucun timer à importer")
+        return 1 if errors else 0
+    horizon_end = min(t['start'] for t in new) + timedelta(days=args.horizon)
+    margins = (args.margin_before, args.margin_after)
+    with profiling.stage('check'):
+        conflicts, suggestions = check(timers, horizon_end, margins, by_name)
+
+    print(f"⏰ {len(new)} timers à importer, {len(existing)} existants\n")
+    ok = []
+    for timer_id in range(len(existing), len(timers)):
+        t = timers[timer_id]
+        p = t['program']
+        label = f"{t['start']:%Y-%m-%d %H:%M}-{t['end']:%H:%M} {p['name']} ({p['satellite']} {p['freq']})"
+        if timer_id not in conflicts:
+            ok.append(t)
+            print(f"   ✅ {label}")
+            continue
+        print(f"   ⚠️  {label}")
+        print(f"      conflit: {', '.join(timers[c]['label'] for c in conflicts[timer_id])}")
+        for suggestion in suggestions[timer_id]:
+            print(f"      → {suggestion}")
+
+    print(f"\n📊 {len(ok)} sans conflit, {len(conflicts)} en conflit, {len(errors)} lignes invalides")
+    if not args.apply:
+        print("🔎 Dry-run: rien n'a été écrit (ajouter --apply)")
+        return 0
+
+    target = args.db
+    if args.output:
+        shutil.copy2(args.db, args.output)
+        target = args.output
+    conn = sqlite3.connect(target)
+    with profiling.stage('write'):
+        write_timers(conn, ok)
+    conn.close()
+    print(f"💾 {len(ok)} timers écrits dans {target}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
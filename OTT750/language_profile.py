@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Profil de langues par chaîne (pistes audio et sous-titres).
+
+Le profil est construit en une seule requête agrégée sur audio_table et
+subtitle_table, puis mis en cache à côté de la base (database.db.langs.json).
+Le cache est invalidé dès que la taille ou la date de la base change.
+Les requêtes ("audio fra", "audio ara + sous-titres eng") sont des
+intersections d'ensembles en mémoire, sans jointure par chaîne.
+
+Usage:
+    python3 language_profile.py --audio fra
+    python3 language_profile.py --audio ara --subtitle eng
+    python3 language_profile.py --list
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+import profiling
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+
+CACHE_SUFFIX = '.langs.json'
+CACHE_VERSION = 1
+
+# Codes langue du récepteur -> ISO 639-2
+# Déduits des chaînes de database.db (ex: 105 sur Rai, 76 sur Canal+/arte)
+LANGUAGE_CODES = {
+    0: 'und',
+    11: 'ara',
+    38: 'bul',
+    61: 'deu',
+    69: 'eng',
+    76: 'fra',
+    88: 'ell',
+    105: 'ita',
+    124: 'kur',
+    178: 'pol',
+    189: 'rus',
+    207: 'spa',
+}
+
+# Synonymes acceptés en ligne de commande / dans les filtres
+LANGUAGE_ALIASES = {
+    'fre': 'fra', 'ger': 'deu', 'gre': 'ell', 'en': 'eng', 'fr': 'fra', 'de': 'deu',
+    'ar': 'ara', 'it': 'ita', 'es': 'spa', 'pl': 'pol', 'ru': 'rus',
+}
+
+_CODES_BY_NAME = {name: code for code, name in LANGUAGE_CODES.items()}
+
+
+def language_label(code):
+    """Libellé d'un code langue du récepteur (ISO 639-2 si connu)"""
+    return LANGUAGE_CODES.get(code, str(code))
+
+
+def resolve_language(value):
+    """Convertit 'fra', 'fr', '76'... en code langue du récepteur"""
+    value = str(value).strip().lower()
+    if value.isdigit():
+        return int(value)
+    value = LANGUAGE_ALIASES.get(value, value)
+    if value not in _CODES_BY_NAME:
+        raise ValueError(f"Langue inconnue: {value}")
+    return _CODES_BY_NAME[value]
+
+
+def _db_signature(db_path):
+    stat = os.stat(db_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_profiles(conn):
+    """{prog_id: (langues audio, langues sous-titres)} en une requête agrégée"""
+    cursor = conn.execute("""
+        SELECT p.id, a.langs, s.langs
+        FROM program_table p
+        LEFT JOIN (SELECT prog_id, group_concat(DISTINCT language) AS langs
+                   FROM audio_table GROUP BY prog_id) a ON a.prog_id = p.id
+        LEFT JOIN (SELECT prog_id, group_concat(DISTINCT language) AS langs
+                   FROM subtitle_table GROUP BY prog_id) s ON s.prog_id = p.id
+    """)
+    profiles = {}
+    for pid, audio, subs in cursor.fetchall():
+        profiles[pid] = (
+            tuple(int(x) for x in audio.split(',')) if audio else (),
+            tuple(int(x) for x in subs.split(',')) if subs else (),
+        )
+    return profiles
+
+
+class LanguageIndex:
+    """Index inversé langue -> ids de programmes, pour audio et sous-titres"""
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.audio = {}
+        self.subtitles = {}
+        for pid, (audio, subs) in profiles.items():
+            for code in audio:
+                self.audio.setdefault(code, set()).add(pid)
+            for code in subs:
+                self.subtitles.setdefault(code, set()).add(pid)
+
+    @classmethod
+    def load(cls, db_path, conn=None):
+        """Charge le profil depuis le cache, ou le reconstruit si la base a changé"""
+        cache_path = db_path + CACHE_SUFFIX
+        signature = _db_signature(db_path)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == CACHE_VERSION and cached.get('signature') == signature:
+                profiles = {int(pid): (tuple(a), tuple(s)) for pid, (a, s) in cached['profiles'].items()}
+                return cls(profiles)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        own_conn = conn is None
+        if own_conn:
+            conn = sqlite3.connect(db_path)
+        try:
+            profiles = build_profiles(conn)
+        finally:
+            if own_conn:
+                conn.close()
+
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'signature': signature,
+                           'profiles': {pid: [a, s] for pid, (a, s) in profiles.items()}}, f)
+        except OSError:
+            pass  # Dossier en lecture seule: le profil reste en mémoire
+        return cls(profiles)
+
+    def query(self, audio=None, subtitle=None):
+        """Ids des programmes ayant la piste audio et/ou les sous-titres demandés.
+
+        Retourne None si aucun critère n'est donné (pas de filtre).
+        """
+        result = None
+        if audio is not None:
+            result = set(self.audio.get(audio, ()))
+        if subtitle is not None:
+            subs = self.subtitles.get(subtitle, set())
+            result = subs.copy() if result is None else result & subs
+        return result
+
+    def languages(self):
+        """Tous les codes langue présents (audio ou sous-titres)"""
+        return set(self.audio) | set(self.subtitles)
+
+    def audio_languages(self):
+        return sorted(self.audio, key=lambda c: -len(self.audio[c]))
+
+    def subtitle_languages(self):
+        return sorted(self.subtitles, key=lambda c: -len(self.subtitles[c]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chaînes par langue audio / sous-titres")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--audio', help="Langue audio (fra, ara, 76...)")
+    parser.add_argument('--subtitle', help="Langue des sous-titres")
+    parser.add_argument('--list', action='store_true', help="Lister les langues présentes")
+    args = parser.parse_args(argv)
+
+    with profiling.stage('load_profiles'):
+        index = LanguageIndex.load(args.db)
+
+    if args.list or (args.audio is None and args.subtitle is None):
+        print("🔊 Langues audio:")
+        for code in index.audio_languages():
+            print(f"   {language_label(code):<6} ({code:>3}): {len(index.audio[code])} chaînes")
+        print("\n💬 Langues sous-titres:")
+        for code in index.subtitle_languages():
+            print(f"   {language_label(code):<6} ({code:>3}): {len(index.subtitles[code])} chaînes")
+        return 0
+
+    try:
+        audio = resolve_language(args.audio) if args.audio else None
+        subtitle = resolve_language(args.subtitle) if args.subtitle else None
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    ids = index.query(audio=audio, subtitle=subtitle)
+    conn = sqlite3.connect(args.db)
+    rows = conn.execute("""
+        SELECT p.id, p.name, s.name FROM program_table p
+        LEFT JOIN satellite_transponder_table t ON p.tp_id = t.id
+        LEFT JOIN satellite_table s ON t.sat_id = s.id
+        ORDER BY s.name, p.name
+    """).fetchall()
+    conn.close()
+
+    matches = [(name, sat) for pid, name, sat in rows if pid in ids]
+    print(f"📺 {len(matches)} chaînes")
+    for name, sat in matches:
+        print(f"   {sat or '?':<16} {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
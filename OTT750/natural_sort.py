@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Clés de tri naturel pour les noms de chaînes (éditeurs).
+
+Accents et casse ignorés, nombres comparés par valeur :
+"2M" < "Arte" < "Échos TV" < "TF1" < "TF10" (et non "TF10" < "TF2").
+
+Les clés sont calculées une fois par nom puis mises en cache : retrier des
+milliers de lignes ne fait plus que des comparaisons de tuples. Le tri Python
+étant stable, les noms équivalents gardent leur ordre précédent.
+"""
+
+import functools
+import re
+import unicodedata
+
+_NUMBER_RE = re.compile(r'(\d+)')
+
+
+@functools.lru_cache(maxsize=None)
+def natural_key(text):
+    """Clé de tri: alternance (texte replié, nombre, texte replié, ...)"""
+    folded = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c)).casefold()
+    parts = _NUMBER_RE.split(' '.join(folded.split()))
+    # Indices impairs = nombres: les types restent alignés d'une clé à l'autre
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts))
+
+
+def number_key(value):
+    """Clé d'une colonne numérique (LCN): valeurs absentes ou négatives en dernier"""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return (1, 0)
+    return (1, 0) if value < 0 else (0, value)
@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+Analyse des captures PCAPdroid (protocole GMScreen / MultiScreen) sans Wireshark.
+
+Lecture en flux des fichiers .pcap : chaque enregistrement est lu dans un
+tampon réutilisé et découpé par memoryview, les flux TCP sont réassemblés
+(numéros de séquence, segments hors ordre, retransmissions) puis décodés :
+  - SSDP (UDP 1900)        : M-SEARCH, NOTIFY, réponses 200 OK
+  - HTTP / SOAP UPnP       : requêtes, SOAPACTION et arguments (KeyValue...)
+  - GMScreen (TCP 20000)   : requêtes "Start%07dEnd<xml>", réponses
+                             "GCDH" + longueur + commande + XML zlib
+Le protocole est reconnu au contenu, quel que soit le port (8888, 49152...).
+
+Sortie: chronologie horodatée des commandes, latence aller-retour de chaque
+requête (premier octet de la requête -> premier octet de la réponse) et
+résumé par commande. La mémoire reste bornée: les messages sont affichés
+au fil de l'eau et les tampons TCP vidés dès qu'un message est complet.
+
+Constaté dans les captures: le trafic de contrôle passe par TCP 20000 (et
+non par SOAP/49152 comme supposé dans ANALYSE_PROTOCOLE_GMSCREEN.md) ; la
+réponse au login (998) est un bloc binaire masqué par XOR 0x5B.
+
+Usage:
+    python3 pcap_analyzer.py
+    python3 pcap_analyzer.py PCAPdroid_07_déc._13_43_38.pcap --summary
+    python3 pcap_analyzer.py capture.pcap --csv chronologie.csv --raw
+"""
+
+import argparse
+import collections
+import csv
+import glob
+import os
+import re
+import struct
+import sys
+import zlib
+
+import profiling
+
+PCAP_DIR = '/home/kamel/OTT750'
+PCAP_PATTERN = 'PCAPdroid_*.pcap'
+
+# En-tête global: magic -> (boutisme, diviseur des fractions de seconde)
+PCAP_MAGICS = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e9),
+}
+PCAPNG_MAGIC = b'\x0a\x0d\x0d\x0a'
+
+# Types de lien -> décalage de l'en-tête IP (None: Ethernet, à analyser)
+LINK_ETHERNET = 1
+LINK_OFFSETS = {0: 4, 12: 0, 101: 0, 113: 16, 228: 0, 229: 0, 276: 20}
+
+SSDP_PORT = 1900
+MAX_PENDING_SEGMENTS = 256   # segments hors ordre gardés par sens avant abandon
+MAX_HEADER = 64 * 1024       # en-têtes HTTP jugés invalides au-delà
+MAX_EARLY = 64 * 1024        # octets serveur gardés avant le premier octet client
+MAX_WAITING = 64             # requêtes sans réponse gardées par clé
+MAX_SEARCHES = 256           # clients SSDP dont la dernière M-SEARCH est gardée
+
+GM_REQUEST_MAGIC = b'Start'
+GM_RESPONSE_MAGIC = b'GCDH'
+GM_REQUEST_HEADER = struct.Struct('5s7s3s')        # Start, longueur décimale, End
+GM_RESPONSE_HEADER = struct.Struct('<4sIII')       # GCDH, longueur, commande, réservé
+GM_LOGIN = 998
+GM_XOR_KEY = 0x5B
+
+# Commandes GMScreen observées dans les captures (sens déduit des échanges)
+GM_COMMANDS = {
+    0: 'liste des chaînes',
+    3: 'chaîne courante',
+    12: 'groupes favoris',
+    15: 'infos récepteur',
+    16: 'type de liste / IP client',
+    20: 'verrous',
+    23: 'état',
+    26: 'keep-alive',
+    998: 'login',
+    1000: 'changer de chaîne',
+    1012: 'abonnement',
+    2001: 'notification zapping',
+}
+
+HTTP_METHODS = (b'GET ', b'POST ', b'HEAD ', b'PUT ', b'DELETE ', b'OPTIONS ', b'SUBSCRIBE ',
+                b'UNSUBSCRIBE ', b'NOTIFY ', b'M-SEARCH ')
+
+_XML_FIELD_RE = re.compile(r'<(\w+)>([^<]*)</\1>')
+_GM_REQUEST_RE = re.compile(r'request="(\d+)"')
+_ASCII_RUN_RE = re.compile(rb'[\x20-\x7e]{4,}')
+
+Message = collections.namedtuple('Message', 'ts protocol kind name key detail')
+
+
+class PcapError(Exception):
+    pass
+
+
+def read_pcap(path):
+    """Enregistrements (horodatage, type de lien, memoryview) lus un par un.
+
+    Le memoryview pointe dans un tampon réutilisé: il n'est valable que
+    jusqu'à l'enregistrement suivant.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(24)
+        if header[:4] == PCAPNG_MAGIC:
+            raise PcapError(f"{path}: format pcapng non supporté (exporter en pcap)")
+        if len(header) < 24 or header[:4] not in PCAP_MAGICS:
+            raise PcapError(f"{path}: pas un fichier pcap")
+        endian, divisor = PCAP_MAGICS[header[:4]]
+        snaplen, linktype = struct.unpack(endian + 'II', header[16:24])
+        record = struct.Struct(endian + 'IIII')
+
+        buffer = bytearray(max(snaplen, 65535))
+        view = memoryview(buffer)
+        record_header = bytearray(record.size)
+        while f.readinto(record_header) == record.size:
+            seconds, fraction, captured, _ = record.unpack(record_header)
+            if captured > len(buffer):
+                buffer = bytearray(captured)
+                view = memoryview(buffer)
+            if f.readinto(view[:captured]) < captured:
+                break  # capture tronquée
+            yield seconds + fraction / divisor, linktype, view[:captured]
+
+
+def ip_payload(linktype, frame):
+    """memoryview du paquet IP d'une trame, None si autre chose"""
+    if linktype == LINK_ETHERNET:
+        offset, ethertype = 14, struct.unpack_from('>H', frame, 12)[0] if len(frame) >= 14 else 0
+        while ethertype in (0x8100, 0x88A8) and len(frame) >= offset + 4:  # VLAN
+            ethertype = struct.unpack_from('>H', frame, offset + 2)[0]
+            offset += 4
+        return frame[offset:] if ethertype in (0x0800, 0x86DD) else None
+    offset = LINK_OFFSETS.get(linktype)
+    return frame[offset:] if offset is not None else None
+
+
+def parse_ip(packet):
+    """(ip source, ip destination, protocole, memoryview de la couche transport)"""
+    if len(packet) < 20:
+        return None
+    version = packet[0] >> 4
+    if version == 4:
+        header = (packet[0] & 0x0F) * 4
+        total = struct.unpack_from('>H', packet, 2)[0]
+        if struct.unpack_from('>H', packet, 6)[0] & 0x1FFF:
+            return None  # fragment IP non initial
+        src = '.'.join(map(str, packet[12:16]))
+        dst = '.'.join(map(str, packet[16:20]))
+        return src, dst, packet[9], packet[header:total or len(packet)]
+    if version == 6 and len(packet) >= 40:
+        length = struct.unpack_from('>H', packet, 4)[0]
+        src = bytes(packet[8:24]).hex(':', 2)
+        dst = bytes(packet[24:40]).hex(':', 2)
+        return src, dst, packet[6], packet[40:40 + length]
+    return None
+
+
+def xml_fields(text, limit=6):
+    """Champs simples <Nom>valeur</Nom> d'un fragment XML -> 'Nom=valeur, ...'"""
+    fields = _XML_FIELD_RE.findall(text)
+    parts = [f"{name}={value}" for name, value in fields[:limit]]
+    if len(fields) > limit:
+        parts.append(f"... ({len(fields)} champs)")
+    return ', '.join(parts)
+
+
+def parse_headers(block):
+    """Ligne de départ et en-têtes (noms en minuscules) d'un bloc HTTP/SSDP"""
+    lines = bytes(block).decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+# --- Décodeurs de flux ---------------------------------------------------
+
+class StreamDecoder:
+    """Tampon d'un sens de connexion TCP: reçoit les octets dans l'ordre, produit des messages"""
+
+    protocol = 'raw'
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.start = None  # horodatage du premier octet du message en cours
+
+    def feed(self, ts, data):
+        if not self.buffer:
+            self.start = ts
+        self.buffer += data
+        messages = []
+        while self.buffer:
+            message, used = self.parse()
+            if not used:
+                break
+            del self.buffer[:used]
+            if message:
+                messages.append(message)
+            self.start = ts
+        return messages
+
+    def parse(self):
+        """(message ou None, octets consommés); 0 octet = message incomplet"""
+        return Message(self.start, self.protocol, 'raw', 'données', None, f"{len(self.buffer)} octets"), \
+            len(self.buffer)
+
+    def flush(self):
+        """Fin de capture: reste du tampon"""
+        self.buffer.clear()
+        return []
+
+
+class GmscreenRequestDecoder(StreamDecoder):
+    protocol = 'gmscreen'
+
+    def parse(self):
+        buf = self.buffer
+        if len(buf) < GM_REQUEST_HEADER.size:
+            return None, 0
+        magic, length, end = GM_REQUEST_HEADER.unpack_from(buf)
+        if magic != GM_REQUEST_MAGIC or end != b'End' or not length.isdigit():
+            return self.resync()
+        total = GM_REQUEST_HEADER.size + int(length)
+        if len(buf) < total:
+            return None, 0
+        text = bytes(buf[GM_REQUEST_HEADER.size:total]).decode('utf-8', 'replace')
+        match = _GM_REQUEST_RE.search(text)
+        command = int(match.group(1)) if match else -1
+        return Message(self.start, self.protocol, 'request', gm_name(command), command,
+                       xml_fields(text)), total
+
+    def resync(self):
+        index = self.buffer.find(GM_REQUEST_MAGIC, 1)
+        used = index if index > 0 else len(self.buffer)
+        return Message(self.start, self.protocol, 'raw', 'octets non reconnus', None, f"{used} octets"), used
+
+
+class GmscreenResponseDecoder(StreamDecoder):
+    protocol = 'gmscreen'
+
+    def parse(self):
+        buf = self.buffer
+        if not buf.startswith(GM_RESPONSE_MAGIC[:len(buf)]):
+            return self.binary_block()
+        if len(buf) < GM_RESPONSE_HEADER.size:
+            return None, 0
+        _, length, command, _ = GM_RESPONSE_HEADER.unpack_from(buf)
+        total = GM_RESPONSE_HEADER.size + length
+        if len(buf) < total:
+            return None, 0
+        body = bytes(buf[GM_RESPONSE_HEADER.size:total])
+        try:
+            text = zlib.decompress(body).decode('utf-8', 'replace')
+        except zlib.error:
+            text = ''
+        items = text.count('<parm>')
+        detail = xml_fields(text)
+        if items > 1:
+            detail = f"{items} éléments: {detail}"
+        return Message(self.start, self.protocol, 'response', gm_name(command), command, detail), total
+
+    def binary_block(self):
+        """Bloc hors trame GCDH (réponse au login): jusqu'à la prochaine trame ou la fin des données reçues"""
+        index = self.buffer.find(GM_RESPONSE_MAGIC)
+        size = index if index > 0 else len(self.buffer)
+        return self.binary_message(size), size
+
+    def binary_message(self, size):
+        clear = bytes(b ^ GM_XOR_KEY for b in self.buffer[:size])
+        strings = [s.decode('ascii') for s in _ASCII_RUN_RE.findall(clear)]
+        detail = f"{size} octets XOR 0x{GM_XOR_KEY:02X}" + (f": {' '.join(strings)}" if strings else '')
+        return Message(self.start, self.protocol, 'response', gm_name(GM_LOGIN), GM_LOGIN, detail)
+
+
+
+class HttpDecoder(StreamDecoder):
+    """HTTP/1.x (requêtes ou réponses), SOAP UPnP compris; corps non XML sautés sans les garder"""
+
+    protocol = 'http'
+
+    def __init__(self):
+        super().__init__()
+        self.skip = 0  # octets de corps restant à ignorer
+
+    def feed(self, ts, data):
+        if self.skip:
+            skipped = min(self.skip, len(data))
+            self.skip -= skipped
+            data = data[skipped:]
+            if not data:
+                return []
+        return super().feed(ts, data)
+
+    def parse(self):
+        buf = self.buffer
+        end = buf.find(b'\r\n\r\n')
+        if end < 0:
+            if len(buf) > MAX_HEADER:
+                return Message(self.start, self.protocol, 'raw', 'octets non reconnus', None,
+                               f"{len(buf)} octets"), len(buf)
+            return None, 0
+        start_line, headers = parse_headers(buf[:end])
+        body_start = end + 4
+        length = (headers.get('content-length') or '0').strip()
+        if not length.isdigit():
+            # Corps de taille inconnue: données reçues jugées non décodables
+            return Message(self.start, self.protocol, 'raw', 'Content-Length invalide', None,
+                           f"{start_line[:60]}: {len(buf)} octets"), len(buf)
+        length = int(length)
+        content_type = headers.get('content-type', '')
+        soap = 'soapaction' in headers
+
+        if soap or 'xml' in content_type:
+            if len(buf) < body_start + length:
+                return None, 0
+            body = bytes(buf[body_start:body_start + length]).decode('utf-8', 'replace')
+            used = body_start + length
+        else:
+            # Corps binaire (média...): consommé au fil de l'eau
+            body = ''
+            available = min(length, len(buf) - body_start)
+            self.skip = length - available
+            used = body_start + available
+
+        if start_line.startswith('HTTP/'):
+            status = start_line.split(' ', 2)
+            detail = xml_fields(body) if body else content_type
+            return Message(self.start, 'soap' if 'Envelope>' in body else self.protocol, 'response',
+                           ' '.join(status[1:]), None, detail), used
+
+        method, _, rest = start_line.partition(' ')
+        target = rest.rsplit(' ', 1)[0]
+        if soap:
+            action = headers['soapaction'].strip('"').rpartition('#')[2]
+            return Message(self.start, 'soap', 'request', action, None,
+                           f"{target} {xml_fields(body)}".strip()), used
+        return Message(self.start, self.protocol, 'request', f"{method} {target}", None,
+                       headers.get('host', '')), used
+
+
+def sniff_decoders(data):
+    """(décodeur client, décodeur serveur) d'après les premiers octets reçus du client"""
+    head = bytes(data[:16])
+    if head.startswith(GM_REQUEST_MAGIC):
+        return GmscreenRequestDecoder(), GmscreenResponseDecoder()
+    if head.startswith(HTTP_METHODS):
+        return HttpDecoder(), HttpDecoder()
+    return None
+
+
+# --- Réassemblage TCP ------------------------------------------------------
+
+class HalfStream:
+    """Un sens d'une connexion TCP: remet les segments dans l'ordre des séquences"""
+
+    def __init__(self):
+        self.next_seq = None
+        self.pending = {}  # seq -> (horodatage, octets) des segments arrivés en avance
+        self.closed = False
+
+    def segment(self, ts, seq, syn, payload):
+        """Segments devenus contigus: [(horodatage, données)]"""
+        if syn:
+            self.next_seq = (seq + 1) & 0xFFFFFFFF
+            return []
+        if not payload:
+            return []
+        if self.next_seq is None:
+            self.next_seq = seq  # capture commencée en cours de connexion
+        ready = []
+        self.add(ts, seq, payload, ready)
+        while self.pending:
+            for pending_seq in list(self.pending):
+                if seq_diff(pending_seq, self.next_seq) <= 0:
+                    pending_ts, data = self.pending.pop(pending_seq)
+                    self.add(pending_ts, pending_seq, data, ready)
+                    break
+            else:
+                if len(self.pending) <= MAX_PENDING_SEGMENTS:
+                    break
+                # Trou jamais comblé (paquet perdu par la capture): on saute au segment suivant
+                self.next_seq = min(self.pending, key=lambda s: seq_diff(s, self.next_seq))
+        return ready
+
+    def add(self, ts, seq, payload, ready):
+        diff = seq_diff(seq, self.next_seq)
+        if diff > 0:
+            self.pending.setdefault(seq, (ts, bytes(payload)))
+        elif -diff < len(payload):
+            data = payload[-diff:]
+            ready.append((ts, bytes(data)))
+            self.next_seq = (self.next_seq + len(data)) & 0xFFFFFFFF
+        # sinon: retransmission déjà reçue
+
+
+def seq_diff(a, b):
+    """a - b en arithmétique de séquence TCP (modulo 2^32, signé)"""
+    return ((a - b + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+
+class Connection:
+    def __init__(self, client, server, label):
+        self.client, self.server, self.label = client, server, label
+        self.halves = {client: HalfStream(), server: HalfStream()}
+        self.decoders = None     # {endpoint: StreamDecoder}, choisis au premier octet du client
+        self.early = []          # données serveur arrivées avant celles du client
+        self.early_bytes = 0
+        self.waiting = collections.defaultdict(
+            lambda: collections.deque(maxlen=MAX_WAITING))  # clé -> requêtes sans réponse
+        self.bytes = 0
+
+
+class Analyzer:
+    """Réassemble, décode et apparie requêtes / réponses; les événements sont passés à emit()"""
+
+    def __init__(self, emit, include_raw=False):
+        self.emit = emit  # emit(message, flux, sens, latence en secondes ou None)
+        self.include_raw = include_raw
+        self.connections = {}
+        self.searches = collections.OrderedDict()  # client SSDP -> dernière M-SEARCH (MAX_SEARCHES clients)
+        self.stats = {}
+        self.packets = 0
+
+    # Événements et statistiques
+
+    def event(self, message, label, direction, request=None):
+        """request: requête à laquelle répond le message (latence et statistiques de la requête)"""
+        if message.kind == 'raw' and not self.include_raw:
+            return
+        latency = None
+        if message.kind == 'request':
+            stat = self.stats.setdefault((message.protocol, message.name), [0, 0, 0.0, None, 0.0])
+            stat[0] += 1
+        elif request is not None:
+            latency = message.ts - request.ts
+            stat = self.stats.setdefault((request.protocol, request.name), [0, 0, 0.0, None, 0.0])
+            stat[1] += 1
+            stat[2] += latency
+            stat[3] = latency if stat[3] is None else min(stat[3], latency)
+            stat[4] = max(stat[4], latency)
+        self.emit(message, label, direction, latency)
+
+    # Paquets
+
+    def packet(self, ts, linktype, frame):
+        self.packets += 1
+        packet = ip_payload(linktype, frame)
+        parsed = parse_ip(packet) if packet is not None else None
+        if not parsed:
+            return
+        src, dst, proto, l4 = parsed
+        if proto == 6 and len(l4) >= 20:
+            self.tcp(ts, src, dst, l4)
+        elif proto == 17 and len(l4) >= 8:
+            sport, dport = struct.unpack_from('>HH', l4)
+            if SSDP_PORT in (sport, dport):
+                self.ssdp(ts, (src, sport), (dst, dport), l4[8:])
+
+    def tcp(self, ts, src, dst, segment):
+        sport, dport, seq = struct.unpack_from('>HHI', segment)
+        offset = (segment[12] >> 4) * 4
+        flags = segment[13]
+        syn, fin, rst, ack = flags & 0x02, flags & 0x01, flags & 0x04, flags & 0x10
+        a, b = (src, sport), (dst, dport)
+        key = (a, b) if a < b else (b, a)
+
+        conn = self.connections.get(key)
+        if conn is None:
+            if rst or (fin and len(segment) <= offset):
+                return
+            # Client: auteur du SYN, sinon le port éphémère (le plus grand)
+            client, server = (a, b) if (syn and not ack) or (not syn and sport > dport) else (b, a)
+            conn = self.connections[key] = Connection(
+                client, server, f"{client[0]}:{client[1]} ⇄ {server[0]}:{server[1]}")
+
+        half = conn.halves[a]
+        for chunk_ts, data in half.segment(ts, seq, syn, segment[offset:]):
+            conn.bytes += len(data)
+            self.stream_data(conn, a, chunk_ts, data)
+        if fin or rst:
+            half.closed = True
+            if rst or all(h.closed for h in conn.halves.values()):
+                self.close(key)
+
+    def stream_data(self, conn, sender, ts, data):
+        if conn.decoders is None:
+            if sender != conn.client:
+                conn.early.append((ts, bytes(data)))
+                conn.early_bytes += len(data)
+                if conn.early_bytes <= MAX_EARLY:
+                    return
+                # Le client ne parle pas: flux brut, mémoire bornée
+                conn.decoders = {conn.client: StreamDecoder(), conn.server: StreamDecoder()}
+            else:
+                pair = sniff_decoders(data) or (StreamDecoder(), StreamDecoder())
+                conn.decoders = {conn.client: pair[0], conn.server: pair[1]}
+                self.decode(conn, sender, ts, data)
+            for early_ts, early in conn.early:
+                self.decode(conn, conn.server, early_ts, early)
+            conn.early = []
+            return
+        self.decode(conn, sender, ts, data)
+
+    def decode(self, conn, sender, ts, data):
+        self.deliver(conn, sender, conn.decoders[sender].feed(ts, data))
+
+    def deliver(self, conn, sender, messages):
+        from_client = sender == conn.client
+        for message in messages:
+            request = None
+            if message.kind == 'request':
+                conn.waiting[message.key].append(message)
+            elif message.kind == 'response':
+                # GMScreen: même numéro de commande; HTTP: ordre d'arrivée (clé None)
+                waiting = conn.waiting.get(message.key)
+                if waiting:
+                    request = waiting.popleft()
+                elif message.protocol == 'gmscreen':
+                    message = message._replace(kind='notification')
+            self.event(message, conn.label, '→' if from_client else '←', request)
+
+    def close(self, key):
+        conn = self.connections.pop(key)
+        if conn.decoders:
+            for endpoint, decoder in conn.decoders.items():
+                self.deliver(conn, endpoint, decoder.flush())
+
+    def finish(self):
+        for key in list(self.connections):
+            self.close(key)
+
+    # SSDP (UDP)
+
+    def ssdp(self, ts, src, dst, payload):
+        end = bytes(payload).find(b'\r\n\r\n')
+        start_line, headers = parse_headers(payload[:end if end >= 0 else len(payload)])
+        label = f"{src[0]}:{src[1]} → {dst[0]}:{dst[1]}"
+        target = headers.get('st') or headers.get('nt') or ''
+        if start_line.startswith('M-SEARCH'):
+            message = Message(ts, 'ssdp', 'request', 'M-SEARCH', None, target)
+            self.searches[src] = message
+            self.searches.move_to_end(src)
+            if len(self.searches) > MAX_SEARCHES:
+                self.searches.popitem(last=False)
+            self.event(message, label, '→')
+        elif start_line.startswith('NOTIFY'):
+            detail = f"{headers.get('nts', '')} {target} {headers.get('location', '')}".strip()
+            self.event(Message(ts, 'ssdp', 'notification', 'NOTIFY', None, detail), label, '←')
+        elif start_line.startswith('HTTP/'):
+            # Plusieurs réponses possibles par recherche: latence depuis la recherche la plus récente
+            detail = f"{target} {headers.get('location', '')}".strip()
+            message = Message(ts, 'ssdp', 'response', 'M-SEARCH', None, detail)
+            self.event(message, label, '←', self.searches.get(dst))
+
+
+def gm_name(command):
+    label = GM_COMMANDS.get(command)
+    return f"{command} {label}" if label else str(command)
+
+
+def default_captures():
+    return sorted(glob.glob(os.path.join(PCAP_DIR, PCAP_PATTERN)))
+
+
+def analyze(path, emit, include_raw=False):
+    """Analyse d'un fichier, événements transmis à emit(message, flux, sens, latence)"""
+    analyzer = Analyzer(emit, include_raw)
+    for ts, linktype, frame in read_pcap(path):
+        analyzer.packet(ts, linktype, frame)
+    analyzer.finish()
+    return analyzer
+
+
+def print_summary(stats):
+    print(f"\n   {'Protocole':<10} {'Commande':<32} {'Req.':>5} {'Rép.':>5} "
+          f"{'moy ms':>8} {'min ms':>8} {'max ms':>8}")
+    for (protocol, name), (requests, answered, total, low, high) in sorted(stats.items()):
+        if answered:
+            timing = f"{1000 * total / answered:>8.1f} {1000 * low:>8.1f} {1000 * high:>8.1f}"
+        else:
+            timing = f"{'-':>8} {'-':>8} {'-':>8}"
+        print(f"   {protocol:<10} {name[:32]:<32} {requests:>5} {answered:>5} {timing}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chronologie des commandes GMScreen / UPnP d'une capture pcap")
+    parser.add_argument('captures', nargs='*', help=f"Fichiers pcap (défaut: {PCAP_PATTERN} de {PCAP_DIR})")
+    parser.add_argument('--summary', action='store_true', help="Résumé par commande uniquement")
+    parser.add_argument('--raw', action='store_true', help="Afficher aussi les octets non décodés")
+    parser.add_argument('--csv', help="Écrire la chronologie en CSV")
+    args = parser.parse_args(argv)
+
+    captures = args.captures or default_captures()
+    if not captures:
+        print(f"❌ Aucune capture {PCAP_PATTERN} dans {PCAP_DIR}")
+        return 1
+
+    csv_file = open(args.csv, 'w', newline='', encoding='utf-8') if args.csv else None
+    writer = csv.writer(csv_file) if csv_file else None
+    if writer:
+        writer.writerow(['capture', 'temps', 'flux', 'sens', 'protocole', 'type', 'commande',
+                         'latence_ms', 'detail'])
+
+    status = 0
+    for path in captures:
+        name = os.path.basename(path)
+        print(f"\n📦 {name}")
+        origin = []
+
+        def emit(message, label, direction, latency):
+            if not origin:
+                origin.append(message.ts)
+            elapsed = message.ts - origin[0]
+            latency_ms = f"{1000 * latency:.1f}" if latency is not None else ''
+            if writer:
+                writer.writerow([name, f"{elapsed:.6f}", label, direction, message.protocol, message.kind,
+                                 message.name, latency_ms, message.detail])
+            if not args.summary:
+                timing = f" ({latency_ms} ms)" if latency_ms else ''
+                print(f"   {elapsed:9.3f} {direction} {message.protocol:<8} {message.kind:<12} "
+                      f"{message.name}{timing}  {message.detail[:100]}")
+
+        try:
+            with profiling.stage('analyze'):
+                analyzer = analyze(path, emit, args.raw)
+        except (OSError, PcapError) as e:
+            print(f"❌ {e}")
+            status = 1
+            continue
+        print(f"   {analyzer.packets} paquets")
+        print_summary(analyzer.stats)
+
+    if csv_file:
+        csv_file.close()
+        print(f"\n💾 CSV: {args.csv}")
+    return status
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Profilage intégré des scripts (--profile ou variable d'environnement KMZ_PROFILE).
+
+Activation:
+    python3 enrich_database.py --profile                 # tableau à la sortie
+    python3 enrich_database.py --profile=run.prof        # + fichier pstats (cProfile)
+    python3 enrich_database.py --profile=run.speedscope.json   # + étapes pour speedscope
+    KMZ_PROFILE=1 python3 fetch_meta.py
+
+Mesures par étape (profiling.stage): temps réel, requêtes SQL exécutées,
+lignes lues / écrites, pic mémoire (tracemalloc). Les connexions sqlite3
+ouvertes après install() sont instrumentées automatiquement.
+
+Désactivé, install() ne modifie rien et stage() renvoie un contexte vide.
+
+SimpleRADIO/profiling.py en est une copie identique (chaque dossier reste autonome):
+modifier les deux fichiers ensemble.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+ENV_VAR = 'KMZ_PROFILE'
+
+_enabled = False
+_output = None
+_profiler = None
+_original_connect = sqlite3.connect
+
+# Compteurs globaux, lus en début / fin d'étape
+_counters = {'sql': 0, 'read': 0, 'written': 0}
+_stack = []      # étapes en cours: [nom, début, compteurs au début, pic des sous-étapes]
+_stages = {}     # nom -> {'calls', 'wall', 'sql', 'read', 'written', 'peak'}
+_order = []      # ordre d'apparition des étapes
+_events = []     # événements speedscope (type, frame, instant)
+_start = None
+
+
+def enabled():
+    return _enabled
+
+
+class _ProfiledCursor:
+    """Curseur compteur de lignes lues / écrites"""
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)  # row_factory, arraysize... sur le vrai curseur
+
+    def _count_written(self):
+        if self._cursor.rowcount > 0:
+            _counters['written'] += self._cursor.rowcount
+
+    def execute(self, *args):
+        self._cursor.execute(*args)
+        self._count_written()
+        return self
+
+    def executemany(self, *args):
+        self._cursor.executemany(*args)
+        self._count_written()
+        return self
+
+    def executescript(self, *args):
+        self._cursor.executescript(*args)
+        return self
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            _counters['read'] += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        _counters['read'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        _counters['read'] += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            _counters['read'] += 1
+            yield row
+
+
+class _ProfiledConnection:
+    """Connexion sqlite3 instrumentée (requêtes comptées via trace callback)"""
+
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+        conn.set_trace_callback(_count_statement)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)  # row_factory, isolation_level... sur la vraie connexion
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def cursor(self, *args):
+        return _ProfiledCursor(self._conn.cursor(*args))
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def executescript(self, *args):
+        return self.cursor().executescript(*args)
+
+
+def _count_statement(statement):
+    _counters['sql'] += 1
+
+
+def _profiled_connect(*args, **kwargs):
+    return _ProfiledConnection(_original_connect(*args, **kwargs))
+
+
+def _parse_argv():
+    """Retire --profile[=fichier] de sys.argv, retourne (activé, fichier)"""
+    found, output = False, None
+    for arg in list(sys.argv[1:]):
+        if arg == '--profile' or arg.startswith('--profile='):
+            found = True
+            output = arg.partition('=')[2] or output
+            sys.argv.remove(arg)
+    return found, output
+
+
+def install():
+    """Active le profilage si demandé (--profile ou KMZ_PROFILE). À appeler dans __main__."""
+    global _enabled, _output, _profiler, _start
+    found, output = _parse_argv()
+    env = os.environ.get(ENV_VAR, '')
+    if not found and env in ('', '0'):
+        return
+    if not output and env not in ('', '0', '1'):
+        output = env
+
+    _enabled = True
+    _output = output
+    sqlite3.connect = _profiled_connect
+    tracemalloc.start()
+    if _output and not _output.endswith('.json'):
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+    _start = time.perf_counter()
+    atexit.register(_report)
+
+
+def _enter(name):
+    if _stack:
+        # Le pic courant appartient au parent tant que la sous-étape n'a pas démarré
+        _stack[-1][3] = max(_stack[-1][3], tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+    now = time.perf_counter()
+    _stack.append([name, now, dict(_counters), 0])
+    _events.append(('O', name, now))
+
+
+def _exit():
+    name, began, counters, child_peak = _stack.pop()
+    now = time.perf_counter()
+    peak = max(child_peak, tracemalloc.get_traced_memory()[1])
+    _events.append(('C', name, now))
+
+    if name not in _stages:
+        _stages[name] = {'calls': 0, 'wall': 0.0, 'sql': 0, 'read': 0, 'written': 0, 'peak': 0}
+        _order.append(name)
+    stats = _stages[name]
+    stats['calls'] += 1
+    stats['wall'] += now - began
+    for key in ('sql', 'read', 'written'):
+        stats[key] += _counters[key] - counters[key]
+    stats['peak'] = max(stats['peak'], peak)
+
+    if _stack:
+        _stack[-1][3] = max(_stack[-1][3], peak)
+    tracemalloc.reset_peak()
+
+
+@contextlib.contextmanager
+def _stage(name):
+    _enter(name)
+    try:
+        yield
+    finally:
+        _exit()
+
+
+def stage(name):
+    """Contexte de mesure d'une étape (no-op si le profilage est désactivé)"""
+    if not _enabled:
+        return contextlib.nullcontext()
+    return _stage(name)
+
+
+def _format_bytes(size):
+    for unit in ('o', 'Ko', 'Mo'):
+        if size < 1024:
+            return f"{size:.0f}{unit}"
+        size /= 1024
+    return f"{size:.1f}Go"
+
+
+def _report():
+    if _profiler is not None:
+        _profiler.disable()
+    total = time.perf_counter() - _start
+    _, peak = tracemalloc.get_traced_memory()
+    peak = max([peak] + [s['peak'] for s in _stages.values()])
+
+    print(f"\n⏱️  Profil ({os.path.basename(sys.argv[0])})", file=sys.stderr)
+    print(f"   {'Étape':<28} {'Appels':>6} {'Temps':>9} {'SQL':>7} {'Lues':>8} {'Écrites':>8} {'Pic mém.':>9}",
+          file=sys.stderr)
+    for name in _order:
+        s = _stages[name]
+        print(f"   {name[:28]:<28} {s['calls']:>6} {s['wall']:>8.3f}s {s['sql']:>7} {s['read']:>8} "
+              f"{s['written']:>8} {_format_bytes(s['peak']):>9}", file=sys.stderr)
+    print(f"   {'TOTAL':<28} {'':>6} {total:>8.3f}s {_counters['sql']:>7} {_counters['read']:>8} "
+          f"{_counters['written']:>8} {_format_bytes(peak):>9}", file=sys.stderr)
+
+    if not _output:
+        return
+    if _profiler is not None:
+        _profiler.dump_stats(_output)
+    else:
+        _write_speedscope(_output, total)
+    print(f"   💾 {_output}", file=sys.stderr)
+
+
+def _write_speedscope(path, total):
+    """Profil évènementiel speedscope des étapes (https://www.speedscope.app)"""
+    frames = {}
+    events = []
+    for kind, name, at in _events:
+        index = frames.setdefault(name, len(frames))
+        events.append({'type': kind, 'frame': index, 'at': round((at - _start) * 1000, 3)})
+    data = {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': [{'name': name} for name in frames]},
+        'profiles': [{
+            'type': 'evented',
+            'name': os.path.basename(sys.argv[0]),
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': round(total * 1000, 3),
+            'events': events,
+        }],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Stockage en colonnes des programmes, pour les requêtes qualité ad-hoc.
+
+program_table et les colonnes transpondeur / satellite sont lues une seule
+fois (une requête, lecture par lots) dans des tableaux typés (module array).
+Les filtres s'appliquent colonne par colonne sur ces tableaux, sans SQL :
+
+    height >= 720 and fta = 1 and angle = 130 and bitrate > 5000
+    name ~ /sport/i and vid_type = 36
+
+Même syntaxe que les règles de favorites_rules.py (~ /regex/flags, =, !=,
+>=, <=, >, <). Champs: voir FIELDS.
+
+Utilisé par export_channels.py (--where) et editor_favoris.py (chargement
+des chaînes par satellite, champ "Requête").
+
+Usage:
+    python3 program_store.py --where "height >= 720 and fta = 1 and angle = 130"
+    python3 program_store.py --where "fta = 0" --group-by satellite
+    python3 program_store.py --group-by vid_type --group-by satellite
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+
+import profiling
+from favorites_rules import AND_RE, CONDITION_RE, OPERATORS, REGEX_FLAGS, RuleError
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+
+FETCH_BATCH = 5000
+
+# Colonnes numériques: nom -> (expression SQL, type array)
+INT_COLUMNS = {
+    'id': ('p.id', 'l'),
+    'tp_id': ('p.tp_id', 'l'),
+    'service_id': ('p.service_id', 'l'),
+    'lcn_no': ('p.lcn_no', 'l'),
+    'vid_type': ('p.vid_type', 'h'),
+    'service_type': ('p.service_type', 'h'),
+    'video_width': ('p.video_width', 'l'),
+    'video_height': ('p.video_height', 'l'),
+    'video_fps': ('p.video_fps', 'l'),
+    'bitrate': ('p.bitrate', 'l'),
+    'on_id': ('tp.on_id', 'l'),
+    'ts_id': ('tp.ts_id', 'l'),
+    'freq': ('tp.freq', 'l'),
+    'sym_rate': ('tp.sym_rate', 'l'),
+    'pol': ('tp.pol', 'B'),
+    'fec': ('tp.fec', 'B'),
+    'modulation': ('tp.modulation', 'B'),
+    'sat_id': ('tp.sat_id', 'l'),
+    'angle': ('s.angle', 'l'),
+    'sat_dir': ('s.sat_dir', 'B'),
+}
+
+TEXT_COLUMNS = {
+    'name': 'p.name',
+    'satellite': 's.name',
+    'ca_systemid_list': 'p.ca_systemid_list',
+}
+
+# Noms utilisables dans les requêtes -> colonne
+FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'satellite': 'satellite',
+    'sat_id': 'sat_id',
+    'angle': 'angle',
+    'freq': 'freq',
+    'sym_rate': 'sym_rate',
+    'pol': 'pol',
+    'tp_id': 'tp_id',
+    'on_id': 'on_id',
+    'ts_id': 'ts_id',
+    'modulation': 'modulation',
+    'service_id': 'service_id',
+    'service_type': 'service_type',
+    'lcn': 'lcn_no',
+    'vid_type': 'vid_type',
+    'width': 'video_width',
+    'height': 'video_height',
+    'fps': 'video_fps',
+    'bitrate': 'bitrate',
+    'ca': 'ca_systemid_list',
+    'fta': 'fta',
+}
+
+
+def _text_eq(value, expected):
+    return value.strip().lower() == expected
+
+
+def _text_ne(value, expected):
+    return value.strip().lower() != expected
+
+
+class ProgramStore:
+    """Colonnes typées des programmes (une ligne = un programme)"""
+
+    def __init__(self, columns, favorites):
+        self.columns = columns
+        self.favorites = favorites  # prog_id -> {fav_group_id}
+        self._row_by_id = None
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    @classmethod
+    def load(cls, db_path=DB_PATH, conn=None):
+        """Lit program_table (+ transpondeur, satellite) et fav_prog_table en une passe"""
+        own_conn = conn is None
+        if own_conn:
+            conn = sqlite3.connect(db_path)
+        try:
+            columns = {name: array(code) for name, (_, code) in INT_COLUMNS.items()}
+            columns.update({name: [] for name in TEXT_COLUMNS})
+            columns['fta'] = array('b')
+
+            int_names = list(INT_COLUMNS)
+            text_names = list(TEXT_COLUMNS)
+            # CAST: colonnes "char unsigned" renvoyées en texte ('1'), IFNULL: LEFT JOIN sans transpondeur
+            select = ([f"IFNULL(CAST({INT_COLUMNS[n][0]} AS INTEGER), 0)" for n in int_names]
+                      + [f"IFNULL({TEXT_COLUMNS[n]}, '')" for n in text_names])
+            cursor = conn.execute(f"""
+                SELECT {', '.join(select)}
+                FROM program_table p
+                LEFT JOIN satellite_transponder_table tp ON p.tp_id = tp.id
+                LEFT JOIN satellite_table s ON tp.sat_id = s.id
+                ORDER BY p.id
+            """)
+
+            targets = [columns[n] for n in int_names + text_names]
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH)
+                if not rows:
+                    break
+                # Transposition du lot: une colonne par tableau
+                for target, values in zip(targets, zip(*rows)):
+                    target.extend(values)
+
+            columns['fta'].extend([0 if ca.strip() else 1 for ca in columns['ca_systemid_list']])
+
+            favorites = {}
+            for pid, gid in conn.execute("SELECT prog_id, fav_group_id FROM fav_prog_table"):
+                favorites.setdefault(pid, set()).add(gid)
+        finally:
+            if own_conn:
+                conn.close()
+        return cls(columns, favorites)
+
+    def column(self, field):
+        return self.columns[FIELDS.get(field, field)]
+
+    def row_of(self, prog_id):
+        """Index de ligne d'un id de programme"""
+        if self._row_by_id is None:
+            self._row_by_id = {pid: i for i, pid in enumerate(self.columns['id'])}
+        return self._row_by_id.get(prog_id)
+
+    def _filter(self, rows, column, op, value):
+        # Évalue une condition sur toute la colonne (ou sur la sélection courante)
+        col = self.columns[column]
+        if rows is None:
+            return array('l', compress(range(len(col)), map(op, col, repeat(value))))
+        return array('l', compress(rows, map(op, map(col.__getitem__, rows), repeat(value))))
+
+    def where(self, query, rows=None):
+        """Lignes satisfaisant la requête ("cond and cond ..."), dans l'ordre de program_table"""
+        for column, op, value in parse_query(query):
+            rows = self._filter(rows, column, op, value)
+            if not rows:
+                break
+        if rows is None:
+            rows = array('l', range(len(self)))
+        return rows
+
+    def ids(self, rows):
+        ids = self.columns['id']
+        return {ids[i] for i in rows}
+
+    def values(self, field, rows):
+        col = self.column(field)
+        return [col[i] for i in rows]
+
+    def count_by(self, fields, rows=None):
+        """Comptage par valeur(s) de colonne(s): Counter {valeur ou tuple: nombre}"""
+        if isinstance(fields, str):
+            fields = [fields]
+        cols = [self.column(f) for f in fields]
+        if rows is None:
+            rows = range(len(self))
+        if len(cols) == 1:
+            return Counter(map(cols[0].__getitem__, rows))
+        return Counter(tuple(col[i] for col in cols) for i in rows)
+
+    def group_by(self, field, rows=None):
+        """{valeur: lignes}"""
+        col = self.column(field)
+        groups = {}
+        for i in (range(len(self)) if rows is None else rows):
+            groups.setdefault(col[i], array('l')).append(i)
+        return groups
+
+
+def parse_query(query):
+    """Compile une requête en conditions (colonne, opérateur, valeur)"""
+    conditions = []
+    for text in AND_RE.split(query.strip()):
+        if not text:
+            continue
+        m = CONDITION_RE.match(text)
+        if not m:
+            raise RuleError(f"condition invalide: {text!r}")
+        field = m.group('field').lower()
+        if field not in FIELDS:
+            raise RuleError(f"champ inconnu: {field} (champs: {', '.join(FIELDS)})")
+        column = FIELDS[field]
+        numeric = column not in TEXT_COLUMNS
+
+        if m.group('regex') is not None:
+            flags = 0
+            for flag in m.group('flags'):
+                flags |= REGEX_FLAGS.get(flag, 0)
+            try:
+                pattern = re.compile(m.group('regex'), flags)
+            except re.error as e:
+                raise RuleError(f"regex invalide: {e}")
+            conditions.append((column, lambda v, p: p.search(str(v)) is not None, pattern))
+            continue
+
+        op_text = m.group('op')
+        value = m.group('value').strip()
+        if numeric:
+            try:
+                value = int(value)
+            except ValueError:
+                raise RuleError(f"valeur numérique attendue pour {field}")
+            conditions.append((column, OPERATORS[op_text], value))
+        elif op_text in ('=', '!='):
+            conditions.append((column, _text_eq if op_text == '=' else _text_ne, value.lower()))
+        else:
+            conditions.append((column, OPERATORS[op_text], value))
+    return conditions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Requêtes qualité sur les programmes (en mémoire)")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--where', default='', help="Conditions, ex: \"height >= 720 and fta = 1\"")
+    parser.add_argument('--group-by', action='append', default=[], help="Champ(s) de regroupement")
+    parser.add_argument('--show', type=int, default=20, help="Chaînes listées (0: aucune)")
+    args = parser.parse_args(argv)
+
+    with profiling.stage('load'):
+        store = ProgramStore.load(args.db)
+    try:
+        with profiling.stage('where'):
+            rows = store.where(args.where)
+    except RuleError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"📺 {len(rows)} / {len(store)} programmes")
+    if args.group_by:
+        try:
+            with profiling.stage('group_by'):
+                counts = store.count_by(args.group_by, rows)
+        except KeyError as e:
+            print(f"❌ champ inconnu: {e}")
+            return 1
+        print(f"\n📊 Par {', '.join(args.group_by)}:")
+        for value, count in counts.most_common():
+            label = ' / '.join(map(str, value)) if isinstance(value, tuple) else value
+            print(f"   {str(label)[:40]:<40} {count:>7}")
+    elif args.show:
+        names, sats = store.column('name'), store.column('satellite')
+        freqs, heights = store.column('freq'), store.column('height')
+        for i in rows[:args.show]:
+            print(f"   {sats[i] or '?':<12} {freqs[i]:>6} {heights[i]:>5}p  {names[i]}")
+        if len(rows) > args.show:
+            print(f"   ... {len(rows) - args.show} autres")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Émulateur local du récepteur (HiMultiScreenServerDevice) pour tester sans OTT750.
+
+  - SSDP: répond aux M-SEARCH (UDP, 127.0.0.1:--ssdp-port) pour ssdp:all,
+    upnp:rootdevice, le type de périphérique et les services
+  - HTTP: /description.xml et une URL de contrôle SOAP par service de
+    ANALYSE_PROTOCOLE_GMSCREEN.md ; connexions keep-alive, requêtes en
+    pipeline traitées dans l'ordre
+  - VinputControlServer#SendKeyCode: état simulé (chaîne courante, saisie
+    des chiffres, CH+/CH-), autres actions -> faute SOAP 401 Invalid Action
+  - délai de réponse configurable (--delay, --jitter), fermeture forcée
+    toutes les N requêtes (--close-every) pour tester la reconnexion
+  - journal des événements en JSON lines (--log)
+
+Usage:
+    python3 receiver_emulator.py
+    python3 receiver_emulator.py --port 49152 --delay 20 --jitter 10 --log emulator.jsonl
+    python3 remote_client.py --url http://127.0.0.1:49152/VinputControlServer/control 1 2 3
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+
+import profiling
+from remote_client import DEVICE_TYPE, VINPUT_SERVICE
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 49152
+DEFAULT_SSDP_PORT = 1900
+
+DEVICE_UUID = 'uuid:0d3e2b6a-7f50-4c1e-9a0b-0750e0750750'
+SERVICES = ['VinputControlServer', 'VIMEControlServer', 'GsensorControlServer',
+            'AccessControlServer', 'MirrorControlServer', 'RemoteAppControlServer']
+
+CHANNEL_COUNT = 3294   # ChannelNum du récepteur capturé (pcap_analyzer)
+DIGIT_TIMEOUT = 2.0    # secondes avant validation d'un numéro saisi sans OK
+MAX_BODY = 64 * 1024
+
+_ACTION_RE = re.compile(r'#(\w+)"?$')
+_ARG_RE = re.compile(r'<(\w+)>([^<]*)</\1>')
+
+DESCRIPTION_TEMPLATE = '''<?xml version="1.0"?>
+<root xmlns="urn:schemas-upnp-org:device-1-0">
+  <specVersion><major>1</major><minor>0</minor></specVersion>
+  <URLBase>http://{host}:{port}/</URLBase>
+  <device>
+    <deviceType>{device_type}</deviceType>
+    <friendlyName>GN-OTT 750 4K (émulateur)</friendlyName>
+    <manufacturer>Hisilicon</manufacturer>
+    <modelName>GN-OTT 750 4K</modelName>
+    <UDN>{uuid}</UDN>
+    <serviceList>
+{services}
+    </serviceList>
+  </device>
+</root>
+'''
+
+SERVICE_TEMPLATE = '''      <service>
+        <serviceType>urn:schemas-upnp-org:service:{name}:1</serviceType>
+        <serviceId>urn:upnp-org:serviceId:{name}</serviceId>
+        <SCPDURL>/{name}/scpd.xml</SCPDURL>
+        <controlURL>/{name}/control</controlURL>
+        <eventSubURL>/{name}/event</eventSubURL>
+      </service>'''
+
+SOAP_RESPONSE = ('<?xml version="1.0"?><s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+                 '<s:Body><u:{action}Response xmlns:u="{service}"/></s:Body></s:Envelope>')
+SOAP_FAULT = ('<?xml version="1.0"?><s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">'
+              '<s:Body><s:Fault><faultcode>s:Client</faultcode><faultstring>UPnPError</faultstring>'
+              '<detail><UPnPError xmlns="urn:schemas-upnp-org:control-1-0"><errorCode>{code}</errorCode>'
+              '<errorDescription>{message}</errorDescription></UPnPError></detail></s:Fault></s:Body></s:Envelope>')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class ReceiverState:
+    """Chaîne courante pilotée par les touches (chiffres, OK, CH+/CH-)"""
+
+    def __init__(self, channel=1):
+        self.channel = channel
+        self.digits = ''
+        self.digits_at = 0.0
+        self.keys = 0
+
+    def press(self, key, now):
+        self.keys += 1
+        if self.digits and now - self.digits_at > DIGIT_TIMEOUT:
+            self.commit()
+        key = key.strip().upper()
+        if key.isdigit() and len(key) == 1:
+            self.digits += key
+            self.digits_at = now
+        elif key == 'OK' and self.digits:
+            self.commit()
+        elif key in ('CH+', 'UP'):
+            self.channel = self.channel % CHANNEL_COUNT + 1
+        elif key in ('CH-', 'DOWN'):
+            self.channel = (self.channel - 2) % CHANNEL_COUNT + 1
+        return self.channel
+
+    def commit(self):
+        number = int(self.digits)
+        if 1 <= number <= CHANNEL_COUNT:
+            self.channel = number
+        self.digits = ''
+
+
+class Emulator:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, delay=0.0, jitter=0.0,
+                 close_every=0, log_path=None):
+        self.host, self.port = host, port
+        self.delay, self.jitter = delay, jitter
+        self.close_every = close_every
+        self.state = ReceiverState()
+        self.log_file = open(log_path, 'a', encoding='utf-8') if log_path else None
+        self.requests = 0
+        self.server = self.ssdp_transport = None
+
+    def description(self):
+        services = '\n'.join(SERVICE_TEMPLATE.format(name=name) for name in SERVICES)
+        return DESCRIPTION_TEMPLATE.format(host=self.host, port=self.port, device_type=DEVICE_TYPE,
+                                           uuid=DEVICE_UUID, services=services)
+
+    def log(self, event, **fields):
+        if self.log_file:
+            self.log_file.write(json.dumps({'ts': round(time.time(), 6), 'event': event, **fields}) + '\n')
+            self.log_file.flush()
+
+    # SSDP
+
+    def ssdp_targets(self):
+        return {'ssdp:all', 'upnp:rootdevice', DEVICE_TYPE, DEVICE_UUID} | {
+            f'urn:schemas-upnp-org:service:{name}:1' for name in SERVICES}
+
+    def ssdp_response(self, search_target):
+        return (
+            'HTTP/1.1 200 OK\r\n'
+            'CACHE-CONTROL: max-age=1800\r\n'
+            'EXT:\r\n'
+            f'LOCATION: http://{self.host}:{self.port}/description.xml\r\n'
+            'SERVER: Linux/3.10 UPnP/1.0 HiMultiScreen/1.0\r\n'
+            f'ST: {search_target}\r\n'
+            f'USN: {DEVICE_UUID}::{search_target}\r\n\r\n'
+        ).encode('ascii')
+
+    # HTTP
+
+    async def handle(self, reader, writer):
+        peer = '%s:%s' % writer.get_extra_info('peername')[:2]
+        self.log('connect', client=peer)
+        served = 0
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                request_line, headers = parse_head(head)
+                length = int(headers.get('content-length', 0) or 0)
+                if length > MAX_BODY:
+                    await self.respond(writer, 400, b'', close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                self.requests += 1
+                served += 1
+
+                close = (headers.get('connection', '').lower() == 'close'
+                         or (self.close_every and served >= self.close_every))
+                status, content = await self.dispatch(peer, request_line, headers, body)
+                await self.respond(writer, status, content, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.log('disconnect', client=peer, requests=served)
+            writer.close()
+
+    async def dispatch(self, peer, request_line, headers, body):
+        method, _, rest = request_line.partition(' ')
+        path = rest.rsplit(' ', 1)[0]
+        if method == 'GET' and path == '/description.xml':
+            self.log('description', client=peer)
+            return 200, self.description().encode('utf-8')
+        service, _, endpoint = path.strip('/').partition('/')
+        if service not in SERVICES or endpoint != 'control':
+            return 404, b''
+        if method != 'POST':
+            return 405, b''
+
+        match = _ACTION_RE.search(headers.get('soapaction', ''))
+        action = match.group(1) if match else ''
+        arguments = dict(_ARG_RE.findall(body.decode('utf-8', 'replace')))
+        delay = max(0.0, self.delay + random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+        service_type = f'urn:schemas-upnp-org:service:{service}:1'
+        if service_type == VINPUT_SERVICE and action == 'SendKeyCode' and 'KeyValue' in arguments:
+            channel = self.state.press(arguments['KeyValue'], time.monotonic())
+            self.log('action', client=peer, service=service, action=action, arguments=arguments,
+                     delay_ms=round(1000 * delay, 1), channel=channel)
+            return 200, SOAP_RESPONSE.format(action=action, service=service_type).encode('utf-8')
+
+        self.log('fault', client=peer, service=service, action=action, arguments=arguments)
+        return 500, SOAP_FAULT.format(code=401, message='Invalid Action').encode('utf-8')
+
+    async def respond(self, writer, status, body, close=False):
+        content_type = 'text/xml; charset="utf-8"' if body else 'text/plain'
+        writer.write((
+            f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"close" if close else "keep-alive"}\r\n'
+            'SERVER: Linux/3.10 UPnP/1.0 HiMultiScreen/1.0\r\n\r\n'
+        ).encode('latin-1') + body)
+        await writer.drain()
+
+    async def start(self, ssdp_port=DEFAULT_SSDP_PORT):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # port 0 -> port attribué
+        if ssdp_port is not None:
+            loop = asyncio.get_running_loop()
+            self.ssdp_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _SsdpResponder(self), local_addr=(self.host, ssdp_port))
+        self.log('start', host=self.host, port=self.port, ssdp_port=ssdp_port)
+        return self
+
+    async def stop(self):
+        if self.ssdp_transport:
+            self.ssdp_transport.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.log('stop', requests=self.requests)
+        if self.log_file:
+            self.log_file.close()
+
+    @property
+    def control_url(self):
+        return f'http://{self.host}:{self.port}/VinputControlServer/control'
+
+
+class _SsdpResponder(asyncio.DatagramProtocol):
+    def __init__(self, emulator):
+        self.emulator = emulator
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        request_line, headers = parse_head(data)
+        if not request_line.startswith('M-SEARCH'):
+            return
+        target = headers.get('st', '')
+        answered = target in self.emulator.ssdp_targets()
+        self.emulator.log('m-search', client='%s:%s' % addr[:2], st=target, answered=answered)
+        if answered:
+            self.transport.sendto(self.emulator.ssdp_response(target), addr)
+
+
+def parse_head(data):
+    """Ligne de départ et en-têtes (noms en minuscules) d'une requête HTTP / SSDP"""
+    lines = data.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+async def serve(args):
+    emulator = Emulator(args.host, args.port, args.delay / 1000, args.jitter / 1000,
+                        args.close_every, args.log)
+    await emulator.start(None if args.no_ssdp else args.ssdp_port)
+    print(f"📺 Émulateur HiMultiScreen: http://{emulator.host}:{emulator.port}/description.xml")
+    print(f"   Contrôle: {emulator.control_url}")
+    if not args.no_ssdp:
+        print(f"   SSDP: {emulator.host}:{args.ssdp_port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await emulator.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Émulateur local du récepteur (SSDP + SOAP VinputControlServer)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port HTTP (0: port libre)")
+    parser.add_argument('--ssdp-port', type=int, default=DEFAULT_SSDP_PORT)
+    parser.add_argument('--no-ssdp', action='store_true', help="Sans réponse SSDP")
+    parser.add_argument('--delay', type=float, default=0.0, help="Délai de réponse SOAP (ms)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Variation aléatoire du délai (± ms)")
+    parser.add_argument('--close-every', type=int, default=0,
+                        help="Fermer la connexion toutes les N requêtes (0: jamais)")
+    parser.add_argument('--log', help="Journal des événements (JSON lines)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Arrêt")
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Télécommande asynchrone du récepteur (service UPnP VinputControlServer).
+
+Contrairement à l'exemple de ANALYSE_PROTOCOLE_GMSCREEN.md (un requests.post,
+donc une connexion TCP, par touche), le client :
+  - découvre le HiMultiScreenServerDevice par SSDP (M-SEARCH multicast) et
+    garde le résultat en cache (DEVICE_CACHE, --ttl) ; l'URL de contrôle
+    vient de description.xml
+  - garde une connexion HTTP/1.1 keep-alive vers l'URL de contrôle,
+    rouverte automatiquement si le récepteur la ferme
+  - envoie une séquence de touches en pipeline : toutes les requêtes SOAP
+    partent d'un bloc, les réponses sont lues dans l'ordre ; les touches
+    restées sans réponse sont renvoyées une à une sur une nouvelle connexion
+  - mesure la latence de chaque touche (envoi -> réponse complète)
+
+Pour tester sans récepteur: --url vers un serveur local qui répond aux
+requêtes SOAP (émulateur, serveur de test).
+
+Usage:
+    python3 remote_client.py 1 2 3
+    python3 remote_client.py --zap 123 --ok
+    python3 remote_client.py --url http://127.0.0.1:49152/VinputControlServer/control 1 2 3
+    python3 remote_client.py --discover
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import sys
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlsplit
+
+import profiling
+
+DEVICE_CACHE = '/home/kamel/OTT750/remote_device.json'
+DEFAULT_TTL = 24 * 3600  # secondes
+
+SSDP_ADDR = ('239.255.255.250', 1900)
+DEVICE_TYPE = 'urn:schemas-upnp-org:device:HiMultiScreenServerDevice:1'
+VINPUT_SERVICE = 'urn:schemas-upnp-org:service:VinputControlServer:1'
+DEFAULT_CONTROL_PATH = '/VinputControlServer/control'
+
+DEFAULT_TIMEOUT = 5.0
+DISCOVERY_TIMEOUT = 3.0
+
+SOAP_TEMPLATE = (
+    '<?xml version="1.0"?>'
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/" '
+    's:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/">'
+    '<s:Body><u:{action} xmlns:u="{service}">{arguments}</u:{action}></s:Body>'
+    '</s:Envelope>'
+)
+
+_STATUS_RE = re.compile(rb'HTTP/1\.[01] (\d{3})')
+
+
+class RemoteError(Exception):
+    pass
+
+
+# --- Découverte SSDP -------------------------------------------------------
+
+class _SsdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.locations = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        headers = {}
+        for line in data.decode('latin-1').split('\r\n')[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        if DEVICE_TYPE in (headers.get('st'), headers.get('nt')) and headers.get('location'):
+            self.locations.put_nowait(headers['location'])
+
+
+async def ssdp_search(timeout=DISCOVERY_TIMEOUT, target=SSDP_ADDR):
+    """Première URL de description.xml annoncée par un HiMultiScreenServerDevice"""
+    loop = asyncio.get_running_loop()
+    mx = max(1, int(timeout))
+    request = (
+        'M-SEARCH * HTTP/1.1\r\n'
+        f'HOST: {target[0]}:{target[1]}\r\n'
+        'MAN: "ssdp:discover"\r\n'
+        f'MX: {mx}\r\n'
+        f'ST: {DEVICE_TYPE}\r\n\r\n'
+    ).encode('ascii')
+    transport, protocol = await loop.create_datagram_endpoint(
+        _SsdpProtocol, local_addr=('0.0.0.0', 0), family=socket.AF_INET)
+    try:
+        sock = transport.get_extra_info('socket')
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        # UDP: deux envois pour compenser une perte éventuelle
+        for _ in range(2):
+            transport.sendto(request, target)
+        return await asyncio.wait_for(protocol.locations.get(), timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        transport.close()
+
+
+async def control_url_from_description(location, timeout=DEFAULT_TIMEOUT):
+    """controlURL du service VinputControlServer dans description.xml"""
+    connection = HttpConnection(location, timeout)
+    try:
+        status, body = await connection.request('GET', urlsplit(location).path or '/')
+    finally:
+        await connection.close()
+    if status != 200:
+        raise RemoteError(f"{location}: HTTP {status}")
+    root = ET.fromstring(body)
+    namespace = {'d': 'urn:schemas-upnp-org:device-1-0'}
+    base = root.findtext('d:URLBase', default='', namespaces=namespace) or location
+    for service in root.iterfind('.//d:service', namespace):
+        if service.findtext('d:serviceType', namespaces=namespace) == VINPUT_SERVICE:
+            return urljoin(base, service.findtext('d:controlURL', default='', namespaces=namespace))
+    # Description incomplète: URL documentée
+    return urljoin(base, DEFAULT_CONTROL_PATH)
+
+
+def load_cached_device(path=DEVICE_CACHE, ttl=DEFAULT_TTL):
+    try:
+        with open(path, encoding='utf-8') as f:
+            device = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - device.get('found_at', 0) > ttl or not device.get('control_url'):
+        return None
+    return device
+
+
+def save_cached_device(device, path=DEVICE_CACHE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(device, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+async def discover(cache_path=DEVICE_CACHE, ttl=DEFAULT_TTL, force=False, timeout=DISCOVERY_TIMEOUT,
+                   target=SSDP_ADDR):
+    """{'location', 'control_url', 'found_at'} depuis le cache ou par SSDP, None si introuvable"""
+    if not force:
+        device = load_cached_device(cache_path, ttl)
+        if device:
+            return device
+    location = await ssdp_search(timeout, target)
+    if not location:
+        return None
+    device = {
+        'location': location,
+        'control_url': await control_url_from_description(location),
+        'found_at': time.time(),
+    }
+    save_cached_device(device, cache_path)
+    return device
+
+
+# --- Connexion HTTP keep-alive ---------------------------------------------
+
+class HttpConnection:
+    """Connexion HTTP/1.1 persistante vers un hôte, requêtes en pipeline possibles"""
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise RemoteError(f"URL non supportée: {url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.reader = self.writer = None
+        self.connects = 0
+
+    @property
+    def connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self):
+        if self.connected and self.reader.at_eof():
+            await self.close()  # fermée par le serveur pendant l'inactivité
+        if not self.connected:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout)
+            sock = self.writer.get_extra_info('socket')
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connects += 1
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    def encode(self, method, path, body=b'', headers=None):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        lines.append(f"Content-Length: {len(body)}")
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+    async def read_response(self):
+        """(statut, corps); ferme la connexion si le serveur l'a demandé"""
+        head = await asyncio.wait_for(self.reader.readuntil(b'\r\n\r\n'), self.timeout)
+        match = _STATUS_RE.match(head)
+        if not match:
+            raise RemoteError(f"réponse HTTP invalide: {head[:40]!r}")
+        headers = {}
+        for line in head.decode('latin-1').split('\r\n')[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip().lower()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                body += await self.reader.readexactly(size + 2)
+                del body[-2:]
+                if not size:
+                    await self.reader.readuntil(b'\r\n')
+                    break
+            body = bytes(body)
+        elif 'content-length' in headers:
+            body = await asyncio.wait_for(self.reader.readexactly(int(headers['content-length'])), self.timeout)
+        else:
+            body = await asyncio.wait_for(self.reader.read(), self.timeout)
+            headers['connection'] = 'close'
+
+        if headers.get('connection') == 'close' or head.startswith(b'HTTP/1.0'):
+            await self.close()
+        return int(match.group(1)), body
+
+    async def send(self, data, retry=False):
+        """Une requête encodée -> (statut, corps)
+
+        Une connexion gardée déjà fermée par le serveur est rouverte avant l'envoi.
+        Une fois la requête écrite, l'erreur n'est rejouée que si retry (requête
+        idempotente): le serveur a pu la traiter avant de couper.
+        """
+        for attempt in (1, 2):
+            reused = self.connected
+            await self.connect()
+            try:
+                self.writer.write(data)
+                await self.writer.drain()
+                return await self.read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt == 2 or not (retry and reused):
+                    raise
+            except asyncio.TimeoutError:
+                await self.close()  # réponse en retard: ne pas la lire comme la suivante
+                raise
+
+    async def request(self, method, path, body=b'', headers=None):
+        return await self.send(self.encode(method, path, body, headers), retry=method == 'GET')
+
+
+# --- Client VinputControlServer --------------------------------------------
+
+class RemoteClient:
+    """Touches envoyées au VinputControlServer sur une connexion gardée ouverte"""
+
+    def __init__(self, control_url, timeout=DEFAULT_TIMEOUT):
+        self.control_url = control_url
+        self.path = urlsplit(control_url).path or DEFAULT_CONTROL_PATH
+        self.connection = HttpConnection(control_url, timeout)
+
+    async def __aenter__(self):
+        await self.connection.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.connection.close()
+
+    def soap_request(self, action, **arguments):
+        body = SOAP_TEMPLATE.format(
+            action=action, service=VINPUT_SERVICE,
+            arguments=''.join(f"<{name}>{value}</{name}>" for name, value in arguments.items()),
+        ).encode('utf-8')
+        headers = {
+            'Content-Type': 'text/xml; charset="utf-8"',
+            'SOAPACTION': f'"{VINPUT_SERVICE}#{action}"',
+        }
+        return self.connection.encode('POST', self.path, body, headers)
+
+    async def send_key(self, key):
+        """Latence (s) d'une touche envoyée seule"""
+        return (await self.send_keys_sequential([key]))[0]
+
+    async def send_keys_sequential(self, keys):
+        latencies = []
+        for key in keys:
+            start = time.perf_counter()
+            status, _ = await self.connection.send(self.soap_request('SendKeyCode', KeyValue=key))
+            if status != 200:
+                raise RemoteError(f"touche {key}: HTTP {status}")
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    async def send_keys(self, keys, pipeline=True):
+        """Latence (s) de chaque touche, de son envoi à sa réponse"""
+        if not pipeline or len(keys) < 2:
+            return await self.send_keys_sequential(keys)
+
+        await self.connection.connect()
+        requests = [self.soap_request('SendKeyCode', KeyValue=key) for key in keys]
+        start = time.perf_counter()
+        self.connection.writer.write(b''.join(requests))
+        await self.connection.writer.drain()
+
+        latencies = []
+        try:
+            for key in keys:
+                status, _ = await self.connection.read_response()
+                if status != 200:
+                    raise RemoteError(f"touche {key}: HTTP {status}")
+                latencies.append(time.perf_counter() - start)
+                if not self.connection.connected:
+                    break  # Connection: close, le reste n'est pas traité
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            # Touches suivantes peut-être déjà reçues: pas de renvoi (non idempotent)
+            await self.connection.close()
+            raise RemoteError(f"connexion perdue après {len(latencies)}/{len(keys)} touches") from e
+        except Exception:
+            await self.connection.close()  # réponses restantes non lues
+            raise
+
+        # Serveur ayant fermé après une réponse: touches restantes une par une
+        if len(latencies) < len(keys):
+            latencies.extend(await self.send_keys_sequential(keys[len(latencies):]))
+        return latencies
+
+    async def zap(self, number, ok=False, pipeline=True):
+        """Chiffres du numéro de chaîne (puis OK)"""
+        keys = list(str(number)) + (['OK'] if ok else [])
+        return keys, await self.send_keys(keys, pipeline)
+
+
+def ssdp_target(value):
+    """'127.0.0.1:1901' -> ('127.0.0.1', 1901) pour --ssdp"""
+    host, sep, port = value.rpartition(':')
+    if not sep or not host or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"HOTE:PORT attendu: {value}")
+    return host, int(port)
+
+
+async def resolve_control_url(args):
+    if args.url:
+        return args.url
+    device = await discover(args.cache, args.ttl, force=args.discover, target=args.ssdp)
+    if not device:
+        raise RemoteError("aucun HiMultiScreenServerDevice trouvé (SSDP), utiliser --url")
+    return device['control_url']
+
+
+async def run(args):
+    control_url = await resolve_control_url(args)
+    print(f"📡 {control_url}")
+    keys = list(args.keys)
+    if args.zap:
+        keys += list(args.zap)
+    if args.ok:
+        keys.append('OK')
+    if not keys:
+        return 0
+
+    async with RemoteClient(control_url, args.timeout) as client:
+        all_latencies = []
+        for _ in range(args.repeat):
+            with profiling.stage('send_keys'):
+                latencies = await client.send_keys(keys, pipeline=not args.sequential)
+            all_latencies.extend(latencies)
+            for key, latency in zip(keys, latencies):
+                print(f"   🔘 {key:<6} {1000 * latency:8.1f} ms")
+        connects = client.connection.connects
+
+    total = sum(all_latencies)
+    print(f"\n⏱️  {len(all_latencies)} touches, {connects} connexion(s), "
+          f"moyenne {1000 * total / len(all_latencies):.1f} ms, max {1000 * max(all_latencies):.1f} ms"
+          f" ({'séquentiel' if args.sequential else 'pipeline'})")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Télécommande UPnP (VinputControlServer) du récepteur")
+    parser.add_argument('keys', nargs='*', help="Touches à envoyer (KeyValue), ex: 1 2 3 OK")
+    parser.add_argument('--zap', help="Numéro de chaîne, envoyé chiffre par chiffre")
+    parser.add_argument('--ok', action='store_true', help="Terminer par OK")
+    parser.add_argument('--url', help="URL de contrôle (sans découverte SSDP)")
+    parser.add_argument('--discover', action='store_true', help="Ignorer le cache et relancer la découverte")
+    parser.add_argument('--ssdp', type=ssdp_target, default=SSDP_ADDR, metavar='HOTE:PORT',
+                        help="Destination des M-SEARCH (défaut: multicast; receiver_emulator: 127.0.0.1:1900)")
+    parser.add_argument('--cache', default=DEVICE_CACHE, help="Fichier cache de la découverte")
+    parser.add_argument('--ttl', type=int, default=DEFAULT_TTL, help="Validité du cache (secondes)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--sequential', action='store_true', help="Attendre chaque réponse (pas de pipeline)")
+    parser.add_argument('--repeat', type=int, default=1, help="Répéter la séquence (mesures)")
+    args = parser.parse_args(argv)
+
+    try:
+        return asyncio.run(run(args))
+    except (RemoteError, OSError, asyncio.TimeoutError) as e:
+        print(f"❌ {e or type(e).__name__}")
+        return 1
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
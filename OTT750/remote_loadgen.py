@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Générateur de charge pour le chemin de contrôle (remote_client -> VinputControlServer).
+
+N clients concurrents (une connexion keep-alive chacun) envoient chacun M
+séquences de touches ; le rapport donne le débit (touches/s) et les
+percentiles de latence par touche (p50, p90, p99, max).
+
+--local démarre l'émulateur (receiver_emulator) dans le même processus sur
+un port libre: la mesure se fait sans récepteur, avec --delay / --jitter
+pour simuler le temps de traitement du récepteur.
+
+Usage:
+    python3 remote_loadgen.py --local --clients 20 --sequences 50
+    python3 remote_loadgen.py --local --delay 15 --mode both
+    python3 remote_loadgen.py --url http://192.168.1.12:49152/VinputControlServer/control --clients 2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import profiling
+from receiver_emulator import Emulator
+from remote_client import DEFAULT_TIMEOUT, RemoteClient, RemoteError
+
+DEFAULT_KEYS = '1 2 3 OK'
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values, p):
+    """Percentile (rang le plus proche) d'une liste triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+async def client_worker(control_url, keys, sequences, pipeline, timeout, latencies, errors):
+    """Une connexion, M séquences de touches; renvoie le nombre de connexions ouvertes"""
+    client = RemoteClient(control_url, timeout)
+    try:
+        for _ in range(sequences):
+            try:
+                latencies.extend(await client.send_keys(keys, pipeline))
+            except (RemoteError, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                errors.append(str(e) or type(e).__name__)
+                await client.connection.close()
+    finally:
+        await client.connection.close()
+    return client.connection.connects
+
+
+async def run_load(control_url, keys, clients, sequences, pipeline, timeout=DEFAULT_TIMEOUT):
+    """Résultats d'une passe: {'latencies' (triées), 'elapsed', 'connects', 'errors'}"""
+    latencies, errors = [], []
+    start = time.perf_counter()
+    connects = await asyncio.gather(*(
+        client_worker(control_url, keys, sequences, pipeline, timeout, latencies, errors)
+        for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {'latencies': latencies, 'elapsed': elapsed, 'connects': sum(connects), 'errors': errors}
+
+
+def print_result(label, result, sequences_total):
+    latencies, elapsed = result['latencies'], result['elapsed']
+    print(f"\n🚀 {label}: {len(latencies)} touches en {elapsed:.2f} s, "
+          f"{len(latencies) / elapsed if elapsed else 0:.0f} touches/s, "
+          f"{sequences_total / elapsed if elapsed else 0:.1f} séquences/s, {result['connects']} connexions")
+    if latencies:
+        cells = ', '.join(f"p{p} {1000 * percentile(latencies, p):.1f}" for p in PERCENTILES)
+        print(f"   Latence par touche (ms): {cells}, max {1000 * latencies[-1]:.1f}")
+    if result['errors']:
+        print(f"   ⚠️  {len(result['errors'])} erreurs (ex: {result['errors'][0]})")
+
+
+async def run(args):
+    emulator = None
+    control_url = args.url
+    if args.local or not control_url:
+        emulator = await Emulator(port=0, delay=args.delay / 1000, jitter=args.jitter / 1000,
+                                  close_every=args.close_every).start(ssdp_port=None)
+        control_url = emulator.control_url
+    keys = args.keys.split()
+    modes = {'pipeline': [True], 'sequential': [False], 'both': [False, True]}[args.mode]
+
+    print(f"📡 {control_url}{' (émulateur local)' if emulator else ''}")
+    print(f"   {args.clients} clients × {args.sequences} séquences de {len(keys)} touches ({' '.join(keys)})")
+    try:
+        for pipeline in modes:
+            label = 'pipeline' if pipeline else 'séquentiel'
+            with profiling.stage(label):
+                result = await run_load(control_url, keys, args.clients, args.sequences, pipeline, args.timeout)
+            print_result(label, result, args.clients * args.sequences)
+    finally:
+        if emulator:
+            await emulator.stop()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charge concurrente sur VinputControlServer (débit, percentiles)")
+    parser.add_argument('--url', help="URL de contrôle du récepteur (défaut: émulateur local)")
+    parser.add_argument('--local', action='store_true', help="Démarrer l'émulateur local")
+    parser.add_argument('--clients', type=int, default=10, help="Clients concurrents")
+    parser.add_argument('--sequences', type=int, default=20, help="Séquences par client")
+    parser.add_argument('--keys', default=DEFAULT_KEYS, help="Séquence de touches (séparées par des espaces)")
+    parser.add_argument('--mode', choices=('pipeline', 'sequential', 'both'), default='pipeline')
+    parser.add_argument('--delay', type=float, default=0.0, help="Délai de l'émulateur (ms)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Variation du délai de l'émulateur (± ms)")
+    parser.add_argument('--close-every', type=int, default=0, help="L'émulateur ferme toutes les N requêtes")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    try:
+        return asyncio.run(run(args))
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Ordre de scan des transpondeurs optimisé pour le tuner.
+
+Dans l'ordre du catalogue, le récepteur bascule sans cesse la bande de
+l'LNB (22 kHz) et la tension de polarisation (13V = V/R, 18V = H/L).
+Ici les transpondeurs de chaque satellite sont regroupés par (bande,
+polarisation), fréquences croissantes dans chaque groupe, et les groupes
+s'enchaînent en ne changeant qu'un seul réglage à la fois ; le satellite
+suivant reprend dans l'état où le précédent s'est terminé.
+
+Source: satellites_select.xml (LNB universel 9750/10600 supposé) ou la base
+(--db: satellite_transponder_table + low_lnb_freq / high_lnb_freq).
+Export au format satellites.xml et estimation du nombre de bascules évitées.
+
+Usage:
+    python3 scan_order.py
+    python3 scan_order.py --db database.db -o satellites_scan.xml
+"""
+
+import argparse
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+
+import profiling
+
+SATELLITES_XML = '/home/kamel/OTT750/satellites_select.xml'
+OUTPUT_XML = '/home/kamel/OTT750/satellites_scan.xml'
+
+# LNB universel: bande haute (22 kHz) à partir de 11700 MHz
+SWITCH_FREQ = 11700
+UNIVERSAL_LNB = (9750, 10600)
+C_BAND_MAX = 5000
+
+# Polarisation (0=H, 1=V, 2=L, 3=R) -> tension: 0 = 13V (V/R), 1 = 18V (H/L)
+VOLTAGE = {0: 1, 1: 0, 2: 1, 3: 0}
+POL_LABELS = {0: 'H', 1: 'V', 2: 'L', 3: 'R'}
+
+# Enchaînement des groupes (bande, tension): un seul réglage change à chaque étape
+GROUP_CYCLE = [(0, 0), (0, 1), (1, 1), (1, 0)]
+
+
+def band(freq, low_lnb, high_lnb):
+    """0 = bande basse / LNB mono-bande, 1 = bande haute (22 kHz actif)"""
+    if freq < C_BAND_MAX or not high_lnb or high_lnb == low_lnb:
+        return 0
+    return 1 if freq >= SWITCH_FREQ else 0
+
+
+def tuner_state(tp, lnb):
+    return band(tp['freq'], *lnb), VOLTAGE.get(tp['pol'], 0)
+
+
+def load_from_xml(xml_path):
+    """[(attributs sat, LNB, [transpondeurs])] dans l'ordre du catalogue"""
+    satellites = []
+    for sat in ET.parse(xml_path).getroot().findall('sat'):
+        transponders = [{'freq': int(tp.get('frequency', 0)) // 1000,
+                         'pol': int(tp.get('polarization', 0)),
+                         'attrib': dict(tp.attrib)} for tp in sat.findall('transponder')]
+        satellites.append((dict(sat.attrib), UNIVERSAL_LNB, transponders))
+    return satellites
+
+
+def load_from_db(db_path):
+    """Satellites de la base avec leurs fréquences LNB, transpondeurs dans l'ordre de la table"""
+    conn = sqlite3.connect(db_path)
+    satellites = {}
+    for sat_id, name, angle, sat_dir, low, high in conn.execute(
+            "SELECT id, name, angle, sat_dir, low_lnb_freq, high_lnb_freq FROM satellite_table ORDER BY id"):
+        position = -int(angle) if int(sat_dir) == 1 else int(angle)
+        satellites[sat_id] = ({'name': name.strip(), 'flags': '1', 'position': str(position)},
+                              (int(low), int(high)), [])
+    for sat_id, freq, sym_rate, pol in conn.execute(
+            "SELECT sat_id, freq, sym_rate, pol FROM satellite_transponder_table ORDER BY sat_id, disp_order, id"):
+        if sat_id in satellites:
+            pol = int(pol)
+            satellites[sat_id][2].append({
+                'freq': int(freq), 'pol': pol,
+                'attrib': {'frequency': str(int(freq) * 1000), 'symbol_rate': str(int(sym_rate) * 1000),
+                           'polarization': str(pol)},
+            })
+    conn.close()
+    return [sat for sat in satellites.values() if sat[2]]
+
+
+def optimize(satellites):
+    """Réordonne les transpondeurs: [(attributs sat, LNB, transpondeurs ordonnés)]"""
+    ordered = []
+    start = 0  # index dans GROUP_CYCLE de l'état de départ du satellite
+    for sat_attrib, lnb, transponders in satellites:
+        groups = {}
+        for tp in transponders:
+            groups.setdefault(tuner_state(tp, lnb), []).append(tp)
+
+        result = []
+        last = start
+        for step in range(len(GROUP_CYCLE)):
+            index = (start + step) % len(GROUP_CYCLE)
+            group = groups.get(GROUP_CYCLE[index])
+            if group:
+                result.extend(sorted(group, key=lambda tp: tp['freq']))
+                last = index
+        ordered.append((sat_attrib, lnb, result))
+        start = last  # Le satellite suivant commence dans l'état courant du tuner
+    return ordered
+
+
+def count_switches(satellites):
+    """Bascules de bande (22 kHz) et de tension sur tout le parcours"""
+    band_switches = voltage_switches = 0
+    state = None
+    for _, lnb, transponders in satellites:
+        for tp in transponders:
+            current = tuner_state(tp, lnb)
+            if state is not None:
+                band_switches += current[0] != state[0]
+                voltage_switches += current[1] != state[1]
+            state = current
+    return band_switches, voltage_switches
+
+
+def write_xml(satellites, path):
+    root = ET.Element('satellites')
+    root.text = '\n  '
+    for sat_attrib, _, transponders in satellites:
+        sat = ET.SubElement(root, 'sat', sat_attrib)
+        sat.text = '\n    '
+        for i, tp in enumerate(transponders):
+            elem = ET.SubElement(sat, 'transponder', tp['attrib'])
+            elem.tail = '\n    ' if i < len(transponders) - 1 else '\n  '
+        sat.tail = '\n  '
+    if len(root):
+        root[-1].tail = '\n'
+    with open(path, 'wb') as f:
+        f.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write(b'<!--Scan order: grouped by LNB band (22 kHz) and polarization, ascending frequency-->\n')
+        ET.ElementTree(root).write(f, encoding='utf-8', xml_declaration=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ordre de scan optimisé (bande / polarisation)")
+    parser.add_argument('--xml', default=SATELLITES_XML, help="Catalogue source (défaut)")
+    parser.add_argument('--db', help="Utiliser les transpondeurs de la base à la place du XML")
+    parser.add_argument('-o', '--output', default=OUTPUT_XML, help="Fichier satellites.xml ordonné")
+    args = parser.parse_args(argv)
+
+    with profiling.stage('load'):
+        satellites = load_from_db(args.db) if args.db else load_from_xml(args.xml)
+    with profiling.stage('optimize'):
+        ordered = optimize(satellites)
+
+    print(f"📡 Ordre de scan ({args.db or args.xml})")
+    for sat_attrib, lnb, transponders in ordered:
+        groups = []
+        for tp in transponders:
+            b, v = tuner_state(tp, lnb)
+            label = f"{'haute' if b else 'basse'}/{'18V' if v else '13V'}"
+            if not groups or groups[-1][0] != label:
+                groups.append([label, 0])
+            groups[-1][1] += 1
+        print(f"   {sat_attrib.get('name', '')[:40]:<40} " +
+              ' → '.join(f"{label} ({count})" for label, count in groups))
+
+    before = count_switches(satellites)
+    after = count_switches(ordered)
+    total_before, total_after = sum(before), sum(after)
+    print(f"\n🔀 Bascules 22 kHz: {before[0]} → {after[0]}, tension: {before[1]} → {after[1]}")
+    if total_before:
+        print(f"   Total: {total_before} → {total_after} "
+              f"(-{100 * (total_before - total_after) / total_before:.0f}%)")
+
+    write_xml(ordered, args.output)
+    print(f"💾 Sauvegardé: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Snapshot de session des éditeurs (editor_favoris.py, app.py).
+
+Au lancement, si la base n'a pas changé (même hash SHA-1), les chaînes et
+favoris chargés lors de la session précédente sont restaurés depuis
+<db>.<nom>.session sans aucune requête SQL.
+
+Chaque modification de favori est ajoutée immédiatement à un petit journal
+(<db>.<nom>.journal, une ligne JSON par édition) : en cas de crash, les
+éditions sont rejouées au lancement suivant. Le journal est vidé à chaque
+sauvegarde du snapshot (fermeture de la fenêtre), sauf les éditions des
+satellites non rouverts depuis, qui y restent jusqu'à leur prochain chargement.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+SNAPSHOT_VERSION = 1
+HASH_CHUNK = 1 << 20
+
+
+def file_hash(path):
+    """SHA-1 du fichier de base"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EditorSession:
+    """Snapshot + journal des éditions, liés au hash de la base"""
+
+    def __init__(self, db_path, name, lists_key='cache', favs_key='favs'):
+        """lists_key: clé des listes de chaînes par satellite dans les données du
+        snapshot; favs_key: champ (set) des favoris de chaque chaîne"""
+        self.db_path = db_path
+        self.lists_key = lists_key
+        self.favs_key = favs_key
+        self.snapshot_path = f"{db_path}.{name}.session"
+        self.journal_path = f"{db_path}.{name}.journal"
+        self.pending = {}  # sat_id -> [(prog_id, fav_id, ajouté)] pour les satellites pas encore chargés
+        self._journal = None
+        self._signature = None
+
+    def _current_signature(self, previous=None):
+        # Taille et date identiques: inutile de recalculer le hash
+        stat = os.stat(self.db_path)
+        if previous and previous.get('size') == stat.st_size and previous.get('mtime') == stat.st_mtime_ns:
+            return previous
+        return {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': file_hash(self.db_path)}
+
+    def restore(self):
+        """Retourne les données du snapshot (ou None) et rejoue le journal"""
+        data = None
+        snapshot = None
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            # Snapshot tronqué ou étranger (pickle peut lever presque n'importe quoi): ignoré
+            snapshot = None
+
+        try:
+            valid = isinstance(snapshot, dict) and snapshot.get('version') == SNAPSHOT_VERSION \
+                and isinstance(snapshot.get('signature'), dict) and 'data' in snapshot
+            previous = snapshot['signature'] if valid else None
+            self._signature = self._current_signature(previous)
+        except OSError:
+            return None
+        if previous and previous.get('hash') == self._signature['hash']:
+            data = snapshot['data']
+
+        self._replay_journal(data)
+        return data
+
+    def _replay_journal(self, data):
+        """Rejoue les éditions non sauvegardées (journal de la même base uniquement)"""
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        if not lines:
+            return
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return
+        if header.get('hash') != self._signature['hash']:
+            # Journal d'une autre version de la base: on l'ignore
+            os.remove(self.journal_path)
+            return
+
+        for line in lines[1:]:
+            try:
+                sat_id, prog_id, fav_id, added = json.loads(line)
+            except ValueError:
+                break  # Dernière ligne tronquée par un crash
+            self.pending.setdefault(sat_id, []).append((prog_id, fav_id, added))
+
+        if data is not None:
+            for sat_id, channel_list in data.get(self.lists_key, {}).items():
+                self.apply_pending(sat_id, channel_list)
+
+    def apply_pending(self, sat_id, channel_list):
+        """Applique les éditions journalisées d'un satellite à sa liste de chaînes"""
+        edits = self.pending.pop(sat_id, None)
+        if not edits:
+            return
+        by_id = {ch['id']: ch for ch in channel_list}
+        for prog_id, fav_id, added in edits:
+            ch = by_id.get(prog_id)
+            if ch is None:
+                continue
+            if added:
+                ch[self.favs_key].add(fav_id)
+            else:
+                ch[self.favs_key].discard(fav_id)
+
+    def record(self, sat_id, prog_id, fav_id, added):
+        """Ajoute une édition au journal (écrite immédiatement sur disque)"""
+        if self._journal is None:
+            if self._signature is None:
+                self._signature = self._current_signature()
+            exists = os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > 0
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            if not exists:
+                self._journal.write(json.dumps({'hash': self._signature['hash']}) + '\n')
+        self._journal.write(json.dumps([sat_id, prog_id, fav_id, added]) + '\n')
+        self._journal.flush()
+
+    def save(self, data):
+        """Écrit le snapshot (écriture atomique) puis vide le journal
+
+        Les éditions de satellites pas encore rouverts (self.pending) ne sont pas
+        dans data: elles sont réécrites dans le nouveau journal.
+        """
+        if self._signature is None:
+            self._signature = self._current_signature()
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': SNAPSHOT_VERSION, 'signature': self._signature, 'data': data},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.pending:
+            tmp_path = self.journal_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'hash': self._signature['hash']}) + '\n')
+                for sat_id, edits in self.pending.items():
+                    for prog_id, fav_id, added in edits:
+                        f.write(json.dumps([sat_id, prog_id, fav_id, added]) + '\n')
+            os.replace(tmp_path, self.journal_path)
+        elif os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Vérification de session_cache.py sur une copie temporaire de la base (sans interface).
+
+Scénario de crash: édition journalisée pour un satellite jamais rouvert,
+processus tué, relance qui ne charge qu'un autre satellite puis sauvegarde,
+nouvelle relance: l'édition doit toujours être rejouable.
+
+Usage:
+    python3 session_cache_check.py
+    python3 session_cache_check.py --db database.db
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import profiling
+from session_cache import EditorSession
+
+DB_PATH = 'database.db'
+LOADED_SAT, OTHER_SAT = 1, 4
+FAV_ID = 2
+
+
+def channels(sat_id):
+    """Liste de chaînes minimale d'un satellite (format du cache d'editor_favoris)"""
+    return [{'id': sat_id * 100 + i, 'name': f"Chaîne {i}", 'favs': set()} for i in range(3)]
+
+
+def run_checks(db_path):
+    results = []
+
+    def check(label, condition, detail=''):
+        results.append(condition)
+        print(f"   {'✓' if condition else '❌'} {label}{f' ({detail})' if detail else ''}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = os.path.join(tmp_dir, 'database.db')
+        shutil.copy2(db_path, db)
+
+        # Session 1: seul LOADED_SAT est chargé, snapshot écrit
+        session = EditorSession(db, 'check')
+        session.restore()
+        session.save({'cache': {LOADED_SAT: channels(LOADED_SAT)}})
+
+        # Session 2: édition de OTHER_SAT (chargé depuis la base), puis crash sans save()
+        session = EditorSession(db, 'check')
+        data = session.restore()
+        other = channels(OTHER_SAT)
+        session.apply_pending(OTHER_SAT, other)
+        other[0]['favs'].add(FAV_ID)
+        session.record(OTHER_SAT, other[0]['id'], FAV_ID, True)
+        session._journal.close()  # crash: ni snapshot ni nettoyage
+
+        # Session 3: OTHER_SAT n'est pas rouvert, sauvegarde à la fermeture
+        session = EditorSession(db, 'check')
+        data = session.restore()
+        check("journal rejoué au lancement", OTHER_SAT in session.pending, f"pending={session.pending}")
+        check("snapshot restauré", data is not None and LOADED_SAT in data['cache'])
+        session.save(data)
+        check("journal conservé pour le satellite non rouvert", os.path.exists(session.journal_path))
+
+        # Session 4: OTHER_SAT enfin rouvert
+        session = EditorSession(db, 'check')
+        data = session.restore()
+        check("édition toujours en attente après sauvegarde", OTHER_SAT in session.pending,
+              f"pending={session.pending}")
+        other = channels(OTHER_SAT)
+        session.apply_pending(OTHER_SAT, other)
+        check("édition appliquée à la réouverture", FAV_ID in other[0]['favs'])
+        data['cache'][OTHER_SAT] = other
+        session.save(data)
+        check("journal vidé une fois tout appliqué", not os.path.exists(session.journal_path))
+
+        session = EditorSession(db, 'check')
+        data = session.restore()
+        check("édition présente dans le snapshot suivant",
+              not session.pending and FAV_ID in data['cache'][OTHER_SAT][0]['favs'])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifier le snapshot et le journal de session_cache.py")
+    parser.add_argument('--db', default=DB_PATH, help="Base copiée pour la vérification")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"❌ Base introuvable: {args.db}")
+        return 1
+
+    print(f"🧪 session_cache.py sur une copie de {args.db}")
+    with profiling.stage('checks'):
+        results = run_checks(args.db)
+    failed = results.count(False)
+    print(f"\n{'✅' if not failed else '❌'} {len(results) - failed}/{len(results)} vérifications réussies")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Zapping avec le moins de touches possible (chaque touche = un aller-retour SOAP).
+
+Trois façons d'atteindre une chaîne depuis la chaîne courante :
+  - chiffres : numéro de la chaîne (lcn_no, ou rang dans la liste avec
+    --numbering position) puis OK
+  - CH+/CH-  : pas dans la liste des chaînes (ordre disp_order, circulaire,
+    chaînes skip/hide sautées), TV et radio séparées
+  - chiffres + CH+/CH- : numéro de la chaîne numérotée la plus proche puis
+    quelques pas (chaînes sans numéro propre)
+  - FAV      : FAV ouvre la liste des favoris sur le premier groupe non vide,
+    RIGHT/LEFT change de groupe, DOWN/UP déplace le curseur (ordre disp_order
+    de fav_prog_table, circulaire), OK valide
+
+Le coût des chiffres, des chiffres + pas et du chemin FAV ne dépend que de
+la cible, celui de CH+/CH- de l'écart de rang: tout est précalculé par
+chaîne au chargement (deux balayages de la liste pour le meilleur numéro
+d'appui), plan() ne fait que comparer quatre coûts (O(1)).
+
+Numérotation: un lcn_no partagé par plusieurs chaînes (3295 = sans LCN sur
+ce récepteur...) ne mène qu'à la première dans l'ordre d'affichage.
+
+Usage:
+    python3 zap_planner.py --from 1 --to 132
+    python3 zap_planner.py --from "TF1" --to "id:1234" --send --url http://127.0.0.1:49152/VinputControlServer/control
+    python3 zap_planner.py --stats --samples 20000
+"""
+
+import argparse
+import asyncio
+import collections
+import random
+import sqlite3
+import sys
+import time
+
+import profiling
+from find_duplicates import normalize_name
+from remote_client import RemoteClient, RemoteError, discover
+
+DB_PATH = '/home/kamel/OTT750/database.db'
+
+RADIO_SERVICE_TYPE = 2
+MAX_DIGITS = 4   # numéros saisissables à la télécommande
+
+Route = collections.namedtuple('Route', 'method keys')
+
+# Par chaîne: liste, rang CH+/CH- (ou None) et touches des routes indépendantes de la chaîne courante
+Entry = collections.namedtuple('Entry', 'list_key position digits jump fav')
+
+
+class ZapError(ValueError):
+    pass
+
+
+def circular_moves(index, size, forward, backward):
+    """Touches pour aller du rang 0 au rang index d'une liste circulaire"""
+    ahead = index % size
+    return [forward] * ahead if ahead <= size - ahead else [backward] * (size - ahead)
+
+
+class ZapPlanner:
+    def __init__(self, channels, favorites, numbering='lcn', confirm=True):
+        """channels: dicts (id, lcn, name, radio, skip, hide) dans l'ordre disp_order;
+        favorites: {groupe: [prog_id dans l'ordre du groupe]}"""
+        self.channels = {ch['id']: ch for ch in channels}
+        self.list_sizes = collections.Counter()
+        self.by_number = {}
+        self.entries = {}
+
+        positions = {}
+        ranks = collections.Counter()
+        for ch in channels:
+            if ch['hide']:
+                continue
+            list_key = 'radio' if ch['radio'] else 'tv'
+            ranks[list_key] += 1
+            if not ch['skip']:
+                positions[ch['id']] = (list_key, self.list_sizes[list_key])
+                self.list_sizes[list_key] += 1
+            number = ch['lcn'] if numbering == 'lcn' else ranks[list_key]
+            if 0 < number < 10 ** MAX_DIGITS:
+                self.by_number.setdefault((list_key, number), ch['id'])
+
+        fav_routes = self.fav_routes(favorites)
+        ok = ['OK'] if confirm else []
+        digits = {pid: list(str(number)) + ok for (_, number), pid in self.by_number.items()}
+        lists = collections.defaultdict(list)
+        for pid, (list_key, _) in positions.items():
+            lists[list_key].append(pid)  # positions croissantes (ordre d'insertion)
+        jumps = {}
+        for members in lists.values():
+            jumps.update(self.jump_routes(members, digits))
+        for ch in channels:
+            if ch['hide']:
+                continue
+            list_key, position = positions.get(ch['id'], ('radio' if ch['radio'] else 'tv', None))
+            self.entries[ch['id']] = Entry(list_key, position, digits.get(ch['id']), jumps.get(ch['id']),
+                                           fav_routes.get(ch['id']))
+
+    @staticmethod
+    def jump_routes(members, digits):
+        """{prog_id: chiffres d'une chaîne voisine + pas} quand c'est plus court que ses propres chiffres.
+
+        Transformée de distance sur la liste circulaire: un balayage avant
+        (appui avant la cible, CH+) et un arrière (CH-), deux tours chacun.
+        """
+        size = len(members)
+        best = {}  # rang -> (coût, appui, pas, touche)
+        for step, key in ((1, 'CH+'), (-1, 'CH-')):
+            carried = None  # (longueur des chiffres, appui, pas)
+            order = range(2 * size) if step == 1 else range(2 * size - 1, -1, -1)
+            for i in order:
+                position = i % size
+                own = digits.get(members[position])
+                if carried:
+                    carried = (carried[0], carried[1], carried[2] + 1)
+                if own and (not carried or len(own) <= carried[0] + carried[2]):
+                    carried = (len(own), members[position], 0)
+                if carried and carried[2]:
+                    cost = carried[0] + carried[2]
+                    if position not in best or cost < best[position][0]:
+                        best[position] = (cost, carried[1], carried[2], key)
+        routes = {}
+        for position, (cost, anchor, steps, key) in best.items():
+            pid = members[position]
+            if pid not in digits or cost < len(digits[pid]):
+                routes[pid] = digits[anchor] + [key] * steps
+        return routes
+
+    def fav_routes(self, favorites):
+        """{prog_id: touches} du chemin FAV le plus court (groupe le plus proche)"""
+        groups = [(gid, members) for gid, members in sorted(favorites.items()) if members]
+        routes = {}
+        for rank, (_, members) in enumerate(groups):
+            switch = circular_moves(rank, len(groups), 'RIGHT', 'LEFT')
+            for index, pid in enumerate(members):
+                if pid not in self.channels or self.channels[pid]['hide']:
+                    continue
+                keys = ['FAV'] + switch + circular_moves(index, len(members), 'DOWN', 'UP') + ['OK']
+                if pid not in routes or len(keys) < len(routes[pid]):
+                    routes[pid] = keys
+        return routes
+
+    @classmethod
+    def load(cls, conn, numbering='lcn', confirm=True):
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, lcn_no, name, service_type, skip, hide FROM program_table ORDER BY disp_order, id
+        """)
+        channels = [{'id': pid, 'lcn': int(lcn), 'name': name.strip(), 'radio': service_type == RADIO_SERVICE_TYPE,
+                     'skip': int(skip), 'hide': int(hide)}
+                    for pid, lcn, name, service_type, skip, hide in cursor.fetchall()]
+        favorites = {}
+        cursor.execute("SELECT fav_group_id, prog_id FROM fav_prog_table ORDER BY fav_group_id, disp_order, id")
+        for gid, pid in cursor.fetchall():
+            favorites.setdefault(gid, []).append(pid)
+        return cls(channels, favorites, numbering, confirm)
+
+    def ch_keys(self, current, target):
+        if current.position is None or target.position is None or current.list_key != target.list_key:
+            return None
+        size = self.list_sizes[target.list_key]
+        return circular_moves(target.position - current.position, size, 'CH+', 'CH-')
+
+    def plan(self, current_id, target_id):
+        """Route la plus courte; à égalité les routes indépendantes de la chaîne courante passent avant CH+/CH-"""
+        target = self.entries.get(target_id)
+        if target is None:
+            raise ZapError(f"chaîne inconnue ou masquée: {target_id}")
+        if current_id == target_id:
+            return Route('none', [])
+        current = self.entries.get(current_id)
+        routes = [Route('digits', target.digits), Route('digits+ch', target.jump), Route('fav', target.fav),
+                  Route('ch', self.ch_keys(current, target) if current else None)]
+        candidates = [route for route in routes if route.keys is not None]
+        if not candidates:
+            raise ZapError(f"chaîne {target_id} inaccessible (ni numéro, ni favori, ni liste)")
+        return min(candidates, key=lambda route: len(route.keys))
+
+    def resolve(self, value):
+        """'132' (numéro), 'id:1234' ou nom -> prog_id"""
+        value = value.strip()
+        if value.lower().startswith('id:'):
+            pid = value[3:].strip()
+            if not pid.isdigit() or int(pid) not in self.channels:
+                raise ZapError(f"id inconnu: {pid!r}")
+            return int(pid)
+        if value.isdigit():
+            for list_key in ('tv', 'radio'):
+                if (list_key, int(value)) in self.by_number:
+                    return self.by_number[(list_key, int(value))]
+            raise ZapError(f"aucune chaîne n°{value}")
+        wanted = normalize_name(value)
+        for pid, ch in self.channels.items():  # ordre disp_order
+            if not ch['hide'] and normalize_name(ch['name']) == wanted:
+                return pid
+        raise ZapError(f"chaîne inconnue: {value!r}")
+
+    def label(self, pid):
+        ch = self.channels[pid]
+        return f"{ch['name']} (LCN {ch['lcn']}, id {pid})"
+
+
+def sample_stats(planner, samples, seed=0):
+    """Touches moyennes: chiffres seuls vs plan, sur des paires (courante, cible) tirées au hasard"""
+    rng = random.Random(seed)
+    ids = list(planner.entries)
+    methods = collections.Counter()
+    digits_total = planned_total = digits_count = 0
+    start = time.perf_counter()
+    for _ in range(samples):
+        current, target = rng.choice(ids), rng.choice(ids)
+        route = planner.plan(current, target)
+        methods[route.method] += 1
+        planned_total += len(route.keys)
+        digits = planner.entries[target].digits
+        if digits is not None and current != target:
+            digits_total += len(digits)
+            digits_count += len(route.keys)
+    elapsed = time.perf_counter() - start
+    return methods, planned_total, digits_total, digits_count, elapsed
+
+
+async def send_route(route, url):
+    if not url:
+        device = await discover()
+        if not device:
+            raise RemoteError("aucun récepteur trouvé (SSDP), utiliser --url")
+        url = device['control_url']
+    async with RemoteClient(url) as client:
+        return await client.send_keys(route.keys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Séquence de touches minimale pour changer de chaîne")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--from', dest='current', help="Chaîne courante (numéro, id:N ou nom)")
+    parser.add_argument('--to', dest='target', help="Chaîne voulue (numéro, id:N ou nom)")
+    parser.add_argument('--numbering', choices=('lcn', 'position'), default='lcn',
+                        help="Numéro saisi: lcn_no ou rang dans la liste")
+    parser.add_argument('--no-ok', action='store_true', help="Le récepteur valide le numéro sans OK")
+    parser.add_argument('--send', action='store_true', help="Envoyer la séquence (remote_client)")
+    parser.add_argument('--url', help="URL de contrôle pour --send (défaut: découverte SSDP)")
+    parser.add_argument('--stats', action='store_true', help="Gain moyen sur des paires aléatoires")
+    parser.add_argument('--samples', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    with profiling.stage('load'):
+        planner = ZapPlanner.load(conn, args.numbering, not args.no_ok)
+    conn.close()
+    print(f"📺 {len(planner.entries)} chaînes, {len(planner.by_number)} numéros saisissables, "
+          f"{sum(1 for e in planner.entries.values() if e.fav)} en favoris")
+
+    if args.stats:
+        with profiling.stage('plan'):
+            methods, planned, digits, digits_planned, elapsed = sample_stats(planner, args.samples)
+        print(f"\n📊 {args.samples} zappings aléatoires ({1e6 * elapsed / args.samples:.2f} µs par plan)")
+        for method, count in methods.most_common():
+            print(f"   {method:<9} {count:>6} ({100 * count / args.samples:.1f}%)")
+        print(f"   Touches: {planned / args.samples:.2f} en moyenne")
+        if digits:
+            print(f"   Cibles numérotées: {digits} touches en chiffres seuls → {digits_planned} "
+                  f"(-{100 * (digits - digits_planned) / digits:.1f}%)")
+
+    if not args.target:
+        return 0
+    try:
+        target = planner.resolve(args.target)
+        current = planner.resolve(args.current) if args.current else None
+        route = planner.plan(current, target)
+    except ZapError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"\n🎯 {planner.label(current) if current else '?'} → {planner.label(target)}")
+    print(f"   {route.method}: {' '.join(route.keys) or '(déjà sur la chaîne)'} ({len(route.keys)} touches)")
+    if args.send and route.keys:
+        try:
+            latencies = asyncio.run(send_route(route, args.url))
+        except (RemoteError, OSError, asyncio.TimeoutError) as e:
+            print(f"❌ {e or type(e).__name__}")
+            return 1
+        print(f"   📡 Envoyé en {1000 * latencies[-1]:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,94 @@
+package com.example.simpleradio.data
+
+import android.content.Context
+import java.nio.ByteBuffer
+import java.nio.ByteOrder
+
+/**
+ * Comptages pays × tag × palier de bitrate précalculés (assets/facets.bin, généré par
+ * facet_cube.py). count("RU", "oldies", 192) est une lecture de table, sans appel réseau.
+ * Pas encore branché sur l'interface; load() renvoie null tant que l'asset n'est pas livré.
+ */
+class FacetCube private constructor(private val buffer: ByteBuffer) {
+
+    private val wideCounts: Boolean
+    private val floors: IntArray
+    private val countries = HashMap<String, Int>()
+    private val tags = HashMap<String, Int>()
+    private val tagCount: Int
+    private val size: Int
+    private val bits: Int
+    private val keysOffset: Int
+    private val countsOffset: Int
+
+    init {
+        buffer.order(ByteOrder.LITTLE_ENDIAN)
+        val magic = ByteArray(4).also { buffer.get(it) }
+        require(String(magic, Charsets.US_ASCII) == MAGIC) { "Fichier de facettes invalide" }
+        wideCounts = buffer.get().toInt() == 4
+        val floorCount = buffer.get().toInt() and 0xFF
+        buffer.getShort()
+        val countryCount = buffer.getInt()
+        tagCount = buffer.getInt()
+        size = buffer.getInt()
+        bits = Integer.numberOfTrailingZeros(size)
+        floors = IntArray(floorCount) { buffer.getShort().toInt() and 0xFFFF }
+        for (i in 0 until countryCount + tagCount) {
+            val name = ByteArray(buffer.get().toInt() and 0xFF).also { buffer.get(it) }
+            val text = String(name, Charsets.UTF_8)
+            if (i < countryCount) countries[text] = i else tags[text] = i - countryCount
+        }
+        keysOffset = buffer.position()
+        countsOffset = keysOffset + 4 * size
+    }
+
+    private fun cell(country: String?, tag: String?): Int {
+        val c = countries[country?.uppercase() ?: ""] ?: return -1
+        val t = tags[tag?.trim()?.lowercase() ?: ""] ?: return -1
+        val key = c * tagCount + t + 1
+        var i = (key * HASH_MULTIPLIER) ushr (32 - bits)
+        while (true) {
+            val stored = buffer.getInt(keysOffset + 4 * i)
+            if (stored == 0) return -1
+            if (stored == key) return i
+            i = (i + 1) and (size - 1)
+        }
+    }
+
+    private fun cumulative(cell: Int, floor: Int): Int {
+        val index = cell * floors.size + floor
+        return if (wideCounts) buffer.getInt(countsOffset + 4 * index)
+        else buffer.getShort(countsOffset + 2 * index).toInt() and 0xFFFF
+    }
+
+    /**
+     * Stations de bitrate ≥ bitrateMin (et < bitrateBelow). country / tag null = tous.
+     * -1 si une borne n'est pas un palier du cube (comptage à faire ailleurs).
+     */
+    fun count(country: String?, tag: String?, bitrateMin: Int? = null, bitrateBelow: Int? = null): Int {
+        val min = floors.indexOf(bitrateMin ?: 0)
+        val below = if (bitrateBelow != null) floors.indexOf(bitrateBelow) else floors.size
+        if (min < 0 || below < 0) return -1
+        val cell = cell(country, tag)
+        if (cell < 0) return 0
+        var total = cumulative(cell, min)
+        if (below < floors.size) total -= cumulative(cell, below)
+        return total
+    }
+
+    companion object {
+        private const val MAGIC = "FCB1"
+        private const val HASH_MULTIPLIER = -0x61c8864f // 0x9E3779B1
+        const val ASSET = "facets.bin"
+
+        /** null si l'asset est absent (cube non généré) */
+        fun load(context: Context): FacetCube? =
+                try {
+                    val bytes = context.assets.open(ASSET).use { it.readBytes() }
+                    FacetCube(ByteBuffer.wrap(bytes))
+                } catch (e: Exception) {
+                    e.printStackTrace()
+                    null
+                }
+    }
+}
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Santé des flux radio et débit réel (le bitrate déclaré par RadioBrowser est souvent faux).
+
+Pour chaque station, en parallèle (connexions de fetch_meta.py) :
+  - temps de connexion, temps jusqu'au premier octet audio (TTFB)
+  - chaîne de redirections et URL finale
+  - débit observé sur une fenêtre d'échantillonnage (--window), octets
+    comptés sans être copiés (audio reçu dans le tampon partagé)
+  - verdict: ok, slow (débit observé < --min-ratio × déclaré), dead, playlist (HLS)
+
+Résultats dans une table SQLite locale (stream_health), une ligne par
+station, mise à jour à chaque passage: l'application peut classer ou masquer
+les flux sans les sonder à l'exécution.
+
+Usage:
+    python3 check_streams.py stations.json
+    python3 check_streams.py stations.csv --window 10 --db stream_health.db
+    python3 check_streams.py --report
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from urllib.parse import urlparse
+
+import profiling
+from fetch_meta import (DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_TIMEOUT, HostLimiter, IcyError,
+                        load_stations, open_stream, percentile)
+
+DB_PATH = 'stream_health.db'
+DEFAULT_WINDOW = 5.0      # secondes d'échantillonnage du débit
+DEFAULT_MIN_RATIO = 0.8   # débit observé / déclaré en dessous duquel le flux est "slow"
+PLAYLIST_TYPES = ('mpegurl', 'x-scpls', 'dash+xml')
+UNLIMITED = 1 << 62
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stream_health (
+    url TEXT PRIMARY KEY,
+    uuid TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL DEFAULT '',
+    checked_at INTEGER NOT NULL,
+    verdict TEXT NOT NULL,
+    error TEXT,
+    status INTEGER,
+    connect_ms REAL,
+    ttfb_ms REAL,
+    observed_kbps REAL,
+    declared_kbps INTEGER,
+    icy_br INTEGER,
+    content_type TEXT,
+    final_url TEXT,
+    redirects TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stream_health_uuid ON stream_health(uuid);
+CREATE INDEX IF NOT EXISTS idx_stream_health_verdict ON stream_health(verdict, observed_kbps);
+"""
+
+COLUMNS = ('url', 'uuid', 'name', 'checked_at', 'verdict', 'error', 'status', 'connect_ms', 'ttfb_ms',
+           'observed_kbps', 'declared_kbps', 'icy_br', 'content_type', 'final_url', 'redirects')
+
+
+def to_int(value):
+    try:
+        return int(str(value).split(',')[0])
+    except (TypeError, ValueError):
+        return None
+
+
+async def check_station(station, window=DEFAULT_WINDOW, timeout=DEFAULT_TIMEOUT, min_ratio=DEFAULT_MIN_RATIO):
+    """Mesures d'une station -> dict aux colonnes de stream_health"""
+    result = {'url': station['url'], 'uuid': station.get('uuid', ''), 'name': station.get('name', ''),
+              'checked_at': int(time.time()), 'declared_kbps': station.get('bitrate') or None,
+              'verdict': 'dead'}
+    protocol = None
+    start = time.perf_counter()
+    try:
+        protocol, status, headers, chain, final_url, connect_time = await asyncio.wait_for(
+            open_stream(station['url'], timeout, icy=False), timeout)
+        result.update(status=status, connect_ms=round(1000 * connect_time, 1), final_url=final_url,
+                      content_type=headers.get('content-type', ''), icy_br=to_int(headers.get('icy-br')),
+                      redirects=json.dumps(chain) if chain else None)
+        if status != 200:
+            raise IcyError('http', f"HTTP {status}")
+        if any(kind in result['content_type'] for kind in PLAYLIST_TYPES):
+            result['verdict'] = 'playlist'
+            raise IcyError('playlist', result['content_type'])
+
+        # Premier octet audio: déjà reçu avec les en-têtes, sinon prochaine réception
+        if not protocol.filled:
+            await asyncio.wait_for(protocol.wait(), timeout)
+        first_byte = time.perf_counter()
+        result['ttfb_ms'] = round(1000 * (first_byte - start), 1)
+
+        # Fenêtre de mesure: tout est sauté, seul le compteur de réception avance.
+        # Horloge et compteur partent du même instant; fin anticipée si le serveur ferme.
+        protocol.consume(protocol.filled)
+        protocol.skip = UNLIMITED
+        counted_from = protocol.received
+        window_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(protocol.wait(), window)  # avec skip, seule la fermeture réveille
+        except (asyncio.TimeoutError, IcyError):
+            pass
+        elapsed = max(time.perf_counter() - window_start, 1e-3)
+        observed = (protocol.received - counted_from) * 8 / 1000 / elapsed
+        result['observed_kbps'] = round(observed, 1)
+
+        declared = result['declared_kbps'] or result['icy_br']
+        if protocol.eof and observed == 0:
+            raise IcyError('stalled', "aucune donnée audio")
+        result['verdict'] = 'slow' if declared and observed < min_ratio * declared else 'ok'
+    except IcyError as e:
+        result['error'] = e.kind
+    except asyncio.TimeoutError:
+        result['error'] = 'timeout'
+    except ValueError:
+        result['error'] = 'protocol'
+    finally:
+        if protocol:
+            protocol.close()
+    return result
+
+
+async def check_all(stations, on_result, window=DEFAULT_WINDOW, concurrency=DEFAULT_CONCURRENCY,
+                    per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT, min_ratio=DEFAULT_MIN_RATIO):
+    limiter = HostLimiter(per_host)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(station):
+        async with limiter(urlparse(station['url']).hostname or ''):
+            async with slots:
+                return await check_station(station, window, timeout, min_ratio)
+
+    for next_done in asyncio.as_completed([asyncio.ensure_future(run(s)) for s in stations]):
+        on_result(await next_done)
+
+
+def open_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def save_result(conn, result):
+    conn.execute(f"INSERT OR REPLACE INTO stream_health ({', '.join(COLUMNS)}) "
+                 f"VALUES ({', '.join('?' * len(COLUMNS))})", [result.get(c) for c in COLUMNS])
+
+
+def print_report(conn):
+    total = conn.execute("SELECT COUNT(*) FROM stream_health").fetchone()[0]
+    print(f"📊 {total} flux vérifiés")
+    for verdict, count in conn.execute(
+            "SELECT verdict, COUNT(*) FROM stream_health GROUP BY verdict ORDER BY COUNT(*) DESC"):
+        print(f"   {verdict:<9} {count:>6} ({100 * count / total:.1f}%)")
+    for error, count in conn.execute("""
+            SELECT error, COUNT(*) FROM stream_health WHERE verdict = 'dead'
+            GROUP BY error ORDER BY COUNT(*) DESC"""):
+        print(f"      ❌ {error}: {count}")
+
+    for column, label in (('connect_ms', 'Connexion'), ('ttfb_ms', 'Premier octet')):
+        values = [v for (v,) in conn.execute(
+            f"SELECT {column} FROM stream_health WHERE verdict IN ('ok', 'slow') ORDER BY {column}")]
+        if values:
+            print(f"   ⏱️  {label} (ms): p50 {percentile(values, 50):.0f}, p90 {percentile(values, 90):.0f}, "
+                  f"max {values[-1]:.0f}")
+
+    # Débit de référence du verdict: déclaré par RadioBrowser, sinon icy-br
+    liars = conn.execute("""
+        SELECT name, COALESCE(declared_kbps, icy_br) AS declared, observed_kbps FROM stream_health
+        WHERE verdict = 'slow' ORDER BY observed_kbps * 1.0 / declared LIMIT 10""").fetchall()
+    if liars:
+        print("\n   📉 Débit très inférieur au débit déclaré:")
+        for name, declared, observed in liars:
+            print(f"      {name[:40]:<40} {declared:>4} kbps déclarés, {observed:.0f} observés")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Santé et débit réel des flux radio")
+    parser.add_argument('input', nargs='?', help="Stations (export RadioBrowser .json ou .csv)")
+    parser.add_argument('--db', default=DB_PATH, help="Base SQLite des résultats")
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW, help="Échantillonnage du débit (s)")
+    parser.add_argument('--min-ratio', type=float, default=DEFAULT_MIN_RATIO,
+                        help="Débit observé / déclaré minimal pour un flux 'ok'")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--report', action='store_true', help="Afficher le résumé de la base")
+    args = parser.parse_args(argv)
+
+    conn = open_db(args.db)
+    if args.input:
+        stations = load_stations(args.input)
+        print(f"📻 {len(stations)} stations, fenêtre {args.window:.0f} s, {args.concurrency} en parallèle")
+        done = [0]
+
+        def on_result(result):
+            save_result(conn, result)
+            done[0] += 1
+            if done[0] % 100 == 0:
+                conn.commit()
+                print(f"   {done[0]}/{len(stations)}")
+
+        with profiling.stage('check'):
+            asyncio.run(check_all(stations, on_result, args.window, args.concurrency, args.per_host,
+                                  args.timeout, args.min_ratio))
+        conn.commit()
+        print(f"💾 {args.db}\n")
+    if args.input or args.report:
+        print_report(conn)
+    conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
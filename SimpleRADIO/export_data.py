@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
-import requests
 import csv
-import json
+import profiling
+from radio_browser import TAGS_PARAMS, shared_client
 
-def fetch_and_export():
-    print("Fetching countries from RadioBrowser API...")
+def fetch_and_export(client=None):
+    client = client or shared_client()
+    print("Fetching countries and genres from RadioBrowser API...")
     
-    # Fetch countries
-    countries_url = "https://de1.api.radio-browser.info/json/countries"
-    response = requests.get(countries_url)
-    countries = response.json()
+    # Fetch countries and tags concurrently (cached, fastest mirror first)
+    with profiling.stage('fetch'):
+        countries, tags = client.get_many([
+            ('/json/countries', None),
+            ('/json/tags', TAGS_PARAMS),
+        ])
     
     # Sort by stationcount descending
     countries_sorted = sorted(countries, key=lambda x: x.get('stationcount', 0), reverse=True)
@@ -27,12 +30,6 @@ def fetch_and_export():
     
     print(f"✓ pays.csv created with {len(countries_sorted)} countries")
     
-    # Fetch tags
-    print("Fetching genres from RadioBrowser API...")
-    tags_url = "https://de1.api.radio-browser.info/json/tags?order=stationcount&reverse=true&hidebroken=true"
-    response = requests.get(tags_url)
-    tags = response.json()
-    
     # Filter tags with more than 10 stations
     tags_filtered = [tag for tag in tags if tag.get('stationcount', 0) > 10]
     
@@ -53,4 +50,5 @@ def fetch_and_export():
     print(f"  - genres.csv ({len(tags_filtered)} entries)")
 
 if __name__ == "__main__":
+    profiling.install()
     fetch_and_export()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Cube de comptages pays × tag × palier de bitrate, précalculé pour l'application.
+
+Les nombres de stations par pays, par genre et par qualité (pays.csv,
+genres.csv, count_radios) sont calculés en une passe sur le dump des stations,
+puis écrits dans un fichier binaire compact (assets/facets.bin) lu par
+data/FacetCube.kt: tout comptage "RU / oldies / ≥192 kbps" est une lecture
+de table de hachage, sans appel réseau.
+
+Les comptes sont cumulés: cellule[palier i] = stations de bitrate ≥ FLOORS[i].
+Une tranche (64-127 kbps du filtre Qualité) est la différence de deux paliers.
+Pays '' et tag '' = tous. Les tags sont ceux de station_mirror (minuscules,
+comparaison exacte); ceux de moins de --min-stations stations ne sont comptés
+que dans "tous".
+
+Format (little-endian):
+    'FCB1', u8 largeur des comptes (2 ou 4), u8 nombre de paliers, u16 0
+    u32 pays, u32 tags, u32 taille de la table (puissance de 2)
+    paliers: u16 × nombre de paliers
+    pays puis tags: u8 longueur + UTF-8 (index 0 = '' = tous)
+    clés: u32 × taille (0 = vide, sinon pays * tags + tag + 1)
+    comptes: (u16|u32) × nombre de paliers × taille, parallèles aux clés
+Emplacement: (clé × 0x9E3779B1 mod 2^32) >> (32 - bits), sondage linéaire.
+
+Usage:
+    python3 facet_cube.py build stations.json -o app/src/main/assets/facets.bin
+    python3 facet_cube.py count --country RU --tag oldies --bitrate-min 192
+"""
+
+import argparse
+import struct
+import sys
+import time
+from collections import defaultdict
+
+import profiling
+from station_mirror import download_dump, load_dump, split_tags, to_int
+
+OUTPUT = 'facets.bin'
+MAGIC = b'FCB1'
+FLOORS = (0, 64, 128, 192, 320)  # boutons Qualité de FilterSidebar.kt
+DEFAULT_MIN_STATIONS = 10        # même seuil que genres.csv
+MAX_LOAD = 0.7
+HASH_MULTIPLIER = 0x9E3779B1
+HEADER = struct.Struct('<4sBBHIII')
+
+
+def bucket(bitrate, floors=FLOORS):
+    """Index du plus haut palier ≤ bitrate"""
+    index = 0
+    for i, floor in enumerate(floors):
+        if bitrate >= floor:
+            index = i
+    return index
+
+
+def slot(key, bits):
+    return ((key * HASH_MULTIPLIER) & 0xFFFFFFFF) >> (32 - bits)
+
+
+def build_cells(records, floors=FLOORS, min_stations=DEFAULT_MIN_STATIONS):
+    """Une passe sur les stations -> {(pays, tag): [comptes cumulés par palier]}"""
+    cells = defaultdict(lambda: [0] * len(floors))
+    seen = set()
+    for record in records:
+        uuid = record.get('stationuuid')
+        if uuid:
+            if uuid in seen:
+                continue
+            seen.add(uuid)
+        k = bucket(to_int(record.get('bitrate')), floors)
+        country = (record.get('countrycode') or '').upper()
+        countries = ('', country) if country else ('',)
+        tags = [''] + split_tags(record.get('tags'))
+        for c in countries:
+            for t in tags:
+                cells[c, t][k] += 1
+
+    # Tags trop rares: retirés (déjà comptés dans '')
+    rare = {t for (c, t), counts in cells.items() if c == '' and t and sum(counts) < min_stations}
+    cube = {}
+    for key, counts in cells.items():
+        if key[1] in rare:
+            continue
+        for i in range(len(counts) - 2, -1, -1):
+            counts[i] += counts[i + 1]
+        cube[key] = counts
+    return cube
+
+
+def serialize(cube, floors=FLOORS):
+    countries = [''] + sorted({c for c, _ in cube if c})
+    tags = [''] + sorted({t for _, t in cube if t}, key=lambda t: (-cube['', t][0], t))
+    country_index = {c: i for i, c in enumerate(countries)}
+    tag_index = {t: i for i, t in enumerate(tags)}
+
+    bits = 4
+    while len(cube) > MAX_LOAD * (1 << bits):
+        bits += 1
+    size = 1 << bits
+    keys = [0] * size
+    slots = {}
+    for (c, t) in cube:
+        key = country_index[c] * len(tags) + tag_index[t] + 1
+        i = slot(key, bits)
+        while keys[i]:
+            i = (i + 1) & (size - 1)
+        keys[i] = key
+        slots[i] = (c, t)
+
+    width = 2 if max((counts[0] for counts in cube.values()), default=0) <= 0xFFFF else 4
+    empty = [0] * len(floors)
+    values = []
+    for i in range(size):
+        values.extend(cube[slots[i]] if i in slots else empty)
+
+    names = bytearray()
+    for name in countries + tags:
+        encoded = name.encode('utf-8')[:255]
+        names += bytes([len(encoded)]) + encoded
+    return b''.join((
+        HEADER.pack(MAGIC, width, len(floors), 0, len(countries), len(tags), size),
+        struct.pack(f'<{len(floors)}H', *floors),
+        bytes(names),
+        struct.pack(f'<{size}I', *keys),
+        struct.pack(f"<{len(values)}{'H' if width == 2 else 'I'}", *values),
+    ))
+
+
+class FacetCube:
+    """Lecture du fichier binaire (même algorithme que data/FacetCube.kt)"""
+
+    def __init__(self, data):
+        magic, self.width, n_floors, _, n_countries, n_tags, self.size = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Fichier de facettes invalide")
+        offset = HEADER.size
+        self.floors = struct.unpack_from(f'<{n_floors}H', data, offset)
+        offset += 2 * n_floors
+        names = []
+        for _ in range(n_countries + n_tags):
+            length = data[offset]
+            names.append(bytes(data[offset + 1:offset + 1 + length]).decode('utf-8'))
+            offset += 1 + length
+        self.countries = {c: i for i, c in enumerate(names[:n_countries])}
+        self.tags = {t: i for i, t in enumerate(names[n_countries:])}
+        self.bits = self.size.bit_length() - 1
+        self.keys = memoryview(data)[offset:offset + 4 * self.size].cast('I')
+        offset += 4 * self.size
+        self.counts = memoryview(data)[offset:offset + self.width * n_floors * self.size].cast(
+            'H' if self.width == 2 else 'I')
+
+    @classmethod
+    def load(cls, path=OUTPUT):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def cell(self, country='', tag=''):
+        """Index de la cellule, None si la combinaison n'a aucune station"""
+        c = self.countries.get((country or '').upper())
+        t = self.tags.get((tag or '').strip().lower())
+        if c is None or t is None:
+            return None
+        key = c * len(self.tags) + t + 1
+        i = slot(key, self.bits)
+        while self.keys[i]:
+            if self.keys[i] == key:
+                return i
+            i = (i + 1) & (self.size - 1)
+        return None
+
+    def count(self, country='', tag='', bitrate_min=0, bitrate_below=None):
+        """Stations de bitrate ≥ bitrate_min (et < bitrate_below); les bornes doivent être des paliers"""
+        for bound in (bitrate_min or 0, bitrate_below):
+            if bound is not None and bound not in self.floors:
+                raise ValueError(f"{bound} kbps n'est pas un palier du cube "
+                                 f"({'/'.join(map(str, self.floors))})")
+        i = self.cell(country, tag)
+        if i is None:
+            return 0
+        base = i * len(self.floors)
+        total = self.counts[base + self.floors.index(bitrate_min or 0)]
+        if bitrate_below is not None:
+            total -= self.counts[base + self.floors.index(bitrate_below)]
+        return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cube pays × tag × bitrate pour l'application")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Construire le cube depuis un dump (/json/stations)")
+    build.add_argument('dump', nargs='?', help="Fichier JSON (défaut: téléchargé via radio_browser)")
+    build.add_argument('-o', '--output', default=OUTPUT)
+    build.add_argument('--min-stations', type=int, default=DEFAULT_MIN_STATIONS,
+                       help="Stations minimum pour garder un tag")
+
+    count = commands.add_parser('count', help="Lire un comptage dans le cube")
+    count.add_argument('--cube', default=OUTPUT)
+    count.add_argument('--country', default='')
+    count.add_argument('--tag', default='')
+    count.add_argument('--bitrate-min', type=int, default=0)
+    count.add_argument('--bitrate-below', type=int, help="Borne haute exclue (palier)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        with profiling.stage('load'):
+            records = load_dump(args.dump) if args.dump else download_dump()
+        start = time.perf_counter()
+        with profiling.stage('build'):
+            cube = build_cells(records, FLOORS, args.min_stations)
+        with profiling.stage('serialize'):
+            data = serialize(cube)
+        with open(args.output, 'wb') as f:
+            f.write(data)
+        reader = FacetCube(data)
+        print(f"✅ {len(records)} stations -> {len(cube)} cellules, {len(reader.countries) - 1} pays, "
+              f"{len(reader.tags) - 1} tags, paliers {'/'.join(map(str, FLOORS))} kbps")
+        print(f"💾 {args.output}: {len(data) / 1024:.0f} Ko en {time.perf_counter() - start:.1f} s")
+        return 0
+
+    cube = FacetCube.load(args.cube)
+    start = time.perf_counter()
+    try:
+        total = cube.count(args.country, args.tag, args.bitrate_min, args.bitrate_below)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = 1e6 * (time.perf_counter() - start)
+    below = f" et <{args.bitrate_below}" if args.bitrate_below else ''
+    print(f"📻 {args.country.upper() or 'Tous pays'} / {args.tag or 'Tous tags'} / "
+          f"≥{args.bitrate_min}{below} kbps: {total} stations ({elapsed:.0f} µs)")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -1,7 +1,14 @@
+import argparse
+import asyncio
+import csv
+import json
 import socket
+import ssl
 import sys
 import re
-from urllib.parse import urlparse
+import time
+from urllib.parse import urljoin, urlparse
+import profiling
 
 def get_metadata(url):
     try:
@@ -75,6 +82,474 @@ urls = [
     "http://direct.franceinter.fr/live/franceinter-midfi.mp3"
 ]
 
-print("--- EXEMPLES BRUTS DE METADONNEES ---")
-for u in urls:
-    get_metadata(u)
+# --- Sondage concurrent (asyncio) ------------------------------------------
+#
+# Même requête que get_metadata, mais des milliers de stations en parallèle:
+# concurrence globale bornée, limite par hôte, redirections suivies, lecture
+# dans un tampon préalloué (asyncio.BufferedProtocol: le noyau écrit
+# directement dedans) et audio avant le bloc metaint sauté sans être copié.
+# Résultats écrits en JSON lines au fil de l'eau.
+
+BUFFER_SIZE = 16 * 1024       # en-têtes + bloc de métadonnées (255 * 16 max)
+SKIP_BUFFER = bytearray(64 * 1024)   # audio ignoré, partagé par toutes les connexions
+MAX_HEADER = 8 * 1024
+MAX_REDIRECTS = 5
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_CONCURRENCY = 200
+DEFAULT_PER_HOST = 4
+USER_AGENT = "Winamp/2.8"
+
+_TITLE_RE = re.compile(r"StreamTitle='(.*?)';(?=\w+=|\s*$)", re.S)
+
+
+class IcyError(Exception):
+    def __init__(self, kind, message=''):
+        super().__init__(message or kind)
+        self.kind = kind
+
+
+class IcyProtocol(asyncio.BufferedProtocol):
+    """Lecture dans un tampon préalloué; self.skip octets jetés dans SKIP_BUFFER"""
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+        self.skip = 0
+        self.received = 0
+        self.eof = False
+        self.error = None
+        self.transport = None
+        self._waiter = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        if self.skip:
+            return memoryview(SKIP_BUFFER)[:min(self.skip, len(SKIP_BUFFER))]
+        return self.view[self.filled:]
+
+    def buffer_updated(self, nbytes):
+        self.received += nbytes
+        if self.skip:
+            self.skip -= nbytes
+            if self.skip:
+                return  # audio en cours de saut: pas de réveil avant la frontière metaint
+        else:
+            self.filled += nbytes
+            if self.filled == len(self.buffer):
+                self.transport.pause_reading()
+        self._wake()
+
+    def eof_received(self):
+        self.eof = True
+        self._wake()
+
+    def connection_lost(self, exc):
+        self.eof = True
+        self.error = exc
+        self._wake()
+
+    def _wake(self):
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def wait(self):
+        """Attendre la prochaine réception (données ou fin de connexion)"""
+        if self.eof:
+            raise IcyError('closed', str(self.error or 'connexion fermée'))
+        self._waiter = asyncio.get_running_loop().create_future()
+        await self._waiter
+
+    async def fill(self, size):
+        """Au moins size octets dans le tampon"""
+        while self.filled < size:
+            await self.wait()
+
+    async def discard(self, count):
+        """Sauter count octets de flux (ceux déjà en tampon, puis le reste sans copie)"""
+        kept = min(count, self.filled)
+        self.consume(kept)
+        self.skip = count - kept
+        while self.skip > 0:
+            await self.wait()
+
+    def consume(self, count):
+        """Retirer count octets en tête du tampon"""
+        remaining = self.filled - count
+        if remaining:
+            self.buffer[:remaining] = self.view[count:self.filled]
+        self.filled = remaining
+        if self.transport and not self.transport.is_closing():
+            self.transport.resume_reading()
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+
+def station_request(url, icy=True):
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    host = parsed.hostname or ''
+    if parsed.port:
+        host += f":{parsed.port}"
+    icy_header = "Icy-MetaData: 1\r\n" if icy else ""
+    return (f"GET {path} HTTP/1.0\r\nHost: {host}\r\n{icy_header}"
+            f"User-Agent: {USER_AGENT}\r\nConnection: close\r\n\r\n").encode('utf-8')
+
+
+def parse_status(head):
+    """(statut, en-têtes en minuscules) d'une réponse HTTP/1.x ou ICY"""
+    lines = head.decode('latin-1').split('\r\n')
+    parts = lines[0].split(' ', 2)
+    if len(parts) < 2 or not parts[1].isdigit() or not parts[0].startswith(('HTTP/', 'ICY')):
+        raise IcyError('protocol', f"réponse invalide: {lines[0][:40]!r}")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+
+async def open_stream(url, timeout, icy=True):
+    """Connexion + en-têtes, redirections suivies.
+
+    Retourne (protocol, statut, en-têtes, chaîne de redirections, url finale,
+    temps de connexion en s); les octets après les en-têtes restent dans
+    protocol.buffer. icy=False: sans Icy-MetaData (flux audio seul).
+    """
+    loop = asyncio.get_running_loop()
+    chain = []
+    for _ in range(MAX_REDIRECTS + 1):
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise IcyError('url', f"URL non supportée: {url}")
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        context = ssl.create_default_context() if parsed.scheme == 'https' else None
+        start = time.perf_counter()
+        try:
+            _, protocol = await asyncio.wait_for(loop.create_connection(
+                IcyProtocol, parsed.hostname, port, ssl=context), timeout)
+        except (OSError, ssl.SSLError) as e:
+            raise IcyError('connect', str(e) or type(e).__name__)
+        connect_time = time.perf_counter() - start
+        protocol.transport.write(station_request(url, icy))
+        try:
+            while True:
+                end = protocol.buffer.find(b'\r\n\r\n', 0, protocol.filled)
+                if end >= 0:
+                    break
+                if protocol.filled >= MAX_HEADER:
+                    raise IcyError('protocol', "en-têtes trop longs")
+                await protocol.wait()
+            status, headers = parse_status(bytes(protocol.view[:end]))
+        except BaseException:
+            protocol.close()
+            raise
+        protocol.consume(end + 4)
+
+        if status in (301, 302, 303, 307, 308) and headers.get('location'):
+            protocol.close()
+            chain.append(url)
+            url = urljoin(url, headers['location'])
+            continue
+        return protocol, status, headers, chain, url, connect_time
+    raise IcyError('redirects', f"plus de {MAX_REDIRECTS} redirections")
+
+
+class HostLimiter:
+    """Connexions simultanées par hôte (les serveurs Icecast limitent souvent par IP)"""
+
+    def __init__(self, per_host=DEFAULT_PER_HOST):
+        self.per_host = per_host
+        self.semaphores = {}
+
+    def __call__(self, host):
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self.semaphores[host]
+
+
+async def read_metadata_block(protocol, metaint):
+    """Sauter metaint octets d'audio puis lire un bloc de métadonnées (texte)"""
+    await protocol.discard(metaint)
+    await protocol.fill(1)
+    length = protocol.buffer[0] * 16
+    await protocol.fill(1 + length)
+    raw = bytes(protocol.view[1:1 + length]).rstrip(b'\0')
+    protocol.consume(1 + length)
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def stream_title(metadata):
+    match = _TITLE_RE.search(metadata)
+    return match.group(1).strip() if match else None
+
+
+async def probe_station(station, timeout=DEFAULT_TIMEOUT):
+    """Premier bloc de métadonnées ICY d'une station -> dict résultat (JSON)"""
+    url = station['url']
+    result = {'url': url, 'name': station.get('name', ''), 'uuid': station.get('uuid', ''), 'ok': False}
+    start = time.perf_counter()
+    protocol = None
+    try:
+        protocol, status, headers, chain, final_url, connect_time = await asyncio.wait_for(
+            open_stream(url, timeout), timeout)
+        result.update(status=status, connect_ms=round(1000 * connect_time, 1),
+                      content_type=headers.get('content-type', ''), icy_name=headers.get('icy-name', ''),
+                      icy_br=headers.get('icy-br', ''))
+        if chain:
+            result['redirects'] = chain + [final_url]
+        if status != 200:
+            raise IcyError('http', f"HTTP {status}")
+        metaint = int(headers.get('icy-metaint', 0) or 0)
+        if metaint <= 0:
+            raise IcyError('no_metaint', "pas de icy-metaint (pas d'ICY ou HLS/DASH)")
+        result['metaint'] = metaint
+        metadata = await asyncio.wait_for(read_metadata_block(protocol, metaint), timeout)
+        result.update(ok=True, metadata=metadata, title=stream_title(metadata))
+    except IcyError as e:
+        result.update(error=e.kind, message=str(e))
+    except asyncio.TimeoutError:
+        result.update(error='timeout', message=f"> {timeout} s")
+    except ValueError as e:
+        result.update(error='protocol', message=str(e))
+    finally:
+        if protocol:
+            protocol.close()
+    result['latency_ms'] = round(1000 * (time.perf_counter() - start), 1)
+    return result
+
+
+# --- Surveillance continue ("now playing") ---------------------------------
+#
+# Une connexion gardée par station: l'audio entre deux blocs metaint est
+# reçu dans SKIP_BUFFER (recv_into du noyau, jamais copié ni conservé) et
+# la tâche ne se réveille qu'aux frontières de blocs. Un événement est émis
+# à chaque changement de StreamTitle (les répétitions sont ignorées, y
+# compris après une reconnexion).
+
+STALL_TIMEOUT = 30.0          # secondes sans bloc de métadonnées -> reconnexion
+RECONNECT_DELAY = 2.0
+MAX_RECONNECT_DELAY = 300.0
+PERMANENT_ERRORS = {'url', 'no_metaint', 'redirects'}
+
+
+async def monitor_station(station, emit, timeout=DEFAULT_TIMEOUT, stats=None):
+    """Suit une station indéfiniment; emit(événement dict) à chaque changement de titre"""
+    url = station['url']
+    last_title = None
+    delay = RECONNECT_DELAY
+    stats = stats if stats is not None else {}
+    while True:
+        protocol = None
+        try:
+            protocol, status, headers, _, _, _ = await asyncio.wait_for(open_stream(url, timeout), timeout)
+            if status != 200:
+                raise IcyError('http' if status >= 500 else 'no_metaint', f"HTTP {status}")
+            metaint = int(headers.get('icy-metaint', 0) or 0)
+            if metaint <= 0:
+                raise IcyError('no_metaint', "pas de icy-metaint")
+            delay = RECONNECT_DELAY
+            while True:
+                metadata = await asyncio.wait_for(read_metadata_block(protocol, metaint), STALL_TIMEOUT)
+                title = stream_title(metadata) if metadata else None
+                if title is None or title == last_title:
+                    continue  # bloc vide ou titre répété
+                emit({'ts': round(time.time(), 3), 'event': 'title', 'url': url, 'name': station.get('name', ''),
+                      'title': title, 'previous': last_title})
+                last_title = title
+        except asyncio.CancelledError:
+            raise
+        except (IcyError, asyncio.TimeoutError, ValueError) as e:
+            kind = e.kind if isinstance(e, IcyError) else 'timeout'
+            permanent = kind in PERMANENT_ERRORS
+            emit({'ts': round(time.time(), 3), 'event': 'stopped' if permanent else 'disconnected', 'url': url,
+                  'name': station.get('name', ''), 'error': kind, 'message': str(e)})
+            if permanent:
+                return
+        finally:
+            if protocol:
+                stats['skipped'] = stats.get('skipped', 0) + protocol.received
+                protocol.close()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+async def monitor_all(stations, emit, timeout=DEFAULT_TIMEOUT, duration=None, per_host=DEFAULT_PER_HOST):
+    """Surveille toutes les stations pendant duration secondes; au plus per_host connexions
+    par hôte, les stations en surplus attendent qu'une station du même hôte soit abandonnée"""
+    stats = {'followed': 0}
+    limiter = HostLimiter(per_host)
+
+    async def run(station):
+        async with limiter(urlparse(station['url']).hostname or ''):
+            stats['followed'] += 1
+            await monitor_station(station, emit, timeout, stats)
+
+    tasks = [asyncio.ensure_future(run(station)) for station in stations]
+    try:
+        await asyncio.wait(tasks, timeout=duration)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return stats.pop('followed'), stats
+
+
+def load_stations(path):
+    """Stations d'un export RadioBrowser JSON ou d'un CSV (colonnes url / url_resolved, name)"""
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            records = json.load(f)
+        else:
+            records = list(csv.DictReader(f))
+    stations = []
+    for record in records:
+        url = (record.get('url_resolved') or record.get('url') or '').strip()
+        if url:
+            stations.append({'url': url, 'name': (record.get('name') or '').strip(),
+                             'uuid': record.get('stationuuid') or record.get('uuid') or '',
+                             'bitrate': int(record.get('bitrate') or 0)})
+    return stations
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+async def probe_all(stations, output=None, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                    timeout=DEFAULT_TIMEOUT, on_result=None):
+    """Sonde toutes les stations; résultats écrits en JSONL dès qu'ils arrivent"""
+    limiter = HostLimiter(per_host)
+    slots = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def run(station):
+        # Limite par hôte tenue pendant toute la connexion, avant de prendre une place globale
+        async with limiter(urlparse(station['url']).hostname or ''):
+            async with slots:
+                return await probe_station(station, timeout)
+
+    tasks = [asyncio.ensure_future(run(station)) for station in stations]
+    for next_done in asyncio.as_completed(tasks):
+        result = await next_done
+        results.append(result)
+        if output:
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            output.flush()
+        if on_result:
+            on_result(result)
+    return results
+
+
+def print_stats(results, elapsed):
+    ok = [r for r in results if r['ok']]
+    print(f"\n📊 {len(results)} stations en {elapsed:.1f} s: {len(ok)} OK "
+          f"({100 * len(ok) / len(results) if results else 0:.1f}%)")
+    errors = {}
+    for r in results:
+        if not r['ok']:
+            errors[r['error']] = errors.get(r['error'], 0) + 1
+    for kind, count in sorted(errors.items(), key=lambda item: -item[1]):
+        print(f"   ❌ {kind}: {count}")
+    latencies = sorted(r['latency_ms'] for r in ok)
+    if latencies:
+        print(f"   ⏱️  Latence (ms): p50 {percentile(latencies, 50):.0f}, p90 {percentile(latencies, 90):.0f}, "
+              f"p99 {percentile(latencies, 99):.0f}, max {latencies[-1]:.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Métadonnées ICY (StreamTitle) de listes de stations")
+    parser.add_argument('--input', help="Stations (export RadioBrowser .json ou .csv avec url, name)")
+    parser.add_argument('-o', '--output', help="Résultats JSON lines")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--monitor', action='store_true', help="Rester connecté et suivre les changements de titre")
+    parser.add_argument('--duration', type=float, help="Durée de la surveillance en secondes (défaut: infinie)")
+    args = parser.parse_args(argv)
+
+    if args.monitor:
+        return monitor(args)
+
+    if not args.input:
+        print("--- EXEMPLES BRUTS DE METADONNEES ---")
+        for u in urls:
+            with profiling.stage(urlparse(u).hostname):
+                get_metadata(u)
+        return 0
+
+    stations = load_stations(args.input)
+    print(f"📻 {len(stations)} stations, {args.concurrency} connexions max ({args.per_host} par hôte)")
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+
+    def show(result):
+        if not output:
+            print(f"[{result['url']}] -> {result.get('title') if result['ok'] else result['message']}")
+
+    start = time.perf_counter()
+    try:
+        with profiling.stage('probe'):
+            results = asyncio.run(probe_all(stations, output, args.concurrency, args.per_host,
+                                            args.timeout, show))
+    finally:
+        if output:
+            output.close()
+    print_stats(results, time.perf_counter() - start)
+    if output:
+        print(f"💾 {args.output}")
+    return 0
+
+
+def monitor(args):
+    stations = load_stations(args.input) if args.input else [{'url': u, 'name': urlparse(u).hostname} for u in urls]
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    counts = {'title': 0, 'disconnected': 0, 'stopped': 0}
+
+    def emit(event):
+        counts[event['event']] += 1
+        if output:
+            output.write(json.dumps(event, ensure_ascii=False) + '\n')
+            output.flush()
+        stamp = time.strftime('%H:%M:%S', time.localtime(event['ts']))
+        if event['event'] == 'title':
+            print(f"{stamp} [{event['name'] or event['url']}] ♪ {event['title']}")
+        elif not output:
+            print(f"{stamp} [{event['name'] or event['url']}] ⚠️  {event['event']}: {event['message']}")
+
+    print(f"📻 Surveillance de {len(stations)} stations (Ctrl+C pour arrêter)")
+    start_cpu, start = time.process_time(), time.perf_counter()
+    try:
+        with profiling.stage('monitor'):
+            followed, stats = asyncio.run(monitor_all(stations, emit, args.timeout, args.duration, args.per_host))
+    except KeyboardInterrupt:
+        followed, stats = len(stations), {}
+    finally:
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - start_cpu
+    print(f"\n📊 {followed} stations suivies {elapsed:.0f} s: {counts['title']} changements de titre, "
+          f"{counts['disconnected']} déconnexions, {counts['stopped']} abandonnées")
+    if followed < len(stations):
+        print(f"   ⏳ {len(stations) - followed} stations restées en attente (--per-host {args.per_host})")
+    if stats.get('skipped'):
+        print(f"   {stats['skipped'] / 1e6:.1f} Mo d'audio sautés, CPU {cpu:.1f} s ({100 * cpu / elapsed:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Client RadioBrowser partagé (export_data.py, test_radio_count.py, station_mirror.py).
+
+  - une requests.Session (connexions keep-alive réutilisées, pool par miroir)
+  - cache disque des réponses: frais pendant ttl, puis requête conditionnelle
+    (If-None-Match / If-Modified-Since) -> un 304 ne retransfère rien
+  - miroirs de l'API classés par latence mesurée (GET /json/stats), bascule
+    sur le suivant en cas d'erreur réseau ou 5xx; cache périmé en dernier recours
+  - get_many(): plusieurs requêtes en parallèle (pays + tags d'export_data)
+  - shared_client(): un client par processus, réutilisé d'un appel à l'autre
+
+Usage:
+    python3 radio_browser.py                        # classement des miroirs
+    python3 radio_browser.py /json/countries --ttl 0
+    python3 radio_browser.py /json/stats --mirror http://127.0.0.1:8080
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import profiling
+
+MIRRORS = (
+    'https://de1.api.radio-browser.info',
+    'https://de2.api.radio-browser.info',
+    'https://fi1.api.radio-browser.info',
+)
+CACHE_DIR = 'radiobrowser_cache'
+DEFAULT_TTL = 6 * 3600      # secondes
+DEFAULT_TIMEOUT = 10.0
+PROBE_TIMEOUT = 3.0
+POOL_SIZE = 8               # connexions gardées par miroir
+USER_AGENT = 'SimpleRADIO/1.0'
+TAGS_PARAMS = {'order': 'stationcount', 'reverse': 'true', 'hidebroken': 'true'}
+
+
+class RadioBrowserError(Exception):
+    pass
+
+
+def cache_key(path, params):
+    """Clé indépendante du miroir: même requête -> même entrée de cache"""
+    query = json.dumps(sorted((params or {}).items()), default=str)
+    return hashlib.sha1(f"{path}?{query}".encode()).hexdigest()
+
+
+class RadioBrowser:
+    def __init__(self, mirrors=None, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, timeout=DEFAULT_TIMEOUT,
+                 pool_size=POOL_SIZE):
+        self.mirrors = [m.rstrip('/') for m in (mirrors or MIRRORS)]
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.latencies = {}     # miroir -> secondes (None: injoignable)
+        self._ranked = None
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=len(self.mirrors), pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'failovers': 0}
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Miroirs -------------------------------------------------------------
+
+    def probe(self, mirror):
+        start = time.perf_counter()
+        try:
+            self.session.get(f"{mirror}/json/stats", timeout=PROBE_TIMEOUT).raise_for_status()
+        except requests.RequestException:
+            return None
+        return time.perf_counter() - start
+
+    def rank_mirrors(self):
+        """Miroirs du plus rapide au plus lent (sondés en parallèle), injoignables à la fin"""
+        with ThreadPoolExecutor(len(self.mirrors)) as pool:
+            self.latencies = dict(zip(self.mirrors, pool.map(self.probe, self.mirrors)))
+        self._ranked = sorted(self.mirrors, key=lambda m: (self.latencies[m] is None, self.latencies[m] or 0))
+        return self._ranked
+
+    @property
+    def ranked(self):
+        if self._ranked is None:
+            self.rank_mirrors()
+        return self._ranked
+
+    def demote(self, mirror):
+        """Miroir en échec: dernier choix pour les requêtes suivantes"""
+        with self._lock:
+            if mirror in self._ranked:
+                self._ranked.remove(mirror)
+                self._ranked.append(mirror)
+
+    # --- Cache ---------------------------------------------------------------
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load_cached(self, key):
+        try:
+            with open(self._cache_path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_cached(self, key, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    # --- Requêtes ------------------------------------------------------------
+
+    def get(self, path, params=None, ttl=None):
+        """Réponse JSON de path (ex: '/json/countries'), depuis le cache si possible"""
+        ttl = self.ttl if ttl is None else ttl
+        key = cache_key(path, params)
+        cached = self.load_cached(key)
+        if cached and time.time() - cached['fetched_at'] < ttl:
+            self.stats['cache_hits'] += 1
+            return cached['data']
+
+        headers = {}
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        errors = []
+        for attempt, mirror in enumerate(list(self.ranked)):
+            if attempt:
+                self.stats['failovers'] += 1
+            try:
+                self.stats['requests'] += 1
+                response = self.session.get(f"{mirror}{path}", params=params, headers=headers,
+                                            timeout=self.timeout)
+            except requests.RequestException as e:
+                errors.append(f"{mirror}: {type(e).__name__}")
+                self.demote(mirror)
+                continue
+            if response.status_code >= 500:
+                errors.append(f"{mirror}: HTTP {response.status_code}")
+                self.demote(mirror)
+                continue
+
+            if response.status_code == 304 and cached:
+                self.stats['not_modified'] += 1
+                cached['fetched_at'] = time.time()
+                self.save_cached(key, cached)
+                return cached['data']
+            if response.status_code >= 400:
+                raise RadioBrowserError(f"{path}: HTTP {response.status_code} ({mirror})")
+            data = response.json()
+            self.save_cached(key, {
+                'path': path,
+                'params': params,
+                'fetched_at': time.time(),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'data': data,
+            })
+            return data
+
+        if cached:
+            print(f"⚠️  Miroirs injoignables, cache périmé utilisé pour {path}", file=sys.stderr)
+            return cached['data']
+        raise RadioBrowserError(f"{path}: {'; '.join(errors)}")
+
+    def get_many(self, queries):
+        """[(path, params), ...] -> réponses dans le même ordre, requêtes en parallèle"""
+        if not queries:
+            return []
+        self.ranked  # classement fait une seule fois, avant les threads
+        with ThreadPoolExecutor(len(queries)) as pool:
+            return list(pool.map(lambda query: self.get(*query), queries))
+
+    def countries(self):
+        return self.get('/json/countries')
+
+    def tags(self):
+        return self.get('/json/tags', TAGS_PARAMS)
+
+    def search(self, **params):
+        return self.get('/json/stations/search', params)
+
+    def stations(self):
+        """Dump complet des stations (import de station_mirror.py)"""
+        return self.get('/json/stations')
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_client():
+    """Client commun au processus (créé au premier appel, fermé à la sortie): une seule
+    session keep-alive et un seul classement des miroirs pour tous les appels"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RadioBrowser()
+            atexit.register(_shared.close)
+        return _shared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Client RadioBrowser (cache, miroirs classés par latence)")
+    parser.add_argument('path', nargs='?', help="Chemin de l'API, ex: /json/countries")
+    parser.add_argument('--mirror', action='append', help="Miroir à utiliser (répétable)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="Durée de fraîcheur du cache (s)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    with RadioBrowser(args.mirror, args.cache_dir, args.ttl, args.timeout) as client:
+        with profiling.stage('rank_mirrors'):
+            ranked = client.rank_mirrors()
+        print("📡 Miroirs:")
+        for mirror in ranked:
+            latency = client.latencies[mirror]
+            print(f"   {mirror:<45} {f'{1000 * latency:.0f} ms' if latency is not None else '❌ injoignable'}")
+        if not args.path:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            with profiling.stage('get'):
+                data = client.get(args.path)
+        except RadioBrowserError as e:
+            print(f"❌ {e}")
+            return 1
+        size = len(data) if isinstance(data, list) else len(json.dumps(data))
+        print(f"\n✓ {args.path}: {size} {'éléments' if isinstance(data, list) else 'octets'} "
+              f"en {1000 * (time.perf_counter() - start):.0f} ms")
+        print(f"   {client.stats}")
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Vérification de radio_browser.py contre des miroirs locaux simulés (sans réseau).
+
+Trois miroirs HTTP sur 127.0.0.1 (ports libres):
+  - "lent": répond correctement, avec un délai
+  - "panne": /json/stats rapide (classé premier) mais 503 sur le reste
+  - "arrêté": port fermé (injoignable)
+Le miroir lent coupe ensuite ses connexions sans répondre (panne totale).
+
+Scénarios: classement des miroirs, bascule sur 5xx, cache frais, requête
+conditionnelle (304), erreur 4xx -> RadioBrowserError, get_many() vide et
+ordonné, cache périmé quand tous les miroirs sont injoignables.
+
+Usage:
+    python3 radio_browser_check.py
+    python3 radio_browser_check.py --delay 0.2
+"""
+
+import argparse
+import hashlib
+import json
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import profiling
+from radio_browser import RadioBrowser, RadioBrowserError, TAGS_PARAMS
+
+STATIONS = [{'stationuuid': f'uuid-{i}', 'name': f'Radio {i}', 'url': f'http://127.0.0.1/{i}',
+             'countrycode': ('RU', 'FR', 'DE')[i % 3], 'tags': 'pop,oldies' if i % 2 else 'pop', 'bitrate': 128}
+            for i in range(300)]
+RESPONSES = {
+    '/json/stats': {'stations': len(STATIONS)},
+    '/json/countries': [{'name': 'Russia', 'iso_3166_1': 'RU', 'stationcount': 100},
+                        {'name': 'France', 'iso_3166_1': 'FR', 'stationcount': 100}],
+    '/json/tags': [{'name': 'pop', 'stationcount': 300}, {'name': 'oldies', 'stationcount': 150}],
+    '/json/stations': STATIONS,
+    '/json/stations/search': STATIONS[:50],
+}
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    """Miroir simulé: ETag sur chaque réponse, 304 si If-None-Match correspond"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        mirror = self.server.mirror
+        path = self.path.split('?')[0]
+        mirror['hits'] += 1
+        if mirror['down']:
+            self.close_connection = True  # connexion coupée sans réponse
+            return
+        time.sleep(mirror['delay'])
+        if mirror['fail'] and path != '/json/stats':
+            return self.reply(503)
+        if path not in RESPONSES:
+            return self.reply(404)
+        body = json.dumps(RESPONSES[path]).encode('utf-8')
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.reply(304, headers={'ETag': etag})
+        self.reply(200, body, {'ETag': etag, 'Content-Type': 'application/json'})
+
+
+def start_mirror(delay=0.0, fail=False):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MirrorHandler)
+    server.daemon_threads = True
+    server.mirror = {'delay': delay, 'fail': fail, 'down': False, 'hits': 0}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def run_checks(delay):
+    slow, slow_url = start_mirror(delay=delay)
+    failing, failing_url = start_mirror(fail=True)
+    down_url = closed_port_url()
+    results = []
+
+    def check(label, condition, detail=''):
+        results.append(condition)
+        print(f"   {'✓' if condition else '❌'} {label}{f' ({detail})' if detail else ''}")
+
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            RadioBrowser([down_url, slow_url, failing_url], cache_dir, ttl=3600, timeout=2.0) as client:
+        ranked = client.rank_mirrors()
+        check("classement: panne (rapide) puis lent, arrêté en dernier",
+              ranked == [failing_url, slow_url, down_url], ' > '.join(ranked))
+
+        data = client.countries()
+        check("bascule 503 -> miroir suivant", len(data) == 2 and client.stats['failovers'] == 1,
+              f"failovers={client.stats['failovers']}")
+        check("miroir en panne rétrogradé", client.ranked[0] == slow_url)
+
+        hits = slow.mirror['hits']
+        client.countries()
+        check("cache frais: aucune requête", client.stats['cache_hits'] == 1 and slow.mirror['hits'] == hits)
+
+        client.ttl = 0
+        check("cache expiré: 304 sans retransfert", client.countries() == data
+              and client.stats['not_modified'] == 1, f"not_modified={client.stats['not_modified']}")
+
+        try:
+            client.get('/json/inconnu')
+            check("4xx -> RadioBrowserError", False, "aucune erreur")
+        except RadioBrowserError as e:
+            check("4xx -> RadioBrowserError", True, str(e))
+
+        check("get_many([]) -> []", client.get_many([]) == [])
+        many = client.get_many([('/json/tags', TAGS_PARAMS), ('/json/stations/search', {'countrycode': 'RU'}),
+                                ('/json/stats', None)])
+        check("get_many: réponses dans l'ordre des requêtes",
+              [len(many[0]), len(many[1]), many[2]] == [2, 50, RESPONSES['/json/stats']])
+
+        slow.mirror['down'] = True
+        start = time.perf_counter()
+        check("miroirs injoignables: cache périmé", client.countries() == data,
+              f"{1000 * (time.perf_counter() - start):.0f} ms")
+        try:
+            client.get('/json/stations')
+            check("injoignables sans cache -> RadioBrowserError", False, "aucune erreur")
+        except RadioBrowserError:
+            check("injoignables sans cache -> RadioBrowserError", True)
+        print(f"\n   {client.stats}")
+
+    for server in (slow, failing):
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifier radio_browser.py contre des miroirs simulés")
+    parser.add_argument('--delay', type=float, default=0.05, help="Délai du miroir lent (s)")
+    args = parser.parse_args(argv)
+
+    print("🧪 radio_browser.py, miroirs simulés sur 127.0.0.1")
+    with profiling.stage('checks'):
+        results = run_checks(args.delay)
+    failed = results.count(False)
+    print(f"\n{'✅' if not failed else '❌'} {len(results) - failed}/{len(results)} vérifications réussies")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
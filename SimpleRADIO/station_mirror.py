@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Miroir local (SQLite) des stations RadioBrowser: comptages et recherches hors ligne.
+
+Un import unique du dump (GET /json/stations, ~50 000 stations) remplace
+les téléchargements de count_radios (jusqu'à 10 000 stations complètes par
+combinaison de critères, juste pour len()).
+
+Schéma:
+  - stations: une ligne par station, index (countrycode, bitrate) et (bitrate)
+  - station_tags: (tag, countrycode, bitrate, station_id), clé primaire sans
+    rowid -> "RU + oldies + ≥192 kbps" est un parcours d'index, sans lire stations
+  - stations_fts: FTS5 sur les noms (accents ignorés, recherche par préfixe)
+
+Les tags sont normalisés (minuscules, espaces retirés) et comparés exactement,
+comme tagExact=true de l'API.
+
+Usage:
+    python3 station_mirror.py import stations.json
+    python3 station_mirror.py import                  # dump téléchargé (radio_browser.py)
+    python3 station_mirror.py count --country RU --tag oldies --bitrate-min 192
+    python3 station_mirror.py search "radio record" --country RU --limit 10
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import profiling
+
+DB_PATH = 'stations_mirror.db'
+ORDERS = ('clickcount', 'votes', 'bitrate', 'name')
+
+SCHEMA = """
+CREATE TABLE stations (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    homepage TEXT NOT NULL DEFAULT '',
+    favicon TEXT NOT NULL DEFAULT '',
+    countrycode TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    codec TEXT NOT NULL DEFAULT '',
+    bitrate INTEGER NOT NULL DEFAULT 0,
+    votes INTEGER NOT NULL DEFAULT 0,
+    clickcount INTEGER NOT NULL DEFAULT 0,
+    lastcheckok INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE station_tags (
+    tag TEXT NOT NULL,
+    countrycode TEXT NOT NULL,
+    bitrate INTEGER NOT NULL,
+    station_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, countrycode, bitrate, station_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE stations_fts USING fts5(
+    name, content='stations', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TABLE mirror_info (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Index créés après l'insertion en masse (plus rapide que de les maintenir ligne à ligne)
+INDEXES = """
+CREATE UNIQUE INDEX idx_stations_uuid ON stations(uuid);
+CREATE INDEX idx_stations_country_bitrate ON stations(countrycode, bitrate);
+CREATE INDEX idx_stations_bitrate ON stations(bitrate);
+CREATE INDEX idx_station_tags_country ON station_tags(countrycode, tag, bitrate);
+INSERT INTO stations_fts(stations_fts) VALUES ('rebuild');
+ANALYZE;
+"""
+
+
+def split_tags(raw):
+    """'Oldies, 60s,oldies ' -> ['60s', 'oldies']"""
+    return sorted({tag.strip().lower() for tag in (raw or '').split(',') if tag.strip()})
+
+
+def to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def load_dump(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def download_dump():
+    from radio_browser import RadioBrowser  # requests seulement pour le téléchargement
+    with RadioBrowser() as client:
+        return client.stations()
+
+
+def import_dump(records, db_path=DB_PATH):
+    """Remplace le contenu du miroir par records (liste de stations de l'API); renvoie le nombre importé
+
+    La base est construite dans un fichier temporaire (sans journal) puis substituée
+    au miroir: un import interrompu laisse l'ancien miroir intact.
+    """
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        imported = build_mirror(records, tmp_path)
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return imported
+
+
+def build_mirror(records, db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        stations, tags, seen = [], [], set()
+        for record in records:
+            uuid = record.get('stationuuid') or ''
+            url = (record.get('url_resolved') or record.get('url') or '').strip()
+            if not uuid or not url or uuid in seen:
+                continue
+            seen.add(uuid)
+            station_id = len(stations) + 1
+            country = (record.get('countrycode') or '').upper()
+            bitrate = to_int(record.get('bitrate'))
+            station_tags = split_tags(record.get('tags'))
+            stations.append((station_id, uuid, (record.get('name') or '').strip(), url,
+                             record.get('homepage') or '', record.get('favicon') or '', country,
+                             record.get('language') or '', ','.join(station_tags), record.get('codec') or '',
+                             bitrate, to_int(record.get('votes')), to_int(record.get('clickcount')),
+                             to_int(record.get('lastcheckok'))))
+            tags.extend((tag, country, bitrate, station_id) for tag in station_tags)
+
+        with conn:
+            conn.executemany(f"INSERT INTO stations VALUES ({', '.join('?' * 14)})", stations)
+            conn.executemany("INSERT INTO station_tags VALUES (?, ?, ?, ?)", tags)
+            conn.executemany("INSERT INTO mirror_info VALUES (?, ?)",
+                             [('imported_at', str(int(time.time()))), ('stations', str(len(stations)))])
+        conn.executescript(INDEXES)
+    finally:
+        conn.close()
+    return len(stations)
+
+
+def open_mirror(db_path=DB_PATH):
+    """Miroir en lecture seule (sqlite3.OperationalError s'il est absent, sans créer de fichier vide)"""
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def fts_query(text):
+    """'radio rec' -> '"radio"* "rec"*' (chaque mot en préfixe, guillemets neutralisés)"""
+    words = text.replace('"', ' ').split()
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def build_filter(country=None, tag=None, bitrate_min=None, name=None, join=True):
+    """(FROM ... WHERE ..., paramètres) pour les critères donnés
+
+    Avec un tag, la requête part de station_tags (countrycode et bitrate y sont
+    recopiés); join=False la limite à cette table (comptage sur l'index seul).
+    """
+    clauses, params = [], []
+    if tag:
+        source, prefix = "station_tags t JOIN stations s ON s.id = t.station_id" if join else "station_tags t", 't'
+        clauses.append("t.tag = ?")
+        params.append(tag.strip().lower())
+    else:
+        source, prefix = "stations s", 's'
+    if country:
+        clauses.append(f"{prefix}.countrycode = ?")
+        params.append(country.upper())
+    if bitrate_min:
+        clauses.append(f"{prefix}.bitrate >= ?")
+        params.append(int(bitrate_min))
+    if name and fts_query(name):
+        key = 't.station_id' if tag else 's.id'
+        clauses.append(f"{key} IN (SELECT rowid FROM stations_fts WHERE stations_fts MATCH ?)")
+        params.append(fts_query(name))
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+    return source + where, params
+
+
+def count(conn, country=None, tag=None, bitrate_min=None, name=None):
+    source, params = build_filter(country, tag, bitrate_min, name, join=False)
+    return conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+
+def search(conn, country=None, tag=None, bitrate_min=None, name=None, order='clickcount', limit=100):
+    """Stations (sqlite3.Row) triées par order décroissant (name: alphabétique)"""
+    if order not in ORDERS:
+        raise ValueError(f"Tri inconnu: {order}")
+    source, params = build_filter(country, tag, bitrate_min, name)
+    direction = 'COLLATE NOCASE' if order == 'name' else 'DESC'
+    return conn.execute(f"SELECT s.* FROM {source} ORDER BY s.{order} {direction} LIMIT ?",
+                        params + [limit]).fetchall()
+
+
+def mirror_info(conn):
+    return dict(conn.execute("SELECT key, value FROM mirror_info"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Miroir SQLite des stations RadioBrowser")
+    parser.add_argument('--db', default=DB_PATH, help="Base du miroir")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Importer un dump JSON (/json/stations)")
+    import_parser.add_argument('dump', nargs='?', help="Fichier JSON (défaut: téléchargé via radio_browser)")
+
+    for name in ('count', 'search'):
+        sub = commands.add_parser(name)
+        if name == 'search':
+            sub.add_argument('name', nargs='?', help="Mots du nom (préfixes)")
+            sub.add_argument('--order', choices=ORDERS, default='clickcount')
+            sub.add_argument('--limit', type=int, default=20)
+        else:
+            sub.add_argument('--name', help="Mots du nom (préfixes)")
+        sub.add_argument('--country', help="Code ISO (RU, FR...)")
+        sub.add_argument('--tag')
+        sub.add_argument('--bitrate-min', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        with profiling.stage('load'):
+            records = load_dump(args.dump) if args.dump else download_dump()
+        start = time.perf_counter()
+        with profiling.stage('import'):
+            imported = import_dump(records, args.db)
+        print(f"✅ {imported} stations importées dans {args.db} ({time.perf_counter() - start:.1f} s)")
+        return 0
+
+    try:
+        conn = open_mirror(args.db)
+        info = mirror_info(conn)
+    except sqlite3.OperationalError:
+        print(f"❌ Miroir absent: python3 station_mirror.py --db {args.db} import stations.json")
+        return 1
+    country = args.country.upper() if args.country else 'Tous pays'
+    criteria = f"{country} / {args.tag or 'Tous tags'} / ≥{args.bitrate_min or 0} kbps"
+    if args.name:
+        criteria += f" / {args.name!r}"
+    start = time.perf_counter()
+    with profiling.stage(args.command):
+        if args.command == 'count':
+            result = count(conn, args.country, args.tag, args.bitrate_min, args.name)
+        else:
+            result = search(conn, args.country, args.tag, args.bitrate_min, args.name, args.order, args.limit)
+    elapsed = 1000 * (time.perf_counter() - start)
+    age = (time.time() - int(info.get('imported_at', 0))) / 86400
+
+    if args.command == 'count':
+        print(f"📻 {criteria}: {result} stations ({elapsed:.2f} ms, miroir de {age:.0f} j)")
+    else:
+        print(f"📻 {criteria}: {len(result)} stations ({elapsed:.2f} ms)")
+        for i, station in enumerate(result, 1):
+            print(f"   {i:>3}. {station['name'][:45]:<45} {station['countrycode']:<2} {station['bitrate']:>4} kbps "
+                  f"{station['clickcount']:>6} clics")
+    conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    profiling.install()
+    sys.exit(main())
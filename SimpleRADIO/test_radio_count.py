@@ -1,17 +1,12 @@
 #!/usr/bin/env python3
 """Test script to count radios matching specific criteria"""
 
-import requests
-import json
+import profiling
+from radio_browser import shared_client
 
-# RadioBrowser API endpoint
-API_BASE = "https://de1.api.radio-browser.info/json"
-
-def count_radios(country_code=None, tag=None, bitrate_min=None):
+def count_radios(country_code=None, tag=None, bitrate_min=None, client=None):
     """Count radios matching the criteria"""
-    
-    # Build the search URL
-    url = f"{API_BASE}/stations/search"
+    client = client or shared_client()
     
     params = {
         "order": "clickcount",
@@ -30,14 +25,11 @@ def count_radios(country_code=None, tag=None, bitrate_min=None):
     print(f"   Country: {country_code or 'All'}")
     print(f"   Tag: {tag or 'All'}")
     print(f"   Bitrate Min: {bitrate_min or 'All'} kbps")
-    print(f"\n📡 API URL: {url}")
+    print(f"\n📡 API: /json/stations/search (RadioBrowser, cached)")
     print(f"📋 Parameters: {params}\n")
     
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        stations = response.json()
+        stations = client.search(**params)
         total_count = len(stations)
         
         print(f"✅ Total radios found: {total_count}")
@@ -57,6 +49,7 @@ def count_radios(country_code=None, tag=None, bitrate_min=None):
         return 0
 
 if __name__ == "__main__":
+    profiling.install()
     # Test case from user
     print("=" * 60)
     print("TEST: Russian Federation + oldies + >=192 kbps")
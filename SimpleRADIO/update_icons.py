@@ -1,5 +1,8 @@
 import os
 from PIL import Image
+import profiling
+
+profiling.install()
 
 source_icon = "/home/kamel/Téléchargements/symbole-doutil-radio-noir.png"
 base_path = "app/src/main/res"